@@ -0,0 +1,481 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Iterable
+from typing import Tuple
+from typing import Union
+
+from api.configs import app_configs
+from api.datastructures import Model
+from api.utils import is_uuid_valid
+from api.utils import paths_without_slash
+
+
+class PathTrie:
+    """Prefix tree of model paths, one node by path segment"""
+
+    _END = None  # Key of the model path in its last node.
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, path: str) -> None:
+        """Add a normalized model path.
+
+        Args:
+            path (str): Model path.
+        """
+        node = self._root
+        for segment in path.split("/")[1:]:
+            node = node.setdefault(segment, {})
+        node[self._END] = path
+
+    def discard(self, path: str) -> None:
+        """Remove a normalized model path, empty nodes are pruned.
+
+        Args:
+            path (str): Model path.
+        """
+        nodes = [self._root]
+        segments = path.split("/")[1:]
+        for segment in segments:
+            node = nodes[-1].get(segment)
+            if node is None:
+                return
+            nodes.append(node)
+
+        nodes[-1].pop(self._END, None)
+        for segment, parent in zip(reversed(segments), reversed(nodes[:-1])):
+            if parent[segment]:
+                break
+            del parent[segment]
+
+    def resolve(self, path: str) -> Union[Tuple[str, Union[str, None]], None]:
+        """Match a request path, the last segment is the resource id when it is
+        an uuid after a model path.
+
+        Args:
+            path (str): Request path.
+
+        Returns:
+            Union[Tuple[str, Union[str, None]], None]: Model path and resource id,
+                `None` if no model path matches.
+        """
+        path = path.strip()
+        segments = paths_without_slash(path).split("/")[1:]
+        last = len(segments) - 1
+        node = self._root
+        for index, segment in enumerate(segments):
+            child = node.get(segment.lower())
+            if child is not None:
+                node = child
+                continue
+            if index == last and self._END in node and not path.endswith("/"):
+                if is_uuid_valid(segment):
+                    return node[self._END], segment
+            return None
+
+        if self._END in node:
+            return node[self._END], None
+        return None
+
+    def clear(self) -> None:
+        """Remove all paths."""
+        self._root.clear()
+
+
+class ModelRegistry:
+    """In-memory registry of models keyed by normalized path.
+
+    Models are kept in a LRU, their paths are routed by a `PathTrie` that is
+    not evicted. Static models are not evicted by the LRU and keep their bodies
+    encoded, they expire after `ttl` like the other models.
+    """
+
+    def __init__(self, ttl: int = 0, size: int = 0):
+        """
+        Args:
+            ttl (int, optional): Seconds an entry lives, `0` never expires.
+            size (int, optional): Max entries stored, `0` disables the registry.
+        """
+        self.ttl = ttl
+        self.size = size
+        self.version = 0
+        self._models = OrderedDict()
+        self._static = {}  # Static models by path, out of the LRU.
+        self._paths = {}  # Model name to path routed.
+        self._trie = PathTrie()
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        """Normalize a path like `Model` does.
+
+        Args:
+            path (str): Request or model path.
+
+        Returns:
+            str: Path normalized.
+        """
+        return paths_without_slash(path.strip().lower())
+
+    def resolve(self, path: str) -> Union[Tuple[str, Union[str, None]], None]:
+        """Split a request path in model path and resource id.
+
+        Args:
+            path (str): Request path.
+
+        Returns:
+            Union[Tuple[str, Union[str, None]], None]: Model path and resource id,
+                `None` if the path is not routed.
+        """
+        return self._trie.resolve(path)
+
+    def get(self, path: str) -> Union[Model, None]:
+        """Get a model from path.
+
+        Args:
+            path (str): Request path.
+
+        Returns:
+            Union[Model, None]: Return `Model` if it is cached else `None`.
+        """
+        key = self.normalize(path)
+        entry = self._static.get(key) or self._models.get(key)
+        if entry is None:
+            return None
+
+        expires, model = entry
+        if expires and expires < time.monotonic():
+            self._discard(key)
+            return None
+
+        if key in self._models:
+            self._models.move_to_end(key)
+        return model
+
+    def set(self, model: Model) -> None:
+        """Add or replace a model.
+
+        Args:
+            model (Model): Model object.
+        """
+        if not self.size:
+            return
+
+        key = self.normalize(model.path)
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        self._discard(key)
+        if model.static:
+            model.static_table()  # Encoded before serving it.
+            self._static[key] = (expires, model)
+        else:
+            self._models[key] = (expires, model)
+        previous = self._paths.get(model.name)
+        if previous is not None and previous != key:
+            self._trie.discard(previous)
+        self._paths[model.name] = key
+        self._trie.add(key)
+        while len(self._models) > self.size:
+            self._discard(next(iter(self._models)))
+        self.version += 1
+
+    def remove(self, model_name: str) -> None:
+        """Remove a model from name.
+
+        Args:
+            model_name (str): Model name.
+        """
+        key = self._paths.pop(model_name, None)
+        if key is not None:
+            self._discard(key)
+            self._trie.discard(key)
+        self.version += 1
+
+    def load(self, models: Iterable[Model]) -> None:
+        """Replace all entries.
+
+        Args:
+            models (Iterable[Model]): Models to store.
+        """
+        self.clear()
+        for model in models:
+            self.set(model)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._models.clear()
+        self._static.clear()
+        self._paths.clear()
+        self._trie.clear()
+        self.version += 1
+
+    def _discard(self, key: str) -> None:
+        self._models.pop(key, None)
+        self._static.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._models) + len(self._static)
+
+
+class TTLCache:
+    """LRU of values that expire after `ttl` seconds"""
+
+    def __init__(self, ttl: int = 0, size: int = 0):
+        """
+        Args:
+            ttl (int, optional): Seconds a value lives, `0` disables the cache.
+            size (int, optional): Max values stored, `0` disables the cache.
+        """
+        self.ttl = ttl
+        self.size = size
+        self._values = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Get a value.
+
+        Args:
+            key (Hashable): Key.
+
+        Returns:
+            Any: Value, `None` if it is not stored or expired.
+        """
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._values[key]
+            return None
+
+        self._values.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value.
+
+        Args:
+            key (Hashable): Key.
+            value (Any): Value.
+        """
+        if not (self.ttl and self.size):
+            return
+
+        self._values.pop(key, None)
+        self._values[key] = (time.monotonic() + self.ttl, value)
+        while len(self._values) > self.size:
+            self._values.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class ResponseCache:
+    """LRU of encoded response bodies by model, bounded by bytes.
+
+    Every invalidation changes the generation of a model, a response read
+    before it is not stored after it.
+    """
+
+    def __init__(self, size: int = 0):
+        """
+        Args:
+            size (int, optional): Max bytes stored, `0` disables the cache.
+        """
+        self.size = size
+        self.used = 0
+        self._entries = OrderedDict()
+        self._keys = {}  # Model name to entry keys.
+        self._counter = 0
+        self._generations = {}  # Model name to its last invalidation.
+        self._cleared = 0
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        """Build a strong ETag from a body.
+
+        Args:
+            body (bytes): Response body.
+
+        Returns:
+            str: ETag quoted.
+        """
+        return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def get(self, model_name: str, key: Hashable) -> Union[Tuple[str, bytes], None]:
+        """Get a response stored.
+
+        Args:
+            model_name (str): Model name.
+            key (Hashable): Request key.
+
+        Returns:
+            Union[Tuple[str, bytes], None]: ETag and body, `None` if not cached.
+        """
+        entry_key = (model_name, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+
+        expires, etag, body = entry
+        if expires < time.monotonic():
+            self._discard(entry_key)
+            return None
+
+        self._entries.move_to_end(entry_key)
+        return etag, body
+
+    def generation(self, model_name: str) -> int:
+        """Get the generation of the responses of a model.
+
+        Args:
+            model_name (str): Model name.
+
+        Returns:
+            int: Generation, it changes on every invalidation.
+        """
+        return max(self._generations.get(model_name, 0), self._cleared)
+
+    def set(
+        self,
+        model_name: str,
+        key: Hashable,
+        body: bytes,
+        ttl: int,
+        generation: Union[int, None] = None,
+    ) -> Tuple[str, bytes]:
+        """Store a response, bodies bigger than the cache are not stored.
+
+        Args:
+            model_name (str): Model name.
+            key (Hashable): Request key.
+            body (bytes): Response body.
+            ttl (int): Seconds the response lives.
+            generation (Union[int, None], optional): Generation read before the
+                body was built, it is not stored if the model was invalidated
+                since. `None` always stores.
+
+        Returns:
+            Tuple[str, bytes]: ETag and body.
+        """
+        etag = self.etag(body)
+        if len(body) > self.size:
+            return etag, body
+        if generation is not None and generation != self.generation(model_name):
+            return etag, body
+
+        entry_key = (model_name, key)
+        self._discard(entry_key)
+        self._entries[entry_key] = (time.monotonic() + ttl, etag, body)
+        self._keys.setdefault(model_name, set()).add(entry_key)
+        self.used += len(body)
+        while self.used > self.size:
+            self._discard(next(iter(self._entries)))
+        return etag, body
+
+    def invalidate(self, model_name: str) -> None:
+        """Remove the responses of a model.
+
+        Args:
+            model_name (str): Model name.
+        """
+        self._counter += 1
+        self._generations[model_name] = self._counter
+        for entry_key in list(self._keys.get(model_name, ())):
+            self._discard(entry_key)
+
+    def clear(self) -> None:
+        """Remove all responses."""
+        self._counter += 1
+        self._cleared = self._counter
+        self._entries.clear()
+        self._keys.clear()
+        self.used = 0
+
+    def _discard(self, entry_key: Tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self.used -= len(entry[2])
+        keys = self._keys.get(entry_key[0])
+        keys.discard(entry_key)
+        if not keys:
+            del self._keys[entry_key[0]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Share the result of a call with the identical calls made while it runs.
+
+    The first caller runs the call, the others wait its result or exception,
+    nothing is kept once it finishes. Results are shared, they must not be
+    modified. If the first caller is cancelled the next waiter runs the call.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled (bool, optional): Share the calls, else every call runs.
+        """
+        self.enabled = enabled
+        self._calls = {}  # Key to the future of the call running.
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a call or wait the identical one running.
+
+        Args:
+            key (Hashable): Call key.
+            fn (Callable[[], Awaitable[Any]]): Call.
+
+        Returns:
+            Any: Call result.
+        """
+        if not self.enabled:
+            return await fn()
+
+        future = self._calls.get(key)
+        while future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            future = self._calls.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved, there can be no waiters.
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+        return result
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+model_registry = ModelRegistry(
+    ttl=app_configs.MODEL_REGISTRY_TTL,
+    size=app_configs.MODEL_REGISTRY_SIZE,
+)
+response_cache = ResponseCache(size=app_configs.RESPONSE_CACHE_SIZE)
@@ -5,11 +5,76 @@ ENGINE_URI_DEFAULT = "mongodb://0.0.0.0:27017/"
 ENGINE_NAME = os.environ.get("ENGINE_NAME", "MONGO")
 ENGINE_DB_NAME = os.environ.get("ENGINE_DB_NAME", "apiruns")
 ENGINE_URI = os.environ.get("ENGINE_URI", ENGINE_URI_DEFAULT)
+# Read created objects back from the engine, for server side defaults.
+ENGINE_READ_AFTER_WRITE = bool(os.environ.get("ENGINE_READ_AFTER_WRITE", False))
+# Identical reads made at the same time share one engine call.
+ENGINE_COALESCE_READS = bool(os.environ.get("ENGINE_COALESCE_READS", False))
 
 # Mongo
 MONGO_TLS = bool(os.environ.get("MONGO_TLS", False))
 MONGO_CAFILE = os.environ.get("MONGO_CAFILE", "")
 MONGO_PAGINATION_LIMIT = int(os.environ.get("MONGO_PAGINATION_LIMIT", 20))
+# Indexed field to sort the rows paginated by cursor, `_id` breaks ties.
+MONGO_CURSOR_FIELD = os.environ.get("MONGO_CURSOR_FIELD", "_id")
+# Rows fetched by round trip when a response is streamed.
+MONGO_STREAM_BATCH_SIZE = int(os.environ.get("MONGO_STREAM_BATCH_SIZE", 500))
+# Filtered counts are cached by `MONGO_COUNT_TTL` seconds, `0` counts every time.
+MONGO_COUNT_TTL = int(os.environ.get("MONGO_COUNT_TTL", 10))
+MONGO_COUNT_CACHE_SIZE = int(os.environ.get("MONGO_COUNT_CACHE_SIZE", 1000))
+# Connections by process, seconds a request waits a connection, `0` waits forever.
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+MONGO_WAIT_QUEUE_TIMEOUT = float(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT", 0))
+# Wire compressors by preference, `zstd,snappy,zlib`, empty does not compress.
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS", "")
+# Read preference of the collection lists and counts and the models list, writes
+# and reads by id use the primary. Seconds a secondary can lag, `0` is not bounded.
+MONGO_READ_PREFERENCE = os.environ.get("MONGO_READ_PREFERENCE", "primary")
+MONGO_MAX_STALENESS = int(os.environ.get("MONGO_MAX_STALENESS", 0))
+# The drivers reject a lower staleness on every secondary read.
+MONGO_MIN_STALENESS = 90
+if MONGO_MAX_STALENESS and not MONGO_MAX_STALENESS >= MONGO_MIN_STALENESS:
+    raise ValueError(f"MONGO_MAX_STALENESS must be 0 or {MONGO_MIN_STALENESS} or more.")
+
+# Responses, `AUTO` uses orjson when it is installed else `JSON`.
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "AUTO")
+
+# Bytes of the responses cached for the models with `cache`, `0` disables it.
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 64 * 1024 * 1024))
+
+# Memory engine, snapshot saved to disk if a path is set.
+MEMORY_SNAPSHOT_PATH = os.environ.get("MEMORY_SNAPSHOT_PATH", "")
+MEMORY_SNAPSHOT_INTERVAL = float(os.environ.get("MEMORY_SNAPSHOT_INTERVAL", 60))
+
+# SQLite engine, one file shared by the pool connections, seconds waiting locks.
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "apiruns.db")
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 4))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", 5))
+
+# Metrics, served on the admin metrics path, the token is sent as Bearer and
+# required when they are enabled.
+METRICS_ENABLED = bool(os.environ.get("METRICS_ENABLED", False))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+if METRICS_ENABLED and not METRICS_TOKEN:
+    raise ValueError("METRICS_TOKEN is required when METRICS_ENABLED is set.")
+
+# Bulk operations
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 10000))
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 1000))
+# Max rows changed by a filtered PATCH or DELETE.
+BULK_MAX_AFFECTED = int(os.environ.get("BULK_MAX_AFFECTED", 1000))
+
+# Ingestion of the models with `ingest`, rows queued by model and seconds a
+# row waits a full batch if the model does not set `wait`.
+INGEST_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", 10000))
+INGEST_WAIT = float(os.environ.get("INGEST_WAIT", 0.05))
+
+# Jobs, rows by chunk, seconds slept between chunks and between polls of jobs.
+JOBS_CHUNK_SIZE = int(os.environ.get("JOBS_CHUNK_SIZE", 500))
+JOBS_THROTTLE = float(os.environ.get("JOBS_THROTTLE", 0.05))
+JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", 5))
+# Seconds a job is owned without progress, then other process takes it again.
+JOBS_LEASE = float(os.environ.get("JOBS_LEASE", 60))
 
 ORIGINS_DEFAULT = [
     "http://localhost",
@@ -22,5 +87,21 @@ ORIGINS = ORIGINS_PROD.split(",") if ORIGINS_PROD else ORIGINS_DEFAULT
 MODEL_ADMIN_NAME = "apiruns_models"
 IDENTIFIER_ID = "public_id"
 
+# Model registry
+MODEL_REGISTRY_TTL = int(os.environ.get("MODEL_REGISTRY_TTL", 300))
+MODEL_REGISTRY_SIZE = int(os.environ.get("MODEL_REGISTRY_SIZE", 1000))
+# AUTO: change streams with version polling fallback, POLL: version polling, OFF.
+MODEL_REGISTRY_INVALIDATION = os.environ.get("MODEL_REGISTRY_INVALIDATION", "AUTO")
+MODEL_REGISTRY_POLL_INTERVAL = float(
+    os.environ.get("MODEL_REGISTRY_POLL_INTERVAL", 2)
+)
+MODEL_VERSION_NAME = "apiruns_versions"
+MODEL_JOBS_NAME = "apiruns_jobs"
+
+# Serializers
+VALIDATOR_CACHE_SIZE = int(os.environ.get("VALIDATOR_CACHE_SIZE", 1000))
+# CERBERUS or COMPILED, compiled schemas fallback to Cerberus on unsupported rules.
+SERIALIZER_ENGINE = os.environ.get("SERIALIZER_ENGINE", "CERBERUS")
+
 # Internal feature
 FEATURE_INTERNAL_PATH = os.environ.get("FEATURE_INTERNAL_PATH", None)
@@ -8,9 +8,15 @@ class RouterAdmin:
     # Admin
     ADMIN = os.environ.get("MAIN_ADMIN_PATH", "/admin/models")
 
+    # Jobs
+    JOBS = os.environ.get("JOBS_ADMIN_PATH", "/admin/jobs")
+
     # ping
     PING = os.environ.get("PING_ADMIN_PATH", "/ping")
 
+    # metrics
+    METRICS = os.environ.get("METRICS_ADMIN_PATH", "/metrics")
+
     @classmethod
     def excluded(cls) -> Tuple:
         """Path excluded.
@@ -20,7 +26,9 @@ class RouterAdmin:
         """
         return (
             cls.ADMIN,
+            cls.JOBS,
             cls.PING,
+            cls.METRICS,
         )
 
 
@@ -28,19 +36,7 @@ class Router:
     """Router constants"""
 
     LEVEL_ROOT = "/"
-    LEVEL_ONE = "/{level_one}"
-    LEVEL_TWO = "/{level_one}/{level_two}"
-    LEVEL_THREE = "/{level_one}/{level_two}/{level_three}"
-    LEVEL_FOUR = "/{level_one}/{level_two}/{level_three}/{level_four}"
-    LEVEL_FIVE = "/{level_one}/{level_two}/{level_three}/{level_four}/" "{level_five}"
-    LEVEL_SIX = (
-        "/{level_one}/{level_two}/{level_three}/{level_four}"
-        "/{level_five}/{level_six}"
-    )
-    LEVEL_SEVEN = (
-        "/{level_one}/{level_two}/{level_three}/{level_four}"
-        "/{level_five}/{level_six}/{level_seven}"
-    )
+    DYNAMIC = "/{path:path}"  # Model paths are resolved by the registry.
 
 
 class HTTPMethod:
@@ -83,6 +79,20 @@ class HTTPMethod:
             cls.DELETE,
         ]
 
+    @classmethod
+    def with_body(cls):
+        """Return methods with body.
+
+        Returns:
+            list: list of methods.
+        """
+        return [
+            cls.POST,
+            cls.PUT,
+            cls.PATCH,
+            cls.DELETE,
+        ]
+
     @classmethod
     def static(cls):
         """Return static method.
@@ -1,18 +1,57 @@
+import hmac
+import logging
+
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
+from api.cache import model_registry
+from api.cache import response_cache
+from api.configs import app_configs
 from api.configs import route_config as rt
+from api.datastructures import Job
 from api.datastructures import RequestContext
+from api.ingest import ingestor
+from api.jobs import job_runner
+from api.metrics import CONTENT_TYPE
+from api.metrics import metrics
 from api.repositories import repository_from_feature
+from api.responses import JSONResponse
 from api.serializers.admin import AdminSerializer
 
 
+logger = logging.getLogger(__name__)
+
+
 class AdminController:
     """Admin Controller"""
 
     repository = repository_from_feature()
 
     @classmethod
+    async def load_registry(cls) -> None:
+        """Fill the model registry with the stored models."""
+        if not model_registry.size:
+            return
+        try:
+            models = await cls.repository.all_models(model_registry.size)
+        except Exception:
+            logger.warning("model registry not loaded, it will fill on demand.")
+            return
+        model_registry.load(models)
+
+    @classmethod
+    async def reconcile_indexes(cls) -> None:
+        """Create the indexes missing since the models were stored."""
+        try:
+            failed = await cls.repository.reconcile_indexes()
+        except Exception:
+            logger.warning("indexes not reconciled, the engine is not available.")
+            return
+        for name, error in failed:
+            logger.warning(f"indexes of `{name}` not created: {error}")
+
+    @classmethod
+    @metrics.handler(app_configs.MODEL_ADMIN_NAME)
     async def handle(cls, context: RequestContext) -> JSONResponse:
         """Handle from methods.
 
@@ -25,6 +64,7 @@ class AdminController:
         allowed = {
             rt.HTTPMethod.POST: cls.create_model,
             rt.HTTPMethod.GET: cls.list_models,
+            rt.HTTPMethod.PUT: cls.update_model,
             rt.HTTPMethod.DELETE: cls.delete_model,
         }
         fn = allowed.get(context.method)
@@ -35,6 +75,34 @@ class AdminController:
             )
         return await fn(context)
 
+    @classmethod
+    def metrics(cls, context: RequestContext) -> Response:
+        """Render the metrics, the token is required if it is configured.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            Response: Prometheus text exposition.
+        """
+        if not metrics.enabled:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"error": f"Resource `{context.original_path}` not found !"},
+            )
+
+        # Never public, without a token nothing is served.
+        token = app_configs.METRICS_TOKEN
+        authorization = context.headers.get("authorization", "")
+        if not token or not hmac.compare_digest(
+            authorization.encode(), f"Bearer {token}".encode()
+        ):
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"error": "Unauthorized"},
+            )
+        return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
     @classmethod
     async def create_model(cls, context: RequestContext) -> JSONResponse:
         """Create a model.
@@ -64,8 +132,19 @@ class AdminController:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={"error": f"the {name} already exists."},
             )
+        if await cls.repository.pending_jobs(model_p.name):
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": "the model is being deleted, retry later."},
+            )
 
         response = await cls.repository.create_model(model_p.to_json())
+        if not response:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": "the path or model already exists."},
+            )
+        model_registry.set(response)
         return JSONResponse(
             status_code=status.HTTP_201_CREATED, content=response.to_json()
         )
@@ -78,11 +157,43 @@ class AdminController:
             list: List of models.
         """
         models = await cls.repository.list_models(filters=context.query_params)
-        return JSONResponse(content=models)
+        response = JSONResponse(content=models)
+        if context.query_params.get("count"):
+            total = await cls.repository.count_models()
+            response.headers["X-Total-Count"] = str(total)
+        return response
+
+    @classmethod
+    async def update_model(cls, context: RequestContext) -> JSONResponse:
+        """Change the schema of a model, its rows are migrated by a job.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            JSONResponse: `202` with the job migrating the rows.
+        """
+        errors, data = AdminSerializer.update_model(context.body)
+        if errors:
+            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=errors)
+
+        name, schema = data["name"], data["schema"]
+        model = await cls.repository.update_model(name, {"schema": schema})
+        if not model:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"error": f"Model `{name}` not found !"},
+            )
+
+        model_registry.set(model)
+        response_cache.invalidate(model.name)
+        job = await cls.repository.create_job(Job(kind=Job.MIGRATE, model=model.name))
+        job_runner.notify()
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job.to_json())
 
     @classmethod
     async def delete_model(cls, context: RequestContext) -> JSONResponse:
-        """Delete a model.
+        """Delete a model, its rows are dropped by a job.
 
         Args:
             context (RequestContext): request context.
@@ -94,5 +205,46 @@ class AdminController:
         if errors:
             return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=errors)
 
-        await cls.repository.delete_model(context.body.get("name"))
+        name = context.body.get("name")
+        if not await cls.repository.model_by_name(name):
+            return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
+
+        # The job exists before the model is deleted so the name is not reused
+        # meanwhile, it is held by this request until the model is deleted.
+        job = Job(kind=Job.DROP, model=name, status=Job.RUNNING)
+        job_runner.renew(job)
+        job = await cls.repository.create_job(job)
+        await ingestor.remove(name)
+        deleted = await cls.repository.delete_model(name)
+        model_registry.remove(name)
+        response_cache.invalidate(name)
+
+        # Deleted by another request, its job drops the rows.
+        job.status = Job.QUEUED if deleted else Job.DONE
+        job.lease_until = None
+        await cls.repository.save_job(job)
+        job_runner.notify()
         return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
+
+    @classmethod
+    async def jobs(cls, context: RequestContext, job_id: str = None) -> JSONResponse:
+        """List the jobs or get one.
+
+        Args:
+            context (RequestContext): request context.
+            job_id (str, optional): Job id, `None` lists the jobs.
+
+        Returns:
+            JSONResponse: response.
+        """
+        if job_id is None:
+            jobs = await cls.repository.list_jobs(filters=context.query_params)
+            return JSONResponse(content=jobs)
+
+        job = await cls.repository.job_by_id(job_id)
+        if not job:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"error": f"Job `{job_id}` not found !"},
+            )
+        return JSONResponse(content=job.to_json())
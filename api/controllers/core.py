@@ -1,11 +1,29 @@
+from typing import Any
+from typing import AsyncIterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 
+from api.cache import model_registry
+from api.cache import response_cache
+from api.configs import app_configs
 from api.configs import route_config as rt
+from api.datastructures import Model
+from api.datastructures import Query
 from api.datastructures import RequestContext
+from api.ingest import ingestor
+from api.metrics import metrics
 from api.repositories import repository_from_feature
+from api.responses import dumps
+from api.responses import JSONResponse
 from api.serializers.core import CoreSerializer
 
+NDJSON = "application/x-ndjson"
+
 
 class CoreController:
     """Core Controller"""
@@ -13,6 +31,7 @@ class CoreController:
     repository = repository_from_feature()
 
     @classmethod
+    @metrics.handler()
     async def handle(cls, context: RequestContext) -> JSONResponse:
         """Define the service to use according to the http method."""
         repositories = {
@@ -29,7 +48,11 @@ class CoreController:
                 content={"error": "Method Not Allowed"},
             )
 
-        model = await cls.repository.model_by_path(context.path)
+        route = model_registry.resolve(context.original_path)
+        if route:
+            context.route = route
+
+        model = await cls.model_by_path(context.path)
         if not model:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -41,14 +64,40 @@ class CoreController:
             return cls.static_response(context)
 
         if not context.resource_id and context.method in rt.HTTPMethod.modifiable():
-            return JSONResponse(
-                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-                content={"error": "Method Not Allowed"},
-            )
+            service = cls.bulk_service(context.method)
+            if not service:
+                return JSONResponse(
+                    status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+                    content={"error": "Method Not Allowed"},
+                )
 
         response = await service(context)
+        if model.cache and context.method != rt.HTTPMethod.GET:
+            response_cache.invalidate(model.name)
         return cls.custom_response(context, response)
 
+    @classmethod
+    @metrics.timed(metrics.phases, "model")
+    async def model_by_path(cls, path: str) -> Union[Model, None]:
+        """Find model from path, the registry is checked first.
+
+        Args:
+            path (str): Path request.
+
+        Returns:
+            Union[Model, None]: Return `Model` if was found else `None`.
+        """
+        model = model_registry.get(path)
+        if model:
+            return model
+
+        # Not cached if the registry was invalidated during the lookup.
+        version = model_registry.version
+        model = await cls.repository.model_by_path(path)
+        if model and model_registry.version == version:
+            model_registry.set(model)
+        return model
+
     @classmethod
     def static_response(cls, context) -> JSONResponse:
         if rt.HTTPMethod.ALL in context.model.static:
@@ -75,6 +124,9 @@ class CoreController:
         Returns:
             JSONResponse: response.
         """
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            return response
+
         custom_status = context.model.status_code.get(context.method)
         if context.model.status_code and custom_status:
             response.status_code = custom_status
@@ -89,6 +141,40 @@ class CoreController:
         Args:
             context (RequestContext): request context.
 
+        Returns:
+            JSONResponse: response.
+        """
+        errors, query = CoreSerializer.query(
+            context.query_params, context.model.schema
+        )
+        if errors:
+            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=errors)
+
+        if not context.resource_id and cls.is_stream(context):
+            return cls.get_stream(context, query)
+
+        if not context.resource_id and "cursor" in context.query_params:
+            response = await cls.get_by_cursor(context, query)
+        elif context.model.cache and response_cache.size:
+            response = await cls.get_cached(context, query)
+        else:
+            response = await cls.find(context, query)
+
+        if not context.resource_id and context.query_params.get("count"):
+            total = await cls.repository.count_rows(context.model.name, query)
+            response.headers["X-Total-Count"] = str(total)
+        return response
+
+    @classmethod
+    async def find(
+        cls, context: RequestContext, query: Union[Query, None] = None
+    ) -> JSONResponse:
+        """Find one or many rows.
+
+        Args:
+            context (RequestContext): request context.
+            query (Union[Query, None], optional): filters, sort and fields.
+
         Returns:
             JSONResponse: response.
         """
@@ -96,6 +182,7 @@ class CoreController:
             context.model.name,
             context.resource_id,
             context.query_params,
+            query,
         )
         if response is not None:
             return JSONResponse(content=response)
@@ -105,6 +192,103 @@ class CoreController:
             content={"error": f"Resource `{context.original_path}` not found !"},
         )
 
+    @classmethod
+    async def get_cached(
+        cls, context: RequestContext, query: Union[Query, None] = None
+    ) -> Response:
+        """Get rows from the response cache, found responses are stored.
+
+        Args:
+            context (RequestContext): request context.
+            query (Union[Query, None], optional): filters, sort and fields.
+
+        Returns:
+            Response: response, `304` if the `If-None-Match` ETag matches.
+        """
+        name = context.model.name
+        key = (context.path, context.resource_id, tuple(context.query_params.items()))
+        entry = response_cache.get(name, key)
+        if entry is None:
+            generation = response_cache.generation(name)
+            response = await cls.find(context, query)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            ttl = context.model.cache["ttl"]
+            entry = response_cache.set(name, key, response.body, ttl, generation)
+
+        etag, body = entry
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"max-age={context.model.cache['ttl']}",
+        }
+        if etag in context.headers.get("if-none-match", ""):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @classmethod
+    def is_stream(cls, context: RequestContext) -> bool:
+        """Check if the rows are requested as NDJSON.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            bool: `True` with `stream=true` or the `Accept` NDJSON header.
+        """
+        if context.query_params.get("stream"):
+            return True
+        return NDJSON in context.headers.get("accept", "")
+
+    @classmethod
+    def get_stream(
+        cls, context: RequestContext, query: Union[Query, None] = None
+    ) -> StreamingResponse:
+        """Get rows as NDJSON, written as they are read.
+
+        Args:
+            context (RequestContext): request context.
+            query (Union[Query, None], optional): filters, sort and fields.
+
+        Returns:
+            StreamingResponse: response.
+        """
+        rows = cls.repository.stream_rows(
+            context.model.name, context.query_params, query
+        )
+        return StreamingResponse(cls.ndjson(rows), media_type=NDJSON)
+
+    @staticmethod
+    async def ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+        """Encode rows as JSON lines.
+
+        Args:
+            rows (AsyncIterator[dict]): Rows.
+
+        Yields:
+            bytes: Row serialized.
+        """
+        async for row in rows:
+            yield dumps(row) + b"\n"
+
+    @classmethod
+    async def get_by_cursor(
+        cls, context: RequestContext, query: Union[Query, None] = None
+    ) -> JSONResponse:
+        """Get a page of rows by cursor, the next one is sent in `X-Next-Cursor`.
+
+        Args:
+            context (RequestContext): request context.
+            query (Union[Query, None], optional): filters and fields.
+
+        Returns:
+            JSONResponse: response.
+        """
+        rows, next_cursor = await cls.repository.find_by_cursor(
+            context.model.name, context.query_params, query
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(content=rows, headers=headers)
+
     @classmethod
     async def post(cls, context: RequestContext) -> JSONResponse:
         """Post method
@@ -121,13 +305,111 @@ class CoreController:
                 content={"error": f"Resource `{context.original_path}` not found !"},
             )
 
-        errors, data = CoreSerializer.model(context.body, context.model.schema)
+        if isinstance(context.body, list):
+            return await cls.bulk_post(context)
+
+        errors, data = CoreSerializer.model(
+            context.body,
+            context.model.schema,
+            name=context.model.name,
+            version=context.model.schema_hash,
+        )
         if errors:
             return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=errors)
 
+        if context.model.ingest:
+            return cls.ingest(context, data)
+
         response = await cls.repository.create_row(context.model.name, data)
         return JSONResponse(status_code=status.HTTP_201_CREATED, content=response)
 
+    @classmethod
+    async def insert_batch(
+        cls, model_name: str, rows: List[dict]
+    ) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Insert a batch of rows ingested, the responses cached are invalidated
+        once it is flushed.
+
+        Args:
+            model_name (str): Model name.
+            rows (List[dict]): Rows validated.
+
+        Returns:
+            Tuple[List[str], List[Tuple[int, str]]]: Identifiers created and
+                rows failed.
+        """
+        try:
+            return await cls.repository.create_rows(model_name, rows)
+        finally:
+            response_cache.invalidate(model_name)
+
+    @classmethod
+    def ingest(cls, context: RequestContext, data: dict) -> JSONResponse:
+        """Queue a row, it is inserted in background with others.
+
+        Args:
+            context (RequestContext): request context.
+            data (dict): Row validated.
+
+        Returns:
+            JSONResponse: `202` with the identifier, `503` if the queue is full.
+        """
+        model = context.model
+        if not ingestor.put(model.name, model.ingest, cls.insert_batch, data):
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"error": "too many rows queued, retry later."},
+                headers={"Retry-After": "1"},
+            )
+
+        identifier = app_configs.IDENTIFIER_ID
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={identifier: data[identifier]},
+        )
+
+    @classmethod
+    async def bulk_post(cls, context: RequestContext) -> JSONResponse:
+        """Post method with a list of rows.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            JSONResponse: response with rows created and errors by index.
+        """
+        items, max_items = context.body, app_configs.BULK_MAX_ITEMS
+        if not items or len(items) > max_items:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": f"the list must have 1 to {max_items} items."},
+            )
+
+        errors, rows, indexes = CoreSerializer.bulk(
+            items,
+            context.model.schema,
+            name=context.model.name,
+            version=context.model.schema_hash,
+        )
+        created = []
+        if rows:
+            created, failed = await cls.repository.create_rows(
+                context.model.name, rows
+            )
+            for index, error in failed:
+                errors.append({"index": indexes[index], "errors": error})
+            errors.sort(key=lambda e: e["index"])
+
+        status_code = status.HTTP_201_CREATED
+        if errors:
+            status_code = status.HTTP_207_MULTI_STATUS
+        if not created:
+            status_code = status.HTTP_400_BAD_REQUEST
+        return JSONResponse(
+            status_code=status_code,
+            content={"created": created, "errors": errors},
+        )
+
     @classmethod
     async def put(cls, context: RequestContext) -> JSONResponse:
         """Put method
@@ -139,13 +421,134 @@ class CoreController:
             JSONResponse: response.
         """
         errors, data = CoreSerializer.model(
-            context.body, context.model.schema, is_update=True
+            context.body,
+            context.model.schema,
+            is_update=True,
+            name=context.model.name,
+            version=context.model.schema_hash,
         )
         if errors:
             return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=errors)
         await cls.repository.update_row(context.model.name, context.resource_id, data)
         return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content="")
 
+    @classmethod
+    def bulk_service(cls, method: str):
+        """Get the service changing the rows filtered of a collection path.
+
+        Args:
+            method (str): Http method.
+
+        Returns:
+            Union[Callable, None]: Service, `None` if the method is not allowed.
+        """
+        return {
+            rt.HTTPMethod.PATCH: cls.patch_many,
+            rt.HTTPMethod.DELETE: cls.delete_many,
+        }.get(method)
+
+    @classmethod
+    async def bulk_query(
+        cls, context: RequestContext
+    ) -> Tuple[Union[JSONResponse, None], Union[Query, None], List[Any]]:
+        """Validate the filters of a bulk change and find the rows it affects.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            Tuple[Union[JSONResponse, None], Union[Query, None], List[Any]]: Error
+                response or `None`, filters and `_id` of the rows to change.
+        """
+        errors, query = CoreSerializer.query(
+            context.query_params, context.model.schema
+        )
+        if errors:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST, content=errors
+            )
+            return response, None, []
+
+        if query is None or not query.filters:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": "send `filter` params to change many rows."},
+            )
+            return response, None, []
+
+        if not context.query_params.get("confirm"):
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": "send `confirm=true` to change the rows filtered."},
+            )
+            return response, None, []
+
+        # The change is bound to these rows, the limit holds against inserts.
+        max_affected = app_configs.BULK_MAX_AFFECTED
+        ids = await cls.repository.affected_ids(
+            context.model.name, query, max_affected + 1
+        )
+        if len(ids) > max_affected:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"error": f"more than {max_affected} rows match the filters."},
+            )
+            return response, None, []
+        return None, query, ids
+
+    @classmethod
+    async def patch_many(cls, context: RequestContext) -> JSONResponse:
+        """Patch the rows matching the filters in one operation.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            JSONResponse: response with rows matched and modified.
+        """
+        errors, data = CoreSerializer.model(
+            context.body,
+            context.model.schema,
+            is_update=True,
+            name=context.model.name,
+            version=context.model.schema_hash,
+        )
+        if errors or not data:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=errors or {"error": "there are no fields to update."},
+            )
+
+        error, query, ids = await cls.bulk_query(context)
+        if error:
+            return error
+
+        matched, modified = 0, 0
+        if ids:
+            matched, modified = await cls.repository.update_rows(
+                context.model.name, query, data, ids
+            )
+        return JSONResponse(content={"matched": matched, "modified": modified})
+
+    @classmethod
+    async def delete_many(cls, context: RequestContext) -> JSONResponse:
+        """Delete the rows matching the filters in one operation.
+
+        Args:
+            context (RequestContext): request context.
+
+        Returns:
+            JSONResponse: response with rows matched and deleted.
+        """
+        error, query, ids = await cls.bulk_query(context)
+        if error:
+            return error
+
+        deleted = 0
+        if ids:
+            deleted = await cls.repository.delete_rows(context.model.name, query, ids)
+        return JSONResponse(content={"matched": deleted, "deleted": deleted})
+
     @classmethod
     async def delete(cls, context: RequestContext) -> JSONResponse:
         """Delete method
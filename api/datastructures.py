@@ -6,13 +6,20 @@ from dataclasses import field
 from datetime import datetime
 from datetime import timezone
 from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
 from typing import Union
 
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 from api.configs import route_config
-from api.utils import json_serial
+from api.responses import dumps
+from api.responses import JSONResponse
+from api.serializers.context import ContextSerializer
+from api.serializers.utils import schema_hash
+from api.utils import jsonable
 from api.utils import paths_without_slash
 from api.utils import split_uuid_path
 
@@ -32,9 +39,7 @@ class BaseModel:
 
     def to_json(self) -> dict:
         """Convert obj to json"""
-        return json.loads(
-            json.dumps(self.to_dict(), indent=4, sort_keys=False, default=json_serial)
-        )
+        return jsonable(self.to_dict())
 
 
 @dataclass
@@ -55,6 +60,8 @@ class Model(BaseModel):
     status_code: dict = field(default_factory=dict)
     static: Union[None, dict] = None
     features: Feature = field(default_factory=Feature)
+    cache: dict = field(default_factory=dict)
+    ingest: dict = field(default_factory=dict)
 
     def __post_init__(self):
         if not self.public_id:
@@ -64,25 +71,93 @@ class Model(BaseModel):
             self.name = self.name.strip().lower()
         else:
             self.name = f"model-{str(uuid.uuid4())}"
+        # Version of the schema, models are built again when loaded or updated.
+        self.schema_hash = schema_hash(self.schema)
+
+    def indexed_fields(self) -> List[str]:
+        """Fields marked with the `index` rule, nested fields are dotted.
+
+        Returns:
+            List[str]: Fields to index.
+        """
+        fields = []
+        pending = [("", self.schema)]
+        while pending:
+            prefix, schema = pending.pop(0)
+            for name, rules in schema.items():
+                if not isinstance(rules, dict):
+                    continue
+                if rules.get("index"):
+                    fields.append(f"{prefix}{name}")
+                if rules.get("type") == "dict" and isinstance(rules.get("schema"), dict):
+                    pending.append((f"{prefix}{name}.", rules["schema"]))
+        return fields
+
+    def static_table(self) -> Dict[str, bytes]:
+        """Static bodies by method, encoded once.
 
-    def static_response(self, method) -> JSONResponse:
+        Returns:
+            Dict[str, bytes]: Body encoded by method.
+        """
+        table = self.__dict__.get("_static_table")
+        if table is None:
+            table = {}
+            for method in route_config.HTTPMethod.to_list():
+                content = self.static.get(method)
+                if not content:
+                    content = self.static.get(route_config.HTTPMethod.ALL)
+                table[method] = dumps(content)
+            self._static_table = table
+        return table
+
+    def static_response(self, method) -> Response:
         """Response from static.
 
         Args:
             method (str): method http.
 
         Returns:
-            JSONResponse: response.
+            Response: response.
         """
-        content = self.static.get(method)
-        if not content:
-            content = self.static.get(route_config.HTTPMethod.ALL)
-        return JSONResponse(
+        return Response(
             status_code=route_config.HTTPMethod.get_status_code(method),
-            content=content,
+            content=self.static_table()[method],
+            media_type=JSONResponse.media_type,
         )
 
 
+@dataclass
+class Job(BaseModel):
+    """Admin operation run in background, in chunks"""
+
+    # Kinds
+    DROP = "DROP"
+    MIGRATE = "MIGRATE"
+
+    # Status
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+    kind: Union[None, str] = None
+    model: Union[None, str] = None
+    status: str = "QUEUED"
+    progress: dict = field(default_factory=lambda: {"total": 0, "done": 0})
+    errors: list = field(default_factory=list)  # Rows not valid, a sample.
+    error: Union[None, str] = None
+    cursor: Union[None, str] = None  # Last row done, the job resumes after it.
+    lease_until: Union[None, str] = None  # Running job taken again after it.
+
+    def __post_init__(self):
+        if not self.public_id:
+            self.public_id = str(uuid.uuid4())
+
+    def pending(self) -> bool:
+        """The job is queued or running"""
+        return self.status in (self.QUEUED, self.RUNNING)
+
+
 @dataclass(frozen=True)
 class ResponseContext:
     """Response Context"""
@@ -102,26 +177,112 @@ class ResponseContext:
         )
 
 
-@dataclass
+@dataclass(frozen=True)
+class Query:
+    """Filters, sort and fields requested, engines translate it"""
+
+    filters: Tuple[Tuple[str, str, Any], ...] = ()  # field, operator, value.
+    sort: Tuple[Tuple[str, int], ...] = ()  # field, `1` or `-1`.
+    fields: Tuple[str, ...] = ()
+
+
+@dataclass(init=False)
 class RequestContext:
-    """Request Context"""
+    """Request Context, the body and query params are parsed on first access"""
 
     method: str
     headers: dict
-    body: Any
     original_path: str
-    model: Union[Model, None] = None
-    query_params: dict = field(default_factory=dict)
-    features: Feature = field(default_factory=Feature)
+    model: Union[Model, None]
+    features: Feature
+    route: Union[Tuple[str, Union[str, None]], None]
+    raw_body: bytes
+    raw_query_params: Any  # Query params of the request, not serialized.
+
+    def __init__(
+        self,
+        method: str,
+        headers: dict,
+        body: Any = None,
+        original_path: str = "",
+        model: Union[Model, None] = None,
+        query_params: Union[dict, None] = None,
+        features: Union[Feature, None] = None,
+        route: Union[Tuple[str, Union[str, None]], None] = None,
+        raw_body: bytes = b"",
+        raw_query_params: Any = None,
+    ):
+        """
+        Args:
+            method (str): HTTP method.
+            headers (dict): Request headers.
+            body (Any, optional): Body parsed, `None` parses `raw_body` on access.
+            original_path (str, optional): Request path.
+            model (Union[Model, None], optional): Model of the path.
+            query_params (Union[dict, None], optional): Query params serialized,
+                `None` serializes `raw_query_params` on access.
+            features (Union[Feature, None], optional): Features allowed.
+            route (Union[Tuple[str, Union[str, None]], None], optional): Path and
+                resource id, split on access if `None`.
+            raw_body (bytes, optional): Body of the request, not parsed.
+            raw_query_params (Any, optional): Query params of the request.
+        """
+        self.method = method
+        self.headers = headers
+        self.original_path = original_path
+        self.model = model
+        self.features = features if features is not None else Feature()
+        self.route = route
+        self.raw_body = raw_body
+        self.raw_query_params = raw_query_params
+        if body is not None:
+            self.body = body
+        if query_params is not None:
+            self.query_params = query_params
+
+    @property
+    def body(self) -> Any:
+        """Get the body, `{}` if empty or not a JSON"""
+        if "_body" not in self.__dict__:
+            try:
+                self._body = json.loads(self.raw_body) if self.raw_body else {}
+            except ValueError:
+                self._body = {}
+        return self._body
+
+    @body.setter
+    def body(self, value: Any) -> None:
+        self._body = value
+
+    @property
+    def query_params(self) -> dict:
+        """Get the query params serialized"""
+        if "_query_params" not in self.__dict__:
+            self._query_params = ContextSerializer.query_params(self.raw_query_params)
+        return self._query_params
+
+    @query_params.setter
+    def query_params(self, value: dict) -> None:
+        self._query_params = value
 
     @property
     def path(self) -> str:
         """Get path"""
-        p, _ = split_uuid_path(self.original_path)
+        p, _ = self.split()
         return p
 
     @property
     def resource_id(self) -> str:
         """Get resource id"""
-        _, uid = split_uuid_path(self.original_path)
+        _, uid = self.split()
         return uid
+
+    def split(self) -> Tuple[str, Union[str, None]]:
+        """Split the path and resource id once.
+
+        Returns:
+            Tuple[str, Union[str, None]]: path and resource id.
+        """
+        if self.route is None:
+            self.route = split_uuid_path(self.original_path)
+        return self.route
@@ -1,44 +1,31 @@
-import json
-
 from fastapi import Request
 
+from api.configs import route_config
 from api.datastructures import RequestContext
 from api.features.config import get_feature_middleware
-from api.serializers.context import ContextSerializer
-
-
-async def validate_body(request: Request) -> dict:
-    """Validate request body
-
-    Args:
-        request (Request): request object.
-
-    Returns:
-        dict: Json valid.
-    """
-    try:
-        return await request.json()
-    except json.decoder.JSONDecodeError:
-        return {}
+from api.metrics import metrics
+from api.utils import paths_without_slash
 
 
+@metrics.timed(metrics.phases, "context")
 async def get_context(request: Request) -> RequestContext:
-    """Get context from request.
+    """Get context from request, the body is read only for write methods.
 
     Args:
         request (Request): Request object.
 
     Returns:
-        RequestContext: Input context.
+        RequestContext: Input context, parsed on first access.
     """
-    body = await validate_body(request)
-    params = ContextSerializer.query_params(request.query_params)
+    raw_body = b""
+    if request.method in route_config.HTTPMethod.with_body():
+        raw_body = await request.body()
     return RequestContext(
-        body=body,
         headers=request.headers,
         method=request.method,
         original_path=request.url.path,
-        query_params=params,
+        raw_body=raw_body,
+        raw_query_params=request.query_params,
     )
 
 
@@ -48,6 +35,9 @@ async def global_middleware(request: Request) -> None:
     Args:
         request (Request): request object.
     """
+    if paths_without_slash(request.url.path) == route_config.RouterAdmin.PING:
+        return
+
     context = await get_context(request)
     context_modified = await get_feature_middleware(context)
     if context_modified:
@@ -1,6 +1,44 @@
+import importlib
+from typing import Any
+from typing import Tuple
+
 from api.configs import app_configs
-from api.engines.mongo import db as db_mongo
 
-ENGINE_TYPES = {"MONGO": db_mongo}
+# Module of each engine, only the engine configured is imported and built.
+ENGINE_TYPES = {
+    "MONGO": "api.engines.mongo",
+    "MEMORY": "api.engines.memory",
+    "SQLITE": "api.engines.sqlite",
+}
+
+
+def engine_module(name: str) -> Any:
+    """Import the module of an engine.
+
+    Args:
+        name (str): Engine name, case insensitive.
+
+    Returns:
+        Any: Module with `build` and `close`.
+    """
+    return importlib.import_module(ENGINE_TYPES[name.upper()])
+
+
+def build_engine(name: str) -> Tuple[Any, Any]:
+    """Build the database and models watcher of an engine.
+
+    Args:
+        name (str): Engine name, case insensitive.
+
+    Returns:
+        Tuple[Any, Any]: Database and watcher.
+    """
+    return engine_module(name).build()
+
+
+def close_engine() -> None:
+    """Close the connections of the engine configured, it is not usable."""
+    engine_module(app_configs.ENGINE_NAME).close(db)
+
 
-db = ENGINE_TYPES[app_configs.ENGINE_NAME.upper()]
+db, watcher = build_engine(app_configs.ENGINE_NAME)
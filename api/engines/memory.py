@@ -0,0 +1,688 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from bson import json_util
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import OperationFailure
+from pymongo.results import DeleteResult
+from pymongo.results import InsertManyResult
+from pymongo.results import InsertOneResult
+from pymongo.results import UpdateResult
+
+from api.configs import app_configs
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()  # Value of the fields not in a document.
+
+
+def copy(value: Any) -> Any:
+    """Copy the dicts and lists of a document, other values are immutable.
+
+    Args:
+        value (Any): Document or value.
+
+    Returns:
+        Any: Copy.
+    """
+    if isinstance(value, dict):
+        return {k: copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy(v) for v in value]
+    return value
+
+
+def hashable(value: Any) -> Any:
+    """Build an index key from a value.
+
+    Args:
+        value (Any): Field value.
+
+    Returns:
+        Any: Hashable value.
+    """
+    if isinstance(value, dict):
+        return tuple((k, hashable(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(hashable(v) for v in value)
+    return value
+
+
+def get_field(document: dict, field: str) -> Any:
+    """Get a field, nested fields are dotted.
+
+    Args:
+        document (dict): Document.
+        field (str): Field name.
+
+    Returns:
+        Any: Value, `MISSING` if it does not exist.
+    """
+    value = document
+    for name in field.split("."):
+        if not isinstance(value, dict) or name not in value:
+            return MISSING
+        value = value[name]
+    return value
+
+
+def set_field(document: dict, field: str, value: Any) -> None:
+    """Set a field, nested fields are dotted.
+
+    Args:
+        document (dict): Document.
+        field (str): Field name.
+        value (Any): Value.
+    """
+    names = field.split(".")
+    for name in names[:-1]:
+        document = document.setdefault(name, {})
+    document[names[-1]] = value
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """Order values of different types like Mongo does.
+
+    Args:
+        value (Any): Field value.
+
+    Returns:
+        Tuple[int, Any]: Type rank and value.
+    """
+    if value is MISSING or value is None:
+        return 0, 0
+    if isinstance(value, bool):
+        return 7, value
+    if isinstance(value, (int, float)):
+        return 1, value
+    if isinstance(value, str):
+        return 2, value
+    if isinstance(value, dict):
+        return 3, str(value)
+    if isinstance(value, list):
+        return 4, str(value)
+    if isinstance(value, ObjectId):
+        return 6, value
+    if isinstance(value, datetime):
+        return 8, value
+    return 9, str(value)
+
+
+def compare(value: Any, operator: str, expected: Any) -> bool:
+    """Compare a field value with an operator.
+
+    Args:
+        value (Any): Field value, `MISSING` if it does not exist.
+        operator (str): Mongo operator.
+        expected (Any): Operator argument.
+
+    Raises:
+        OperationFailure: If the operator is not supported.
+
+    Returns:
+        bool: `True` if it matches.
+    """
+    if operator == "$eq":
+        return equals(value, expected)
+    if operator == "$ne":
+        return not equals(value, expected)
+    if operator == "$in":
+        return any(equals(value, item) for item in expected)
+    if operator == "$nin":
+        return not any(equals(value, item) for item in expected)
+    if operator == "$exists":
+        return (value is not MISSING) == bool(expected)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        values = value if isinstance(value, list) else [value]
+        return any(order(item, operator, expected) for item in values)
+    raise OperationFailure(f"unknown operator: {operator}")
+
+
+def equals(value: Any, expected: Any) -> bool:
+    """Mongo equality, `None` matches missing fields and arrays their items.
+
+    Args:
+        value (Any): Field value.
+        expected (Any): Value expected.
+
+    Returns:
+        bool: `True` if it matches.
+    """
+    if value is MISSING:
+        return expected is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(equals(item, expected) for item in value)
+    if isinstance(value, bool) != isinstance(expected, bool):
+        return False
+    return value == expected
+
+
+def order(value: Any, operator: str, expected: Any) -> bool:
+    """Range comparison between values of the same type.
+
+    Args:
+        value (Any): Field value.
+        operator (str): `$gt`, `$gte`, `$lt` or `$lte`.
+        expected (Any): Value expected.
+
+    Returns:
+        bool: `True` if it matches.
+    """
+    rank, value = sort_key(value)
+    expected_rank, expected = sort_key(expected)
+    if rank != expected_rank:
+        return False
+    if operator == "$gt":
+        return value > expected
+    if operator == "$gte":
+        return value >= expected
+    if operator == "$lt":
+        return value < expected
+    return value <= expected
+
+
+def match(document: dict, query: dict) -> bool:
+    """Check if a document matches a Mongo query.
+
+    Args:
+        document (dict): Document.
+        query (dict): Query with `$and`, `$or` and field operators.
+
+    Returns:
+        bool: `True` if it matches.
+    """
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(match(document, q) for q in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(match(document, q) for q in condition):
+                return False
+            continue
+
+        value = get_field(document, key)
+        if isinstance(condition, dict) and condition and all(
+            op.startswith("$") for op in condition
+        ):
+            if not all(compare(value, op, arg) for op, arg in condition.items()):
+                return False
+        elif not equals(value, condition):
+            return False
+    return True
+
+
+def project(document: dict, projection: Union[dict, None]) -> dict:
+    """Apply a Mongo projection to a copy of the document.
+
+    Args:
+        document (dict): Document.
+        projection (Union[dict, None]): Inclusion or exclusion projection.
+
+    Returns:
+        dict: Document projected.
+    """
+    document = copy(document)
+    if not projection:
+        return document
+
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if any(fields.values()):
+        projected = {}
+        if include_id and "_id" in document:
+            projected["_id"] = document["_id"]
+        for field in fields:
+            value = get_field(document, field)
+            if value is not MISSING:
+                set_field(projected, field, value)
+        return projected
+
+    for field in fields:
+        names = field.split(".")
+        parent = get_field(document, ".".join(names[:-1])) if names[1:] else document
+        if isinstance(parent, dict):
+            parent.pop(names[-1], None)
+    if not include_id:
+        document.pop("_id", None)
+    return document
+
+
+def apply_update(document: dict, update: dict) -> dict:
+    """Apply `$set` and `$inc` operators to a document.
+
+    Args:
+        document (dict): Document, it is modified.
+        update (dict): Mongo update.
+
+    Raises:
+        OperationFailure: If the operator is not supported.
+
+    Returns:
+        dict: Document updated.
+    """
+    for operator, fields in update.items():
+        if operator not in ("$set", "$inc"):
+            raise OperationFailure(f"unknown update operator: {operator}")
+        for field, value in fields.items():
+            if operator == "$inc":
+                current = get_field(document, field)
+                value += 0 if current is MISSING else current
+            set_field(document, field, copy(value))
+    return document
+
+
+class MemoryCursor:
+    """Cursor of a `MemoryCollection`, like the Motor one"""
+
+    def __init__(self, collection: "MemoryCollection", query: dict, projection: Any):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key: Union[str, List[Tuple[str, int]]], direction: int = 1):
+        self._sort = [(key, direction)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def _evaluate(self) -> List[dict]:
+        documents = self.collection.search(self.query)
+        for field, direction in reversed(self._sort):
+            documents.sort(
+                key=lambda d: sort_key(get_field(d, field)), reverse=direction < 0
+            )
+        start = self._skip
+        end = start + self._limit if self._limit else None
+        return [project(d, self.projection) for d in documents[start:end]]
+
+    async def to_list(self, length: Union[int, None] = None) -> List[dict]:
+        results = self._evaluate()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        self._results = iter(self._evaluate())
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    """Collection of documents in a dict by `_id`, with hash indexes"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._documents = OrderedDict()
+        self._indexes = {}  # Field to value key to `_id` set.
+        self._unique = set()  # Fields with unique indexes.
+
+    # Indexes
+    async def create_index(self, keys: Union[str, list], unique: bool = False) -> str:
+        fields = [keys] if isinstance(keys, str) else [k for k, _ in keys]
+        if len(fields) == 1:
+            self.ensure_index(fields[0], unique)
+        # Compound indexes only sort in Mongo, memory sorts on read.
+        return "_".join(f"{field}_1" for field in fields)
+
+    def ensure_index(self, field: str, unique: bool) -> None:
+        """Build a hash index if it does not exist.
+
+        Args:
+            field (str): Field indexed.
+            unique (bool): Reject duplicated values.
+
+        Raises:
+            DuplicateKeyError: If `unique` and values are duplicated.
+        """
+        if field in self._indexes:
+            return
+
+        index = {}
+        for _id, document in self._documents.items():
+            key = hashable(get_field(document, field))
+            if unique and index.get(key):
+                raise DuplicateKeyError(f"E11000 duplicate key {field}: {key}", 11000)
+            index.setdefault(key, set()).add(_id)
+        self._indexes[field] = index
+        if unique:
+            self._unique.add(field)
+
+    def index_information(self) -> List[Tuple[str, bool]]:
+        """Fields indexed and if they are unique."""
+        return [(field, field in self._unique) for field in self._indexes]
+
+    def _check_unique(self, document: dict, _id: Any = None) -> None:
+        for field in self._unique:
+            key = hashable(get_field(document, field))
+            ids = self._indexes[field].get(key, ())
+            if any(other != _id for other in ids):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} "
+                    f"index: {field}_1 dup key: {{ {field}: {key!r} }}",
+                    11000,
+                )
+
+    def _index(self, document: dict) -> None:
+        for field, index in self._indexes.items():
+            key = hashable(get_field(document, field))
+            index.setdefault(key, set()).add(document["_id"])
+
+    def _unindex(self, document: dict) -> None:
+        for field, index in self._indexes.items():
+            key = hashable(get_field(document, field))
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(document["_id"])
+                if not ids:
+                    del index[key]
+
+    # Reads
+    def search(self, query: dict) -> List[dict]:
+        """Documents matching a query, hash indexes are used for equalities.
+
+        Args:
+            query (dict): Mongo query.
+
+        Returns:
+            List[dict]: Documents stored, they must not be modified.
+        """
+        candidates = self._candidates(query)
+        if candidates is None:
+            candidates = self._documents.values()
+        return [d for d in candidates if match(d, query)]
+
+    def _candidates(self, query: dict) -> Union[List[dict], None]:
+        if "_id" in query and not isinstance(query["_id"], dict):
+            document = self._documents.get(query["_id"])
+            return [document] if document else []
+        for field, index in self._indexes.items():
+            condition = query.get(field, MISSING)
+            if isinstance(condition, dict) and list(condition) == ["$eq"]:
+                condition = condition["$eq"]
+            if condition is MISSING or isinstance(condition, (dict, list)):
+                continue
+            if condition is None:
+                continue  # `None` also matches documents without the field.
+            ids = index.get(hashable(condition), ())
+            return [self._documents[_id] for _id in ids]
+        return None
+
+    def find(self, query: dict = None, projection: Any = None) -> MemoryCursor:
+        return MemoryCursor(self, query, projection)
+
+    async def find_one(self, query: dict = None, projection: Any = None):
+        documents = self.search(query or {})
+        return project(documents[0], projection) if documents else None
+
+    async def count_documents(self, query: dict, limit: int = 0) -> int:
+        count = len(self.search(query))
+        return min(count, limit) if limit else count
+
+    async def estimated_document_count(self) -> int:
+        return len(self._documents)
+
+    # Writes
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        self._insert(document)
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True):
+        inserted, errors = [], []
+        for index, document in enumerate(documents):
+            try:
+                self._insert(document)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+                continue
+            inserted.append(document["_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertManyResult(inserted, True)
+
+    def _insert(self, document: dict) -> None:
+        # Like Mongo, the `_id` generated is set in the document sent.
+        document.setdefault("_id", ObjectId())
+        stored = copy(document)
+        if stored["_id"] in self._documents:
+            raise DuplicateKeyError(f"E11000 duplicate key _id: {stored['_id']}", 11000)
+        self._check_unique(stored)
+        self._documents[stored["_id"]] = stored
+        self._index(stored)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False):
+        return self._update(query, update, upsert, many=True)
+
+    def _update(self, query: dict, update: dict, upsert: bool, many: bool):
+        documents = self.search(query)
+        if not many:
+            documents = documents[:1]
+        if not documents and upsert:
+            document = {
+                k: v
+                for k, v in query.items()
+                if not k.startswith("$") and not isinstance(v, dict)
+            }
+            self._insert(apply_update(document, update))
+            raw = {"n": 1, "nModified": 0, "upserted": document["_id"]}
+            return UpdateResult(raw, True)
+
+        modified = 0
+        for document in documents:
+            updated = apply_update(copy(document), update)
+            if updated == document:
+                continue
+            self._check_unique(updated, document["_id"])
+            self._unindex(document)
+            self._documents[document["_id"]] = updated
+            self._index(updated)
+            modified += 1
+        return UpdateResult({"n": len(documents), "nModified": modified}, True)
+
+    async def delete_one(self, query: dict) -> DeleteResult:
+        return self._delete(query, many=False)
+
+    async def delete_many(self, query: dict) -> DeleteResult:
+        return self._delete(query, many=True)
+
+    def _delete(self, query: dict, many: bool) -> DeleteResult:
+        documents = self.search(query)
+        if not many:
+            documents = documents[:1]
+        for document in documents:
+            self._unindex(document)
+            del self._documents[document["_id"]]
+        return DeleteResult({"n": len(documents)}, True)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("change streams are not supported in memory.")
+
+
+class MemoryEngine:
+    """In-process database with the Motor API used by the repositories"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(name)
+        return collection
+
+    async def drop_collection(self, name: str) -> None:
+        self._collections.pop(name, None)
+
+    def snapshot(self) -> dict:
+        """Copy all collections with their indexes.
+
+        Stored documents are replaced on update, never changed in place, so
+        copying the lists is enough to keep the snapshot consistent.
+
+        Returns:
+            dict: Indexes and documents by collection name.
+        """
+        return {
+            name: {
+                "indexes": collection.index_information(),
+                "documents": list(collection._documents.values()),
+            }
+            for name, collection in self._collections.items()
+        }
+
+    def dumps(self) -> str:
+        """Serialize all collections with their indexes.
+
+        Returns:
+            str: Extended JSON, it keeps `ObjectId` and datetimes.
+        """
+        return json_util.dumps(self.snapshot())
+
+    def loads(self, raw: str) -> None:
+        """Replace all collections from a snapshot.
+
+        Args:
+            raw (str): Extended JSON built by `dumps`.
+        """
+        self._collections = {}
+        for name, data in json_util.loads(raw).items():
+            collection = self[name]
+            for field, unique in data["indexes"]:
+                collection.ensure_index(field, unique)
+            for document in data["documents"]:
+                collection._insert(document)
+
+
+class MemorySnapshot:
+    """Save the memory engine to disk, in place of a models watcher.
+
+    The snapshot is restored on start, saved every `interval` seconds and on
+    stop. Models are not invalidated, the engine lives in one process.
+    """
+
+    def __init__(self, client: MemoryEngine, path: str, interval: float):
+        """
+        Args:
+            client (MemoryEngine): Memory database.
+            path (str): Snapshot file, empty disables snapshots.
+            interval (float): Seconds between snapshots, `0` only on stop.
+        """
+        self.client = client
+        self.path = path
+        self.interval = interval
+        self._task = None
+
+    def start(self, registry: Any = None) -> None:
+        """Restore the snapshot and save it in background.
+
+        Args:
+            registry (Any, optional): Not used, models live in this process.
+        """
+        if not self.path:
+            return
+        self.restore()
+        if self.interval and self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Stop saving and save the last snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.path:
+            await self.save()
+
+    async def run(self) -> None:
+        """Save snapshots periodically."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+
+    def restore(self) -> None:
+        """Load the snapshot if it exists."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            raw = f.read()
+        self.client.loads(raw)
+
+    async def save(self) -> None:
+        """Write the snapshot atomically.
+
+        The data is copied on the loop, encoding and writing it run in a thread.
+        """
+        data = self.client.snapshot()
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, self.write, data)
+        except OSError as e:
+            logger.warning(f"memory snapshot not saved: {e}")
+
+    def write(self, data: dict) -> None:
+        """Encode a snapshot in a temporal file and replace the last one.
+
+        Args:
+            data (dict): Snapshot built by `MemoryEngine.snapshot`.
+        """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(json_util.dumps(data))
+        os.replace(tmp, self.path)
+
+
+def build() -> Tuple[MemoryEngine, MemorySnapshot]:
+    """Build the memory engine and its snapshot.
+
+    Returns:
+        Tuple[MemoryEngine, MemorySnapshot]: Database and watcher.
+    """
+    db = MemoryEngine()
+    watcher = MemorySnapshot(
+        db,
+        app_configs.MEMORY_SNAPSHOT_PATH,
+        app_configs.MEMORY_SNAPSHOT_INTERVAL,
+    )
+    return db, watcher
+
+
+def close(db: MemoryEngine) -> None:
+    """Nothing to close, the rows live in the process.
+
+    Args:
+        db (MemoryEngine): Database.
+    """
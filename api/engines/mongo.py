@@ -1,6 +1,144 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any
+from typing import Tuple
+from typing import Union
+
 import motor.motor_asyncio
+from pymongo import monitoring
+from pymongo import read_preferences
+from pymongo.errors import PyMongoError
 
 from api.configs import app_configs
+from api.metrics import Metrics
+from api.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCES = {
+    "primary": read_preferences.Primary,
+    "primarypreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondarypreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+
+def read_preference(mode: str, max_staleness: int) -> Any:
+    """Build the read preference of the reads that can be served by secondaries.
+
+    Args:
+        mode (str): Read preference name, case insensitive.
+        max_staleness (int): Seconds a secondary can lag, `0` is not bounded.
+
+    Raises:
+        ValueError: If the staleness is lower than the minimum of the drivers.
+
+    Returns:
+        Any: Read preference, `None` for `primary`.
+    """
+    if max_staleness and not max_staleness >= app_configs.MONGO_MIN_STALENESS:
+        raise ValueError(
+            f"max staleness must be 0 or {app_configs.MONGO_MIN_STALENESS} or more."
+        )
+    preference = READ_PREFERENCES[mode.lower()]
+    if preference is read_preferences.Primary:
+        return None
+    return preference(max_staleness=max_staleness or -1)
+
+
+def client_options() -> dict:
+    """Options of the Motor client from the configs.
+
+    Returns:
+        dict: Client keyword arguments.
+    """
+    options = {
+        "maxPoolSize": app_configs.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": app_configs.MONGO_MIN_POOL_SIZE,
+    }
+    if app_configs.MONGO_WAIT_QUEUE_TIMEOUT:
+        options["waitQueueTimeoutMS"] = int(app_configs.MONGO_WAIT_QUEUE_TIMEOUT * 1000)
+    if app_configs.MONGO_COMPRESSORS:
+        options["compressors"] = app_configs.MONGO_COMPRESSORS
+    if app_configs.MONGO_CAFILE:
+        options.update({"tls": True, "tlsCAFile": app_configs.MONGO_CAFILE})
+    if metrics.enabled:
+        options["event_listeners"] = [PoolListener(metrics)]
+    return options
+
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Record the connection pools usage, to size them by process.
+
+    Events are published by the driver threads, the time waiting a connection
+    is measured by thread since a thread checks out one connection at a time.
+    """
+
+    def __init__(self, metrics: Metrics):
+        """
+        Args:
+            metrics (Metrics): Metrics recorded.
+        """
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def label(address: Tuple[str, Union[int, None]]) -> str:
+        host, port = address
+        return f"{host}:{port}" if port else host
+
+    def pool_created(self, event):
+        size = event.options.get("maxPoolSize", 0)
+        self.metrics.pool_size.set(size, self.label(event.address))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.metrics.pool_connections.inc(self.label(event.address))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.metrics.pool_connections.inc(self.label(event.address), value=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.start = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        address = self.label(event.address)
+        with self._lock:
+            self.observe_wait(address)
+            self.metrics.pool_failures.inc(address, event.reason)
+
+    def connection_checked_out(self, event):
+        address = self.label(event.address)
+        with self._lock:
+            self.observe_wait(address)
+            self.metrics.pool_checked_out.inc(address)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.metrics.pool_checked_out.inc(self.label(event.address), value=-1)
+
+    def observe_wait(self, address: str) -> None:
+        start = getattr(self._local, "start", None)
+        if start is not None:
+            self._local.start = None
+            self.metrics.pool_wait.observe(time.perf_counter() - start, address)
 
 
 class MongoEngine(object):
@@ -10,14 +148,146 @@ class MongoEngine(object):
 
     def __new__(cls):
         if MongoEngine._instance is None:
-            extras = {}
-            if app_configs.MONGO_CAFILE:
-                extras = {"tls": True, "tlsCAFile": app_configs.MONGO_CAFILE}
             client = motor.motor_asyncio.AsyncIOMotorClient(
-                app_configs.ENGINE_URI, **extras
+                app_configs.ENGINE_URI, **client_options()
             )
             MongoEngine._instance = client[app_configs.ENGINE_DB_NAME]
         return MongoEngine._instance
 
 
-db = MongoEngine()
+class MongoWatcher:
+    """Invalidate registry models changed by other processes.
+
+    Watches the admin collection through change streams, when they are not
+    available (standalone servers) it polls the models version document.
+    """
+
+    AUTO = "AUTO"
+    POLL = "POLL"
+    OFF = "OFF"
+
+    def __init__(self, client: Any, mode: str, interval: float):
+        """
+        Args:
+            client (Any): Mongo database.
+            mode (str): `AUTO`, `POLL` or `OFF`.
+            interval (float): Seconds between version polls.
+        """
+        self.client = client
+        self.mode = mode.upper()
+        self.interval = interval
+        self.registry = None
+        self._task = None
+
+    def start(self, registry: Any) -> None:
+        """Start watching in background.
+
+        Args:
+            registry (Any): Registry to invalidate.
+        """
+        if self.mode == self.OFF or self._task is not None:
+            return
+        self.registry = registry
+        self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        """Watch changes, fallback to polling."""
+        if self.mode == self.AUTO:
+            try:
+                await self.watch()
+            except PyMongoError as e:
+                logger.info(f"change streams unavailable, polling version: {e}")
+        await self.poll()
+
+    async def watch(self) -> None:
+        """Consume the change stream of the admin collection."""
+        collection = self.client[app_configs.MODEL_ADMIN_NAME]
+        async with collection.watch(full_document="updateLookup") as stream:
+            async for change in stream:
+                self.on_change(change)
+
+    def on_change(self, change: dict) -> None:
+        """Evict the model changed.
+
+        Args:
+            change (dict): Change stream event.
+        """
+        document = change.get("fullDocument") or {}
+        name = document.get("name")
+        if name:
+            self.registry.remove(name)
+            return
+        # Deletes only carry the `_id`, the model is unknown.
+        self.registry.clear()
+
+    async def poll(self) -> None:
+        """Poll the models version document."""
+        version = None
+        while True:
+            version = await self.check(version)
+            await asyncio.sleep(self.interval)
+
+    async def check(self, version: Any) -> Any:
+        """Clear the registry if the version changed.
+
+        Args:
+            version (Any): Version known, `None` on the first check.
+
+        Returns:
+            Any: Current version.
+        """
+        try:
+            current = await self.version()
+        except PyMongoError as e:
+            logger.warning(f"models version not available: {e}")
+            return version
+
+        if version is not None and current != version:
+            self.registry.clear()
+        return current
+
+    async def version(self) -> int:
+        """Get the models version.
+
+        Returns:
+            int: Current version, `0` if it does not exist.
+        """
+        obj = await self.client[app_configs.MODEL_VERSION_NAME].find_one(
+            {"_id": app_configs.MODEL_ADMIN_NAME}
+        )
+        return obj["version"] if obj else 0
+
+
+def build() -> Tuple[Any, MongoWatcher]:
+    """Build the Mongo client and its models watcher.
+
+    Returns:
+        Tuple[Any, MongoWatcher]: Database and watcher.
+    """
+    db = MongoEngine()
+    watcher = MongoWatcher(
+        db,
+        app_configs.MODEL_REGISTRY_INVALIDATION,
+        app_configs.MODEL_REGISTRY_POLL_INTERVAL,
+    )
+    return db, watcher
+
+
+def close(db: Any) -> None:
+    """Close the connections of the client.
+
+    Args:
+        db (Any): Database.
+    """
+    db.client.close()
@@ -0,0 +1,606 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from bson import json_util
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import OperationFailure
+from pymongo.results import DeleteResult
+from pymongo.results import InsertManyResult
+from pymongo.results import InsertOneResult
+from pymongo.results import UpdateResult
+
+from api.configs import app_configs
+from api.engines.memory import apply_update
+from api.engines.memory import copy
+from api.engines.memory import project
+from api.engines.mongo import MongoWatcher
+
+RANGES = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+NUMBER = "('integer', 'real')"
+
+
+def identifier(value: Any) -> str:
+    """Key of an `_id` in the `id` column, `ObjectId` keep their order as hex.
+
+    Args:
+        value (Any): Document `_id`.
+
+    Returns:
+        str: Key.
+    """
+    if isinstance(value, (ObjectId, str)):
+        return str(value)
+    return json_util.dumps(value)
+
+
+def quote(name: str) -> str:
+    """Quote a SQL identifier.
+
+    Args:
+        name (str): Table or index name.
+
+    Returns:
+        str: Identifier quoted.
+    """
+    return '"%s"' % name.replace('"', '""')
+
+
+def json_path(field: str) -> str:
+    """Build the JSON path literal of a field, nested fields are dotted.
+
+    Paths are inlined, expression indexes only match constant paths.
+
+    Args:
+        field (str): Field name.
+
+    Raises:
+        OperationFailure: If the name has quotes.
+
+    Returns:
+        str: SQL string literal.
+    """
+    if "'" in field or '"' in field:
+        raise OperationFailure(f"invalid field name: {field}")
+    return "'$%s'" % "".join(f'."{name}"' for name in field.split("."))
+
+
+def column(field: str) -> str:
+    """SQL expression of a field value.
+
+    Args:
+        field (str): Field name.
+
+    Returns:
+        str: Expression.
+    """
+    if field == "_id":
+        return "id"
+    return f"json_extract(doc, {json_path(field)})"
+
+
+def json_type(field: str) -> str:
+    """SQL expression of a field JSON type, `NULL` if it does not exist.
+
+    Args:
+        field (str): Field name.
+
+    Returns:
+        str: Expression.
+    """
+    return f"json_type(doc, {json_path(field)})"
+
+
+def equals(field: str, value: Any, params: list) -> str:
+    """Mongo equality of a field, types are not mixed.
+
+    Args:
+        field (str): Field name.
+        value (Any): Value expected.
+        params (list): Query params, the value is appended.
+
+    Returns:
+        str: SQL condition.
+    """
+    if field == "_id":
+        params.append(identifier(value))
+        return "id = ?"
+    if value is None:
+        return f"COALESCE({json_type(field)}, 'null') = 'null'"
+    if isinstance(value, bool):
+        return f"{json_type(field)} = '{str(value).lower()}'"
+    if isinstance(value, (int, float)):
+        params.append(value)
+        return f"{column(field)} = ? AND {json_type(field)} IN {NUMBER}"
+    if isinstance(value, str):
+        params.append(value)
+        return f"{column(field)} = ? AND {json_type(field)} = 'text'"
+    params.append(json_util.dumps(value))
+    return f"{column(field)} = json(?)"
+
+
+def compare(field: str, operator: str, value: Any, params: list) -> str:
+    """Translate a field operator.
+
+    Args:
+        field (str): Field name.
+        operator (str): Mongo operator.
+        value (Any): Operator argument.
+        params (list): Query params.
+
+    Raises:
+        OperationFailure: If the operator or the range value is not supported.
+
+    Returns:
+        str: SQL condition.
+    """
+    if operator == "$eq":
+        return equals(field, value, params)
+    if operator == "$ne":
+        return f"NOT COALESCE(({equals(field, value, params)}), 0)"
+    if operator in ("$in", "$nin"):
+        items = [f"({equals(field, item, params)})" for item in value]
+        condition = f"({' OR '.join(items)})" if items else "0"
+        return condition if operator == "$in" else f"NOT COALESCE({condition}, 0)"
+    if operator == "$exists":
+        if field == "_id":
+            return "1" if value else "0"
+        return f"{json_type(field)} IS {'NOT ' if value else ''}NULL"
+    if operator not in RANGES:
+        raise OperationFailure(f"unknown operator: {operator}")
+
+    sign = RANGES[operator]
+    if field == "_id":
+        params.append(identifier(value))
+        return f"id {sign} ?"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        params.append(value)
+        return f"{column(field)} {sign} ? AND {json_type(field)} IN {NUMBER}"
+    if isinstance(value, str):
+        params.append(value)
+        return f"{column(field)} {sign} ? AND {json_type(field)} = 'text'"
+    raise OperationFailure(f"{operator} is not supported for {type(value)}")
+
+
+def where(query: dict, params: list) -> str:
+    """Translate a Mongo query to a SQL condition.
+
+    Args:
+        query (dict): Query with `$and`, `$or` and field operators.
+        params (list): Query params, values are appended in order.
+
+    Returns:
+        str: SQL condition.
+    """
+    clauses = []
+    for key, condition in query.items():
+        if key in ("$and", "$or"):
+            parts = [f"({where(q, params)})" for q in condition]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append(f"({joiner.join(parts)})" if parts else "1")
+        elif isinstance(condition, dict) and condition and all(
+            op.startswith("$") for op in condition
+        ):
+            for op, value in condition.items():
+                clauses.append(f"({compare(key, op, value, params)})")
+        else:
+            clauses.append(f"({equals(key, condition, params)})")
+    return " AND ".join(clauses) or "1"
+
+
+def order_by(sort: List[Tuple[str, int]]) -> str:
+    """Translate a Mongo sort.
+
+    Args:
+        sort (List[Tuple[str, int]]): Fields and directions.
+
+    Returns:
+        str: SQL `ORDER BY` clause, empty keeps the insertion order.
+    """
+    if not sort:
+        return ""
+    keys = [f"{column(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in sort]
+    return " ORDER BY " + ", ".join(keys)
+
+
+class SQLitePool:
+    """Bounded pool of connections, one by worker thread.
+
+    Statements run in a thread pool of `size` workers, so at most `size`
+    connections are open. Writes are serialized in the process and run in
+    immediate transactions, other processes wait the busy timeout.
+    """
+
+    def __init__(self, path: str, size: int, timeout: float):
+        """
+        Args:
+            path (str): Database file, `:memory:` uses one connection.
+            size (int): Max connections.
+            timeout (float): Seconds waiting the database locks.
+        """
+        self.path = path
+        self.size = 1 if path == ":memory:" else max(size, 1)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections = []
+        self._executor = ThreadPoolExecutor(self.size, thread_name_prefix="sqlite")
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode, readers do not block the writer.
+
+        Returns:
+            sqlite3.Connection: Connection in autocommit mode.
+        """
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._connections.append(conn)
+        return conn
+
+    async def read(self, fn: Callable, *args) -> Any:
+        """Run a function with a connection in the thread pool.
+
+        Args:
+            fn (Callable): Function receiving the connection and `args`.
+
+        Returns:
+            Any: Function result.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    async def write(self, fn: Callable, *args) -> Any:
+        """Run a function in a transaction, rolled back if it fails.
+
+        Args:
+            fn (Callable): Function receiving the connection and `args`.
+
+        Returns:
+            Any: Function result.
+        """
+        return await self.read(self._transaction, fn, args)
+
+    def _call(self, fn: Callable, args: tuple) -> Any:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+        try:
+            return fn(conn, *args)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e), 11000)
+        except sqlite3.Error as e:
+            raise OperationFailure(str(e))
+
+    def _transaction(self, conn: sqlite3.Connection, fn: Callable, args: tuple):
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                response = fn(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return response
+
+    def close(self) -> None:
+        """Close the thread pool and the connections, the pool is not usable."""
+        self._executor.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+
+class SQLiteCursor:
+    """Cursor of a `SQLiteCollection`, like the Motor one"""
+
+    def __init__(self, collection: "SQLiteCollection", query: dict, projection: Any):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._batch_size = 100
+
+    def sort(self, key: Union[str, List[Tuple[str, int]]], direction: int = 1):
+        self._sort = [(key, direction)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int):
+        self._batch_size = batch_size or self._batch_size
+        return self
+
+    async def _fetch(self, skip: int, limit: int) -> List[dict]:
+        documents = await self.collection.pool.read(
+            self.collection.select, self.query, self._sort, skip, limit
+        )
+        return [project(d, self.projection) for d in documents]
+
+    async def to_list(self, length: Union[int, None] = None) -> List[dict]:
+        limits = [n for n in (self._limit, length) if n]
+        return await self._fetch(self._skip, min(limits) if limits else 0)
+
+    async def __aiter__(self):
+        skip, remaining = self._skip, self._limit
+        while True:
+            size = min(self._batch_size, remaining) if remaining else self._batch_size
+            documents = await self._fetch(skip, size)
+            for document in documents:
+                yield document
+            if len(documents) < size:
+                return
+            skip += size
+            if remaining:
+                remaining -= size
+                if not remaining:
+                    return
+
+
+class SQLiteCollection:
+    """Table of JSON documents with the `_id` key as primary key"""
+
+    def __init__(self, engine: "SQLiteEngine", name: str):
+        self.engine = engine
+        self.pool = engine.pool
+        self.name = name
+        self.table = quote(name)
+
+    # Indexes
+    async def create_index(self, keys: Union[str, list], unique: bool = False) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = "_".join(f"{field}_{direction}" for field, direction in keys)
+        if keys != [("_id", 1)]:
+            await self.pool.write(self._create_index, keys, unique, name)
+        return name
+
+    def _create_index(self, conn, keys: list, unique: bool, name: str) -> None:
+        self.engine.ensure_table(conn, self.name)
+        expressions = ", ".join(
+            f"{column(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in keys
+        )
+        conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+            f"{quote(f'{self.name}_{name}')} ON {self.table} ({expressions})"
+        )
+
+    # Reads
+    def select(
+        self, conn, query: dict, sort: list, skip: int, limit: int
+    ) -> List[dict]:
+        """Documents matching a query.
+
+        Args:
+            conn (sqlite3.Connection): Connection.
+            query (dict): Mongo query.
+            sort (list): Fields and directions.
+            skip (int): Documents skipped.
+            limit (int): Max documents, `0` is not limited.
+
+        Returns:
+            List[dict]: Documents decoded.
+        """
+        self.engine.ensure_table(conn, self.name)
+        params = []
+        sql = f"SELECT doc FROM {self.table} WHERE {where(query, params)}"
+        sql += order_by(sort) + " LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, [*params, limit or -1, skip])
+        return [json_util.loads(row[0]) for row in rows]
+
+    def _count(self, conn, query: dict, limit: int = 0) -> int:
+        self.engine.ensure_table(conn, self.name)
+        params = []
+        sql = (
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.table} "
+            f"WHERE {where(query, params)} LIMIT ?)"
+        )
+        return conn.execute(sql, [*params, limit or -1]).fetchone()[0]
+
+    def find(self, query: dict = None, projection: Any = None) -> SQLiteCursor:
+        return SQLiteCursor(self, query, projection)
+
+    async def find_one(self, query: dict = None, projection: Any = None):
+        documents = await self.find(query, projection).limit(1).to_list(1)
+        return documents[0] if documents else None
+
+    async def count_documents(self, query: dict, limit: int = 0) -> int:
+        return await self.pool.read(self._count, query, limit)
+
+    async def estimated_document_count(self) -> int:
+        return await self.pool.read(self._count, {})
+
+    # Writes
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        _, errors = await self.pool.write(self._insert, [document], True)
+        if errors:
+            raise DuplicateKeyError(errors[0]["errmsg"], 11000)
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True):
+        documents = list(documents)
+        inserted, errors = await self.pool.write(self._insert, documents, ordered)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertManyResult(inserted, True)
+
+    def _insert(self, conn, documents: List[dict], ordered: bool):
+        """Insert documents in one statement, row by row if one fails.
+
+        Returns:
+            Tuple[list, list]: `_id` inserted and write errors.
+        """
+        self.engine.ensure_table(conn, self.name)
+        sql = f"INSERT INTO {self.table} (id, doc) VALUES (?, ?)"
+        rows = []
+        for document in documents:
+            # Like Mongo, the `_id` generated is set in the document sent.
+            document.setdefault("_id", ObjectId())
+            rows.append((identifier(document["_id"]), json_util.dumps(document)))
+
+        conn.execute("SAVEPOINT batch")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("RELEASE batch")
+            return [d["_id"] for d in documents], []
+        except sqlite3.IntegrityError:
+            conn.execute("ROLLBACK TO batch")
+            conn.execute("RELEASE batch")
+
+        inserted, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                conn.execute(sql, row)
+            except sqlite3.IntegrityError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+                continue
+            inserted.append(documents[index]["_id"])
+        return inserted, errors
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        return await self.pool.write(self._update, query, update, upsert, 1)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False):
+        return await self.pool.write(self._update, query, update, upsert, 0)
+
+    def _update(self, conn, query: dict, update: dict, upsert: bool, limit: int):
+        documents = self.select(conn, query, [], 0, limit)
+        if not documents and upsert:
+            document = {
+                k: v
+                for k, v in query.items()
+                if not k.startswith("$") and not isinstance(v, dict)
+            }
+            apply_update(document, update)
+            _, errors = self._insert(conn, [document], True)
+            if errors:
+                raise DuplicateKeyError(errors[0]["errmsg"], 11000)
+            raw = {"n": 1, "nModified": 0, "upserted": document["_id"]}
+            return UpdateResult(raw, True)
+
+        rows = []
+        for document in documents:
+            updated = apply_update(copy(document), update)
+            if updated != document:
+                rows.append((json_util.dumps(updated), identifier(document["_id"])))
+        conn.executemany(f"UPDATE {self.table} SET doc = ? WHERE id = ?", rows)
+        return UpdateResult({"n": len(documents), "nModified": len(rows)}, True)
+
+    async def delete_one(self, query: dict) -> DeleteResult:
+        return await self.pool.write(self._delete, query, 1)
+
+    async def delete_many(self, query: dict) -> DeleteResult:
+        return await self.pool.write(self._delete, query, -1)
+
+    def _delete(self, conn, query: dict, limit: int) -> DeleteResult:
+        self.engine.ensure_table(conn, self.name)
+        params = []
+        sql = (
+            f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM "
+            f"{self.table} WHERE {where(query, params)} LIMIT ?)"
+        )
+        cursor = conn.execute(sql, [*params, limit])
+        return DeleteResult({"n": cursor.rowcount}, True)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("change streams are not supported in sqlite.")
+
+
+class SQLiteEngine:
+    """SQLite database with the Motor API used by the repositories.
+
+    Each collection is a table of JSON documents, fields are read with the
+    JSON1 functions and indexed by expression indexes.
+    """
+
+    def __init__(self, path: str, pool_size: int, timeout: float):
+        """
+        Args:
+            path (str): Database file, it is opened on the first query.
+            pool_size (int): Max connections.
+            timeout (float): Seconds waiting the database locks.
+        """
+        self.pool = SQLitePool(path, pool_size, timeout)
+        self._collections = {}
+        self._tables = set()
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = SQLiteCollection(self, name)
+        return collection
+
+    def ensure_table(self, conn: sqlite3.Connection, name: str) -> None:
+        """Create the table of a collection if it does not exist.
+
+        Args:
+            conn (sqlite3.Connection): Connection.
+            name (str): Collection name.
+        """
+        if name in self._tables:
+            return
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote(name)} "
+            "(id TEXT PRIMARY KEY, doc TEXT NOT NULL)"
+        )
+        self._tables.add(name)
+
+    async def drop_collection(self, name: str) -> None:
+        self._tables.discard(name)
+        await self.pool.write(self._drop, name)
+
+    @staticmethod
+    def _drop(conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(f"DROP TABLE IF EXISTS {quote(name)}")
+
+
+def build() -> Tuple[SQLiteEngine, MongoWatcher]:
+    """Build the SQLite engine and its models watcher.
+
+    Returns:
+        Tuple[SQLiteEngine, MongoWatcher]: Database and watcher.
+    """
+    db = SQLiteEngine(
+        app_configs.SQLITE_PATH,
+        app_configs.SQLITE_POOL_SIZE,
+        app_configs.SQLITE_BUSY_TIMEOUT,
+    )
+    # Processes share the file, models are invalidated polling their version.
+    watcher = MongoWatcher(
+        db,
+        app_configs.MODEL_REGISTRY_INVALIDATION,
+        app_configs.MODEL_REGISTRY_POLL_INTERVAL,
+    )
+    return db, watcher
+
+
+def close(db: SQLiteEngine) -> None:
+    """Close the connections and threads of the pool.
+
+    Args:
+        db (SQLiteEngine): Database.
+    """
+    db.pool.close()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from api.configs import app_configs
+
+logger = logging.getLogger(__name__)
+
+# Inserts rows of a model, returns the identifiers created and rows failed.
+Insert = Callable[[str, List[dict]], Awaitable[Tuple[List[str], List[Tuple[int, str]]]]]
+
+
+class IngestQueue:
+    """Bounded queue of the rows of a model, inserted in batches in background.
+
+    The task waits the first row, then up to `wait` seconds or until `batch`
+    rows are queued, and inserts all the rows queued in batches.
+    """
+
+    def __init__(self, name: str, insert: Insert, size: int, batch: int, wait: float):
+        """
+        Args:
+            name (str): Model name.
+            insert (Insert): Function inserting many rows.
+            size (int): Max rows queued.
+            batch (int): Rows by insert.
+            wait (float): Max seconds a row waits a full batch.
+        """
+        self.name = name
+        self.insert = insert
+        self.size = size
+        self.batch = batch
+        self.wait = wait
+        self._rows = deque()
+        self._wakeup = None
+        self._task = None
+        self._stopped = False
+
+    def put(self, row: dict) -> bool:
+        """Queue a row, the task is started on the first one.
+
+        Args:
+            row (dict): Row validated.
+
+        Returns:
+            bool: `False` if the queue is full.
+        """
+        if len(self._rows) >= self.size:
+            return False
+        if self._task is None:
+            # Created in the running loop.
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self.run())
+
+        self._rows.append(row)
+        if len(self._rows) == 1 or len(self._rows) == self.batch:
+            self._wakeup.set()
+        return True
+
+    async def run(self) -> None:
+        """Insert the rows queued until it is stopped, the insert running is
+        never cancelled so its rows are not lost."""
+        while not self._stopped:
+            self._wakeup.clear()
+            if not self._rows:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+            if len(self._rows) < self.batch and not self._stopped:
+                await self.sleep(self.wait)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"rows of `{self.name}` not inserted, retrying: {e}")
+                if not self._stopped:
+                    await self.sleep(max(self.wait, 1))
+
+    async def sleep(self, seconds: float) -> None:
+        """Wait `seconds` or until the queue is woken up.
+
+        Args:
+            seconds (float): Max seconds.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def flush(self) -> None:
+        """Insert all the rows queued, a batch failed is queued again.
+
+        Raises:
+            Exception: If the engine fails.
+        """
+        while self._rows:
+            rows = [self._rows.popleft() for _ in range(min(self.batch, len(self._rows)))]
+            try:
+                _, failed = await self.insert(self.name, rows)
+            except Exception:
+                self._rows.extendleft(reversed(rows))
+                raise
+            for index, error in failed:
+                logger.warning(f"row {index} of `{self.name}` not inserted: {error}")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the task once its insert running is done.
+
+        Args:
+            drain (bool, optional): Insert the rows queued, else drop them.
+        """
+        if not drain:
+            self._rows.clear()
+        if self._task is not None:
+            self._stopped = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        if drain:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"{len(self._rows)} rows of `{self.name}` lost: {e}")
+        self._rows.clear()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class Ingestor:
+    """Ingestion queues by model"""
+
+    def __init__(self, size: int, wait: float):
+        """
+        Args:
+            size (int): Max rows queued by model.
+            wait (float): Default max seconds a row waits a full batch.
+        """
+        self.size = size
+        self.wait = wait
+        self._queues = {}
+
+    def put(self, name: str, options: dict, insert: Insert, row: dict) -> bool:
+        """Queue a row of a model.
+
+        Args:
+            name (str): Model name.
+            options (dict): Model `ingest` options, `batch` and `wait`.
+            insert (Insert): Function inserting many rows.
+            row (dict): Row validated.
+
+        Returns:
+            bool: `False` if the queue is full.
+        """
+        queue = self._queues.get(name)
+        batch, wait = options["batch"], options.get("wait", self.wait)
+        if queue is None:
+            queue = IngestQueue(name, insert, self.size, batch, wait)
+            self._queues[name] = queue
+        # The model can be updated.
+        queue.batch, queue.wait = batch, wait
+        return queue.put(row)
+
+    async def remove(self, name: str) -> None:
+        """Stop the queue of a model deleted, its rows are dropped.
+
+        Args:
+            name (str): Model name.
+        """
+        queue = self._queues.pop(name, None)
+        if queue is not None:
+            await queue.stop(drain=False)
+
+    async def stop(self) -> None:
+        """Insert the rows queued and stop all the queues."""
+        queues, self._queues = self._queues, {}
+        for queue in queues.values():
+            await queue.stop()
+
+
+ingestor = Ingestor(size=app_configs.INGEST_QUEUE_SIZE, wait=app_configs.INGEST_WAIT)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from api.cache import response_cache
+from api.configs import app_configs
+from api.datastructures import Job
+from api.datastructures import Model
+from api.serializers.core import CoreSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """Run the jobs queued in the engine, one at a time by process.
+
+    Jobs work in chunks of `chunk` rows, their progress is saved and the runner
+    sleeps `throttle` seconds between chunks so requests are not starved. A job
+    interrupted on shutdown is queued again and resumes after its cursor. The
+    lease of a job is renewed by chunk, a job of a process that died is taken
+    again once its lease expires.
+    """
+
+    MAX_ERRORS = 100  # Rows not valid reported by a migration.
+
+    def __init__(self, chunk: int, throttle: float, interval: float, lease: float):
+        """
+        Args:
+            chunk (int): Rows by chunk.
+            throttle (float): Seconds slept between chunks.
+            interval (float): Seconds between polls of the jobs queued.
+            lease (float): Seconds a job is owned without progress.
+        """
+        self.chunk = chunk
+        self.throttle = throttle
+        self.interval = interval
+        self.lease = lease
+        self.repository = None
+        self._wakeup = None
+        self._task = None
+
+    def start(self, repository) -> None:
+        """Start the runner.
+
+        Args:
+            repository (Repository): Repository of the jobs and rows.
+        """
+        self.repository = repository
+        # Created in the running loop.
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self.run())
+
+    def notify(self) -> None:
+        """Wake up the runner, a job was queued by this process."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Run the jobs queued until it is cancelled."""
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self.repository.claim_job(self.lease)
+            except Exception as e:
+                logger.warning(f"jobs not claimed, the engine is not available: {e}")
+                job = None
+
+            if job is not None:
+                await self.execute(job)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def execute(self, job: Job) -> None:
+        """Run a job and save its status.
+
+        Args:
+            job (Job): Job claimed.
+        """
+        handlers = {Job.DROP: self.drop, Job.MIGRATE: self.migrate}
+        try:
+            await handlers[job.kind](job)
+            job.status = Job.DONE
+        except asyncio.CancelledError:
+            job.status, job.lease_until = Job.QUEUED, None
+            await self.repository.save_job(job)
+            raise
+        except Exception as e:
+            logger.error(f"job `{job.public_id}` failed: {e}")
+            job.status, job.error = Job.FAILED, str(e)
+        await self.repository.save_job(job)
+
+    async def drop(self, job: Job) -> None:
+        """Delete the rows of a model deleted, then its collection.
+
+        Args:
+            job (Job): Job running.
+        """
+        if not job.progress["total"]:
+            job.progress["total"] = await self.repository.estimated_count(job.model)
+
+        while True:
+            deleted = await self.repository.drop_rows(job.model, self.chunk)
+            job.progress["done"] += deleted
+            if deleted < self.chunk:
+                break
+            await self.step(job)
+        await self.repository.drop_model_collection(job.model)
+
+    async def migrate(self, job: Job) -> None:
+        """Build the indexes of a model and validate its rows against its schema.
+
+        Rows valid are saved with their defaults and coercions, the rows not
+        valid are counted and a sample of their errors is reported.
+
+        Args:
+            job (Job): Job running.
+
+        Raises:
+            ValueError: If the model does not exist.
+        """
+        model = await self.repository.model_by_name(job.model)
+        if model is None:
+            raise ValueError(f"model `{job.model}` not found.")
+
+        await self.repository.create_model_indexes(model)
+        if not job.progress["total"]:
+            job.progress["total"] = await self.repository.estimated_count(model.name)
+        job.progress.setdefault("invalid", 0)
+
+        while True:
+            rows = await self.repository.rows_after(model.name, job.cursor, self.chunk)
+            for row in rows:
+                await self.migrate_row(job, model, row)
+            response_cache.invalidate(model.name)  # Rows rewritten.
+            job.progress["done"] += len(rows)
+            if rows:
+                job.cursor = rows[-1][app_configs.IDENTIFIER_ID]
+            if len(rows) < self.chunk:
+                break
+            await self.step(job)
+
+    async def migrate_row(self, job: Job, model: Model, row: dict) -> None:
+        """Validate a row and save the fields changed by the schema.
+
+        Args:
+            job (Job): Job running.
+            model (Model): Model migrated.
+            row (dict): Row stored.
+        """
+        field = app_configs.IDENTIFIER_ID
+        identifier = row[field]
+        errors, data = CoreSerializer.model(
+            row,
+            model.schema,
+            is_update=True,
+            name=model.name,
+            version=model.schema_hash,
+        )
+        if errors:
+            job.progress["invalid"] += 1
+            if len(job.errors) < self.MAX_ERRORS:
+                job.errors.append({field: identifier, "errors": errors})
+            return
+
+        changes = {k: v for k, v in data.items() if k not in row or row[k] != v}
+        if changes:
+            await self.repository.update_row(model.name, identifier, changes)
+
+    async def step(self, job: Job) -> None:
+        """Save the progress of a job, renew its lease and yield to the requests.
+
+        Args:
+            job (Job): Job running.
+        """
+        self.renew(job)
+        await self.repository.save_job(job)
+        await asyncio.sleep(self.throttle)
+
+    def renew(self, job: Job) -> None:
+        """Extend the lease of a job owned by this process.
+
+        Args:
+            job (Job): Job running.
+        """
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease)
+        job.lease_until = lease_until.isoformat()
+
+    async def stop(self) -> None:
+        """Stop the runner, the job running is queued again."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+job_runner = JobRunner(
+    chunk=app_configs.JOBS_CHUNK_SIZE,
+    throttle=app_configs.JOBS_THROTTLE,
+    interval=app_configs.JOBS_POLL_INTERVAL,
+    lease=app_configs.JOBS_LEASE,
+)
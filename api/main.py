@@ -2,21 +2,30 @@ from fastapi import Depends
 from fastapi import FastAPI
 from fastapi import Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
+from api.cache import model_registry
 from api.configs import app_configs
+from api.controllers.admin import AdminController
 from api.dependencies import global_middleware
+from api.engines import close_engine
+from api.engines import watcher
 from api.exceptions import BaseException
+from api.ingest import ingestor
+from api.jobs import job_runner
+from api.responses import JSONResponse
 from api.routers import get_routers
 
 
-app = FastAPI(dependencies=[Depends(global_middleware)])
+app = FastAPI(
+    dependencies=[Depends(global_middleware)], default_response_class=JSONResponse
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=app_configs.ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 routers = get_routers()
@@ -24,6 +33,24 @@ for r in routers:
     app.include_router(r)
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Startup tasks."""
+    watcher.start(model_registry)
+    await AdminController.reconcile_indexes()
+    job_runner.start(AdminController.repository)
+    await AdminController.load_registry()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Shutdown tasks."""
+    await ingestor.stop()
+    await job_runner.stop()
+    await watcher.stop()
+    close_engine()
+
+
 @app.exception_handler(BaseException)
 async def unicorn_exception_handler(request: Request, exc: BaseException):
     """Exception handler.
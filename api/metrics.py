@@ -0,0 +1,305 @@
+import asyncio
+import bisect
+import functools
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from api.configs import app_configs
+
+# Default Prometheus buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def escape(value: str) -> str:
+    """Escape a label value.
+
+    Args:
+        value (str): Label value.
+
+    Returns:
+        str: Value escaped.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    """Counter by labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        """Increase the counter of the label values.
+
+        Args:
+            labels (str): Label values, in the order of `labels`.
+            value (float, optional): Amount. Defaults to 1.
+        """
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labels, labels)), value)
+            for labels, value in self._values.items()
+        ]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Value by labels that goes up and down"""
+
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the value of the label values.
+
+        Args:
+            value (float): Value.
+            labels (str): Label values, in the order of `labels`.
+        """
+        self._values[labels] = value
+
+
+class Histogram(Counter):
+    """Histogram by labels, buckets are cumulated on render"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...],
+        buckets: Tuple[float, ...] = BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        """Record a duration.
+
+        Args:
+            seconds (float): Duration.
+            labels (str): Label values, in the order of `labels`.
+        """
+        entry = self._values.get(labels)
+        if entry is None:
+            # Counts by bucket and `+Inf`, sum.
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+
+    def get(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in self._values.items():
+            names = dict(zip(self.labels, labels))
+            cumulated = 0
+            for bound, count in zip(bounds, counts):
+                cumulated += count
+                samples.append((f"{self.name}_bucket", {**names, "le": bound}, cumulated))
+            samples.append((f"{self.name}_sum", names, total))
+            samples.append((f"{self.name}_count", names, cumulated))
+        return samples
+
+
+class Metrics:
+    """Request, phase and engine metrics in the Prometheus text format.
+
+    When disabled, `timed` and `handler` return the functions undecorated,
+    so the hot path does not pay for them.
+    """
+
+    def __init__(self, enabled: bool):
+        """
+        Args:
+            enabled (bool): Record metrics.
+        """
+        self.enabled = enabled
+        self.requests = Counter(
+            "apiruns_requests_total",
+            "Requests handled.",
+            ("model", "method", "status"),
+        )
+        self.errors = Counter(
+            "apiruns_request_errors_total",
+            "Requests failed with a server error.",
+            ("model", "method"),
+        )
+        self.latency = Histogram(
+            "apiruns_request_duration_seconds",
+            "Request latency.",
+            ("model", "method"),
+        )
+        self.phases = Histogram(
+            "apiruns_phase_duration_seconds",
+            "Time spent by request phase.",
+            ("phase",),
+        )
+        self.engine = Histogram(
+            "apiruns_engine_duration_seconds",
+            "Engine operation latency.",
+            ("operation",),
+        )
+        self.pool_size = Gauge(
+            "apiruns_engine_pool_max_size",
+            "Max connections of the engine pool.",
+            ("address",),
+        )
+        self.pool_connections = Gauge(
+            "apiruns_engine_pool_connections",
+            "Connections open in the engine pool.",
+            ("address",),
+        )
+        self.pool_checked_out = Gauge(
+            "apiruns_engine_pool_checked_out",
+            "Connections in use of the engine pool.",
+            ("address",),
+        )
+        self.pool_wait = Histogram(
+            "apiruns_engine_pool_wait_seconds",
+            "Time waiting a connection of the engine pool.",
+            ("address",),
+        )
+        self.pool_failures = Counter(
+            "apiruns_engine_pool_checkout_failures_total",
+            "Connections not got from the engine pool.",
+            ("address", "reason"),
+        )
+        self.collectors = (
+            self.requests,
+            self.errors,
+            self.latency,
+            self.phases,
+            self.engine,
+            self.pool_size,
+            self.pool_connections,
+            self.pool_checked_out,
+            self.pool_wait,
+            self.pool_failures,
+        )
+
+    def timed(self, histogram: Histogram, *labels: str) -> Callable:
+        """Decorate a function to observe its duration.
+
+        Args:
+            histogram (Histogram): Histogram observed.
+            labels (str): Label values.
+
+        Returns:
+            Callable: Decorator.
+        """
+
+        def decorator(fn: Callable) -> Callable:
+            if not self.enabled:
+                return fn
+
+            if asyncio.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        histogram.observe(time.perf_counter() - start, *labels)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start, *labels)
+
+            return wrapper
+
+        return decorator
+
+    def handler(self, model: str = "") -> Callable:
+        """Decorate a controller `handle` to count and time its requests.
+
+        Args:
+            model (str, optional): Model label if the context has no model.
+
+        Returns:
+            Callable: Decorator.
+        """
+
+        def decorator(fn: Callable) -> Callable:
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            async def wrapper(cls, context):
+                start = time.perf_counter()
+                status_code = 500
+                try:
+                    response = await fn(cls, context)
+                    status_code = response.status_code
+                    return response
+                finally:
+                    name = context.model.name if context.model else model
+                    seconds = time.perf_counter() - start
+                    self.observe(name, context.method, status_code, seconds)
+
+            return wrapper
+
+        return decorator
+
+    def observe(self, model: str, method: str, status_code: int, seconds: float):
+        """Record a request.
+
+        Args:
+            model (str): Model name.
+            method (str): HTTP method.
+            status_code (int): Response status, `500` if it raised.
+            seconds (float): Duration.
+        """
+        self.requests.inc(model, method, str(status_code))
+        self.latency.observe(seconds, model, method)
+        if status_code >= 500:
+            self.errors.inc(model, method)
+
+    def render(self) -> str:
+        """Render the metrics.
+
+        Returns:
+            str: Prometheus text exposition.
+        """
+        lines = []
+        for collector in self.collectors:
+            lines.append(f"# HELP {collector.name} {collector.documentation}")
+            lines.append(f"# TYPE {collector.name} {collector.type}")
+            for name, labels, value in collector.samples():
+                pairs = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{pairs}}} {value}" if pairs else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Remove all the samples."""
+        for collector in self.collectors:
+            collector.clear()
+
+
+metrics = Metrics(app_configs.METRICS_ENABLED)
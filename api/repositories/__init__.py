@@ -1,11 +1,19 @@
 from api.configs import app_configs
 from api.features.config import get_feature_repository
+from api.repositories.memory import MemoryBaseRepository
+from api.repositories.memory import MemoryRepository
 from api.repositories.mongo import BaseRepository
 from api.repositories.mongo import MongoRepository
+from api.repositories.sqlite import SQLiteBaseRepository
+from api.repositories.sqlite import SQLiteRepository
 
 
-REPOSITORY_TYPES = {"MONGO": (MongoRepository, BaseRepository)}
-Repository, Base = REPOSITORY_TYPES[app_configs.ENGINE_NAME]
+REPOSITORY_TYPES = {
+    "MONGO": (MongoRepository, BaseRepository),
+    "MEMORY": (MemoryRepository, MemoryBaseRepository),
+    "SQLITE": (SQLiteRepository, SQLiteBaseRepository),
+}
+Repository, Base = REPOSITORY_TYPES[app_configs.ENGINE_NAME.upper()]
 
 
 def repository_from_feature():
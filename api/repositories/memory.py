@@ -0,0 +1,18 @@
+from api.cache import TTLCache
+from api.configs import app_configs
+from api.repositories.mongo import BaseRepository
+from api.repositories.mongo import MongoRepository
+
+
+class MemoryBaseRepository(BaseRepository):
+    """Base repository of the memory engine"""
+
+    reads = None
+
+
+class MemoryRepository(MongoRepository):
+    """Memory repository, the memory engine understands Mongo queries"""
+
+    counts = TTLCache(
+        ttl=app_configs.MONGO_COUNT_TTL, size=app_configs.MONGO_COUNT_CACHE_SIZE
+    )
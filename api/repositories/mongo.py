@@ -1,12 +1,37 @@
+import base64
+import binascii
+import functools
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import AsyncIterator
 from typing import List
 from typing import Tuple
 from typing import Union
 
+from bson import ObjectId
+from bson import json_util
 from dacite import from_dict
+from fastapi import status
+from pymongo.errors import BulkWriteError
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import PyMongoError
 
+from api.cache import model_registry
+from api.cache import SingleFlight
+from api.cache import TTLCache
 from api.configs import app_configs
+from api.datastructures import Job
 from api.datastructures import Model
+from api.datastructures import Query
 from api.engines import db
+from api.engines.mongo import read_preference
+from api.exceptions import BaseException
+from api.metrics import metrics
+
+# Types of the `id` and `value` of a cursor.
+CURSOR_SCALARS = (str, int, float, bool, type(None), datetime, ObjectId)
 
 
 class BaseRepository:
@@ -17,8 +42,33 @@ class BaseRepository:
     client = db
     query_limit = app_configs.MONGO_PAGINATION_LIMIT
     query_skip = 0
+    stream_batch_size = app_configs.MONGO_STREAM_BATCH_SIZE
+    cursor_field = app_configs.MONGO_CURSOR_FIELD
+    bulk_chunk_size = app_configs.BULK_CHUNK_SIZE
+    read_after_write = app_configs.ENGINE_READ_AFTER_WRITE
+    # Read preference of the reads that can lag, `None` reads from the primary.
+    reads = read_preference(
+        app_configs.MONGO_READ_PREFERENCE, app_configs.MONGO_MAX_STALENESS
+    )
+
+    @classmethod
+    def get_collection(cls, collection: str, secondary: bool = False) -> Any:
+        """Get a collection.
+
+        Args:
+            collection (str): Collection name.
+            secondary (bool, optional): Use the read preference of the reads
+                that can lag. Defaults to False.
+
+        Returns:
+            Any: Collection.
+        """
+        if secondary and cls.reads is not None:
+            return cls.client[collection].with_options(read_preference=cls.reads)
+        return cls.client[collection]
 
     @classmethod
+    @metrics.timed(metrics.engine, "create_one")
     async def create_one(
         cls, collection: str, data: dict, excluded: dict
     ) -> Union[dict, None]:
@@ -33,12 +83,73 @@ class BaseRepository:
             Union[dict, None]: Return `dict` if object was created else `None`
         """
         obj = await cls.client[collection].insert_one(data)
+        if not cls.read_after_write:
+            return cls.exclude(data, excluded)
+
         response = await cls.client[collection].find_one(
             {"_id": obj.inserted_id}, excluded
         )
         return response
 
+    @staticmethod
+    def exclude(data: dict, excluded: dict) -> dict:
+        """Apply an exclusion projection to an object in memory.
+
+        Args:
+            data (dict): Object.
+            excluded (dict): Query to exclude.
+
+        Returns:
+            dict: Object without the excluded fields.
+        """
+        return {k: v for k, v in data.items() if excluded.get(k, 1)}
+
     @classmethod
+    @metrics.timed(metrics.engine, "create_many")
+    async def create_many(
+        cls, collection: str, data: List[dict], chunk_size: int
+    ) -> List[Tuple[int, str]]:
+        """Create objects in unordered chunks.
+
+        Args:
+            collection (str): Collection name.
+            data (List[dict]): Data to save.
+            chunk_size (int): Objects inserted by round trip.
+
+        Returns:
+            List[Tuple[int, str]]: Index and error of the objects not created.
+        """
+        failed = []
+        for start in range(0, len(data), chunk_size):
+            end = start + chunk_size
+            chunk = data[start:end]
+            try:
+                await cls.client[collection].insert_many(chunk, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed.append((start + error["index"], error["errmsg"]))
+        return failed
+
+    @classmethod
+    @metrics.timed(metrics.engine, "create_index")
+    async def create_index(
+        cls, collection: str, keys: Union[str, List[Tuple[str, int]]], unique: bool
+    ) -> str:
+        """Create an index, nothing is done if it already exists.
+
+        Args:
+            collection (str): Collection name.
+            keys (Union[str, List[Tuple[str, int]]]): Field or fields indexed.
+            unique (bool): Reject duplicated values.
+
+        Returns:
+            str: Index name.
+        """
+        response = await cls.client[collection].create_index(keys, unique=unique)
+        return response
+
+    @classmethod
+    @metrics.timed(metrics.engine, "find_one")
     async def find_one(
         cls, collection: str, query: dict, excluded: dict
     ) -> Union[dict, None]:
@@ -56,8 +167,16 @@ class BaseRepository:
         return response
 
     @classmethod
+    @metrics.timed(metrics.engine, "find")
     async def find(
-        cls, collection: str, query: dict, excluded: dict, skip: int, limit: int
+        cls,
+        collection: str,
+        query: dict,
+        excluded: dict,
+        skip: int,
+        limit: int,
+        sort: List[Tuple[str, int]] = None,
+        secondary: bool = False,
     ) -> List:
         """List objects.
 
@@ -67,20 +186,54 @@ class BaseRepository:
             excluded (dict): Query to exclude.
             skip: skip search.
             limit: limit search.
+            sort (List[Tuple[str, int]], optional): Sort keys. Defaults to None.
+            secondary (bool, optional): Read can lag. Defaults to False.
 
         Returns:
             list: Return list of object found.
         """
-        response = (
-            await cls.client[collection]
-            .find(query, excluded)
-            .skip(skip)
-            .limit(limit)
-            .to_list(limit)
-        )
+        cursor = cls.get_collection(collection, secondary).find(query, excluded)
+        if sort:
+            cursor = cursor.sort(sort)
+        response = await cursor.skip(skip).limit(limit).to_list(limit)
         return response
 
     @classmethod
+    async def stream(
+        cls,
+        collection: str,
+        query: dict,
+        excluded: dict,
+        skip: int,
+        limit: int,
+        batch_size: int,
+        sort: List[Tuple[str, int]] = None,
+        secondary: bool = False,
+    ) -> AsyncIterator[dict]:
+        """Iterate objects as they arrive.
+
+        Args:
+            collection (str): Collection name.
+            query (dict): search.
+            excluded (dict): Query to exclude.
+            skip (int): skip search.
+            limit (int): limit search, `0` is not limited.
+            batch_size (int): Objects fetched by round trip.
+            sort (List[Tuple[str, int]], optional): Sort keys. Defaults to None.
+            secondary (bool, optional): Read can lag. Defaults to False.
+
+        Yields:
+            dict: Object found.
+        """
+        cursor = cls.get_collection(collection, secondary).find(query, excluded)
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.skip(skip).limit(limit).batch_size(batch_size)
+        async for obj in cursor:
+            yield obj
+
+    @classmethod
+    @metrics.timed(metrics.engine, "update_one")
     async def update_one(cls, collection: str, query: dict, data: dict) -> int:
         """Update an object.
 
@@ -96,7 +249,10 @@ class BaseRepository:
         return response.modified_count
 
     @classmethod
-    async def update_many(cls, collection: str, query: dict, data: dict) -> int:
+    @metrics.timed(metrics.engine, "update_many")
+    async def update_many(
+        cls, collection: str, query: dict, data: dict
+    ) -> Tuple[int, int]:
         """Update many objects.
 
         Args:
@@ -105,12 +261,13 @@ class BaseRepository:
             data (dict): Data to update.
 
         Returns:
-            int: Return object updated.
+            Tuple[int, int]: Objects matched and updated.
         """
         response = await cls.client[collection].update_many(query, {"$set": data})
-        return response.modified_count
+        return response.matched_count, response.modified_count
 
     @classmethod
+    @metrics.timed(metrics.engine, "delete_one")
     async def delete_one(cls, collection: str, query: dict) -> int:
         """Delete an object.
 
@@ -125,6 +282,7 @@ class BaseRepository:
         return response.deleted_count
 
     @classmethod
+    @metrics.timed(metrics.engine, "delete_many")
     async def delete_many(cls, collection: str, query: dict) -> int:
         """Delete many objects.
 
@@ -139,17 +297,40 @@ class BaseRepository:
         return response.deleted_count
 
     @classmethod
-    async def count(cls, collection: str, query: dict) -> int:
+    @metrics.timed(metrics.engine, "count")
+    async def count(
+        cls, collection: str, query: dict, limit: int = 0, secondary: bool = False
+    ) -> int:
         """Get when objects are found.
 
         Args:
             collection (str): Collection name.
             query (dict): search.
+            limit (int, optional): Stop counting at `limit`, `0` counts all.
+            secondary (bool, optional): Read can lag. Defaults to False.
 
         Returns:
             int: objects found.
         """
-        response = await cls.client[collection].count_documents(query)
+        options = {"limit": limit} if limit else {}
+        collection = cls.get_collection(collection, secondary)
+        response = await collection.count_documents(query, **options)
+        return response
+
+    @classmethod
+    @metrics.timed(metrics.engine, "estimated_count")
+    async def estimated_count(cls, collection: str, secondary: bool = False) -> int:
+        """Get the objects of a collection from its metadata.
+
+        Args:
+            collection (str): Collection name.
+            secondary (bool, optional): Read can lag. Defaults to False.
+
+        Returns:
+            int: objects estimated.
+        """
+        collection = cls.get_collection(collection, secondary)
+        response = await collection.estimated_document_count()
         return response
 
 
@@ -157,6 +338,19 @@ class MongoRepository(BaseRepository):
     """Mongo repository"""
 
     excluded = {"_id": 0}  # Fields excluded
+    counts = TTLCache(
+        ttl=app_configs.MONGO_COUNT_TTL, size=app_configs.MONGO_COUNT_CACHE_SIZE
+    )
+    flights = SingleFlight(enabled=app_configs.ENGINE_COALESCE_READS)
+    operators = {
+        "eq": "$eq",
+        "ne": "$ne",
+        "gt": "$gt",
+        "gte": "$gte",
+        "lt": "$lt",
+        "lte": "$lte",
+        "in": "$in",
+    }
 
     @classmethod
     def get_pagination(cls, **kwargs) -> Tuple[int, int]:
@@ -172,6 +366,108 @@ class MongoRepository(BaseRepository):
         skip = (limit * page) if page else page
         return skip, limit
 
+    @staticmethod
+    def encode_cursor(row: dict, field: str) -> str:
+        """Build an opaque cursor from the last row of a page.
+
+        Args:
+            row (dict): Last row returned, with `_id`.
+            field (str): Field the rows are sorted by.
+
+        Returns:
+            str: Cursor token.
+        """
+        position = {"id": row["_id"]}
+        if field != "_id":
+            position["value"] = row.get(field)
+        raw = json_util.dumps(position).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(token: str) -> dict:
+        """Read the position of a cursor.
+
+        Args:
+            token (str): Cursor token.
+
+        Raises:
+            BaseException: When the token is not valid or its `id` or `value`
+                are not scalars.
+
+        Returns:
+            dict: Position with `id` and `value` of the last row.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            position = json_util.loads(raw)
+        except (binascii.Error, ValueError):
+            position = None
+        if not isinstance(position, dict) or "id" not in position:
+            position = None
+        # Only scalars, a document would add operators to the query.
+        elif not all(isinstance(v, CURSOR_SCALARS) for v in position.values()):
+            position = None
+        if position is None:
+            raise BaseException(
+                content={"error": "Invalid cursor."},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        return position
+
+    @classmethod
+    def cursor_query(cls, position: dict, field: str) -> dict:
+        """Query of the rows after a position.
+
+        Args:
+            position (dict): Position decoded from the cursor.
+            field (str): Field the rows are sorted by.
+
+        Returns:
+            dict: Query.
+        """
+        after_id = {"_id": {"$gt": position["id"]}}
+        if field == "_id":
+            return after_id
+        value = position.get("value")
+        if value is None:
+            # Nulls and missing values sort first, every value sorts after them.
+            return {"$or": [{field: {"$ne": None}}, {field: None, **after_id}]}
+        return {"$or": [{field: {"$gt": value}}, {field: value, **after_id}]}
+
+    @classmethod
+    def mongo_query(
+        cls, query: Union[Query, None]
+    ) -> Tuple[dict, Union[List[Tuple[str, int]], None], dict]:
+        """Translate a query to a Mongo filter, sort and projection.
+
+        Args:
+            query (Union[Query, None]): Query requested.
+
+        Returns:
+            Tuple[dict, Union[List[Tuple[str, int]], None], dict]: Filter, sort
+                with `_id` to break ties and projection.
+        """
+        if query is None:
+            return {}, None, cls.excluded
+
+        filters = {}
+        for field, operator, value in query.filters:
+            if operator == "in":
+                value = list(value)
+            filters.setdefault(field, {})[cls.operators[operator]] = value
+
+        sort = None
+        if query.sort:
+            sort = list(query.sort)
+            if not any(field == "_id" for field, _ in sort):
+                sort.append(("_id", 1))
+
+        projection = cls.excluded
+        if query.fields:
+            projection = {field: 1 for field in query.fields}
+            projection.update(cls.excluded)
+        return filters, sort, projection
+
     # Commons
     @classmethod
     async def list_models(cls, filters={}, **kwargs) -> list:
@@ -184,9 +480,34 @@ class MongoRepository(BaseRepository):
             list: Results.
         """
         skip, limit = cls.get_pagination(**filters)
-        models = await cls.find(cls.main_model, kwargs, cls.excluded, skip, limit)
+        models = await cls.find(
+            cls.main_model, kwargs, cls.excluded, skip, limit, secondary=True
+        )
         return models
 
+    @classmethod
+    async def count_models(cls) -> int:
+        """Count models.
+
+        Returns:
+            int: Models estimated.
+        """
+        response = await cls.estimated_count(cls.main_model, secondary=True)
+        return response
+
+    @classmethod
+    async def all_models(cls, limit: int) -> List[Model]:
+        """Get all models.
+
+        Args:
+            limit (int): Max models to get.
+
+        Returns:
+            List[Model]: Models found.
+        """
+        models = await cls.find(cls.main_model, {}, cls.excluded, 0, limit)
+        return [from_dict(Model, obj) for obj in models]
+
     @classmethod
     async def create_model(cls, data: dict) -> Union[Model, None]:
         """Create a model.
@@ -197,8 +518,60 @@ class MongoRepository(BaseRepository):
         Returns:
             Union[Model, None]: Return `Model` if was success else `None`.
         """
-        obj = await cls.create_one(cls.main_model, data, cls.excluded)
-        return from_dict(Model, obj) if obj else None
+        try:
+            obj = await cls.create_one(cls.main_model, data, cls.excluded)
+        except DuplicateKeyError:
+            return None
+        if not obj:
+            return None
+
+        model = from_dict(Model, obj)
+        await cls.create_model_indexes(model)
+        await cls.bump_models_version()
+        return model
+
+    @classmethod
+    async def create_admin_indexes(cls) -> None:
+        """Create the unique indexes of the models paths and names, and the jobs ones."""
+        await cls.create_index(cls.main_model, "path", unique=True)
+        await cls.create_index(cls.main_model, "name", unique=True)
+        await cls.create_index(app_configs.MODEL_JOBS_NAME, cls.main_field, unique=True)
+        await cls.create_index(app_configs.MODEL_JOBS_NAME, "status", unique=False)
+
+    @classmethod
+    async def create_model_indexes(cls, model: Model) -> None:
+        """Create the indexes of a model collection.
+
+        Args:
+            model (Model): Model object.
+        """
+        await cls.create_index(model.name, cls.main_field, unique=True)
+        if cls.cursor_field != "_id":
+            keys = [(cls.cursor_field, 1), ("_id", 1)]
+            await cls.create_index(model.name, keys, unique=False)
+        for field in model.indexed_fields():
+            await cls.create_index(model.name, field, unique=False)
+
+    @classmethod
+    async def reconcile_indexes(cls) -> List[Tuple[str, str]]:
+        """Create the indexes missing in the admin and the models collections.
+
+        Returns:
+            List[Tuple[str, str]]: Collection and error of the indexes not created.
+        """
+        failed = []
+        try:
+            await cls.create_admin_indexes()
+        except PyMongoError as e:
+            failed.append((cls.main_model, str(e)))
+
+        async for obj in cls.client[cls.main_model].find({}, cls.excluded):
+            model = from_dict(Model, obj)
+            try:
+                await cls.create_model_indexes(model)
+            except PyMongoError as e:
+                failed.append((model.name, str(e)))
+        return failed
 
     @classmethod
     async def exist_path_or_model(
@@ -213,7 +586,7 @@ class MongoRepository(BaseRepository):
         Returns:
             Union[Model, None]: Return `Model` if was success else `None`.
         """
-        query = {"$or": [{"path": path}, {"model": model_name}]}
+        query = {"$or": [{"path": path}, {"name": model_name}]}
         obj = await cls.find_one(cls.main_model, query, cls.excluded)
         return from_dict(Model, obj) if obj else None
 
@@ -227,12 +600,48 @@ class MongoRepository(BaseRepository):
         Returns:
             Union[Model, None]: Return `Model` if was success else `None`.
         """
-        obj = await cls.find_one(cls.main_model, {"path": path}, cls.excluded)
+
+        async def fn():
+            obj = await cls.find_one(cls.main_model, {"path": path}, cls.excluded)
+            return from_dict(Model, obj) if obj else None
+
+        # A lookup started before an invalidation is not shared after it.
+        return await cls.flights.do(("model", path, model_registry.version), fn)
+
+    @classmethod
+    async def model_by_name(cls, model_name: str) -> Union[Model, None]:
+        """Find model from name.
+
+        Args:
+            model_name (str): Model name.
+
+        Returns:
+            Union[Model, None]: Return `Model` if was success else `None`.
+        """
+        obj = await cls.find_one(cls.main_model, {"name": model_name}, cls.excluded)
         return from_dict(Model, obj) if obj else None
 
+    @classmethod
+    async def update_model(cls, model_name: str, data: dict) -> Union[Model, None]:
+        """Update a model.
+
+        Args:
+            model_name (str): Model name.
+            data (dict): Fields to update.
+
+        Returns:
+            Union[Model, None]: Return `Model` updated, `None` if not found.
+        """
+        data = {**data, "updated_at": datetime.now(timezone.utc).isoformat()}
+        await cls.update_one(cls.main_model, {"name": model_name}, data)
+        model = await cls.model_by_name(model_name)
+        if model:
+            await cls.bump_models_version()
+        return model
+
     @classmethod
     async def delete_model(cls, model_name: str) -> int:
-        """Delete model.
+        """Delete model, its rows are dropped by a job.
 
         Args:
             model_name (str): Model name.
@@ -242,15 +651,168 @@ class MongoRepository(BaseRepository):
         """
         deleted_count = await cls.delete_one(cls.main_model, {"name": model_name})
         if deleted_count > 0:
-            await cls.client.drop_collection(model_name)
+            await cls.bump_models_version()
         return deleted_count
 
+    @classmethod
+    async def bump_models_version(cls) -> None:
+        """Increase the models version, other processes poll it to invalidate."""
+        await cls.client[app_configs.MODEL_VERSION_NAME].update_one(
+            {"_id": cls.main_model}, {"$inc": {"version": 1}}, upsert=True
+        )
+
+    # Jobs
+    @classmethod
+    async def create_job(cls, job: Job) -> Job:
+        """Create a job.
+
+        Args:
+            job (Job): Job queued.
+
+        Returns:
+            Job: Job created.
+        """
+        job.created_at = job.updated_at = datetime.now(timezone.utc)
+        await cls.create_one(app_configs.MODEL_JOBS_NAME, job.to_json(), cls.excluded)
+        return job
+
+    @classmethod
+    async def save_job(cls, job: Job) -> None:
+        """Save the status and progress of a job.
+
+        Args:
+            job (Job): Job running.
+        """
+        job.updated_at = datetime.now(timezone.utc)
+        data = job.to_json()
+        data.pop(cls.main_field)
+        query = {cls.main_field: job.public_id}
+        await cls.update_one(app_configs.MODEL_JOBS_NAME, query, data)
+
+    @classmethod
+    async def claim_job(cls, lease: float) -> Union[Job, None]:
+        """Take the oldest job queued or running with its lease expired, as a
+        process that died does not renew it. A job is run by one process.
+
+        Args:
+            lease (float): Seconds the job is owned, the runner renews it.
+
+        Returns:
+            Union[Job, None]: Job claimed, `None` if no job is queued.
+        """
+        collection = app_configs.MODEL_JOBS_NAME
+        now = datetime.now(timezone.utc)
+        expired = {"status": Job.RUNNING, "lease_until": {"$lt": now.isoformat()}}
+        query = {"$or": [{"status": Job.QUEUED}, expired]}
+        sort = [("created_at", 1)]
+        lease_until = (now + timedelta(seconds=lease)).isoformat()
+        for obj in await cls.find(collection, query, cls.excluded, 0, 10, sort):
+            job = from_dict(Job, obj)
+            claim = {
+                cls.main_field: job.public_id,
+                "status": job.status,
+                "lease_until": job.lease_until,
+            }
+            data = {"status": Job.RUNNING, "lease_until": lease_until}
+            if await cls.update_one(collection, claim, data):
+                job.status, job.lease_until = Job.RUNNING, lease_until
+                return job
+        return None
+
+    @classmethod
+    async def job_by_id(cls, job_id: str) -> Union[Job, None]:
+        """Find a job.
+
+        Args:
+            job_id (str): Job id.
+
+        Returns:
+            Union[Job, None]: Return `Job` if was success else `None`.
+        """
+        query = {cls.main_field: job_id}
+        obj = await cls.find_one(app_configs.MODEL_JOBS_NAME, query, cls.excluded)
+        return from_dict(Job, obj) if obj else None
+
+    @classmethod
+    async def list_jobs(cls, filters={}) -> list:
+        """List jobs, the newest first.
+
+        Args:
+            filters (dict, optional): Query filters. Defaults to {}.
+
+        Returns:
+            list: Results.
+        """
+        skip, limit = cls.get_pagination(**filters)
+        sort = [("created_at", -1)]
+        return await cls.find(
+            app_configs.MODEL_JOBS_NAME, {}, cls.excluded, skip, limit, sort
+        )
+
+    @classmethod
+    async def pending_jobs(cls, model_name: str) -> int:
+        """Count the jobs of a model queued or running.
+
+        Args:
+            model_name (str): Model name.
+
+        Returns:
+            int: Jobs pending.
+        """
+        query = {"model": model_name, "status": {"$in": [Job.QUEUED, Job.RUNNING]}}
+        return await cls.count(app_configs.MODEL_JOBS_NAME, query, limit=1)
+
+    @classmethod
+    async def drop_rows(cls, model_name: str, limit: int) -> int:
+        """Delete a chunk of rows of a model deleted.
+
+        Args:
+            model_name (str): Model name.
+            limit (int): Max rows deleted.
+
+        Returns:
+            int: Rows deleted, less than `limit` when there are no more.
+        """
+        rows = await cls.find(model_name, {}, {"_id": 1}, 0, limit)
+        if not rows:
+            return 0
+        ids = [row["_id"] for row in rows]
+        return await cls.delete_many(model_name, {"_id": {"$in": ids}})
+
+    @classmethod
+    async def drop_model_collection(cls, model_name: str) -> None:
+        """Drop the collection of a model deleted.
+
+        Args:
+            model_name (str): Model name.
+        """
+        await cls.client.drop_collection(model_name)
+
+    @classmethod
+    async def rows_after(
+        cls, model_name: str, cursor: Union[str, None], limit: int
+    ) -> List[dict]:
+        """Get a chunk of rows in identifier order.
+
+        Args:
+            model_name (str): Model name.
+            cursor (Union[str, None]): Last identifier got, `None` starts.
+            limit (int): Max rows.
+
+        Returns:
+            List[dict]: Rows found.
+        """
+        query = {cls.main_field: {"$gt": cursor}} if cursor else {}
+        sort = [(cls.main_field, 1)]
+        return await cls.find(model_name, query, cls.excluded, 0, limit, sort)
+
     @classmethod
     async def find_one_or_many(
         cls,
         model_name: str,
         resource_id: str,
         query_params: dict,
+        query: Union[Query, None] = None,
     ) -> Union[dict, list, None]:
         """Find one or more rows.
 
@@ -258,18 +820,187 @@ class MongoRepository(BaseRepository):
             model_name (str): Model name.
             resource_id (str): Resource id.
             query_params (dict): query params.
+            query (Union[Query, None], optional): filters, sort and fields.
 
         Returns:
             Union[dict, list, None]: Return `None` if was not found else list or dict.
         """
+        filters, sort, projection = cls.mongo_query(query)
         if resource_id:
-            query = {cls.main_field: resource_id}
-            response = await cls.find_one(model_name, query, cls.excluded)
-            return response
+            search = {cls.main_field: resource_id}
+            key = ("row", model_name, resource_id, query)
+            fn = functools.partial(cls.find_one, model_name, search, projection)
+            return await cls.flights.do(key, fn)
 
         skip, limit = cls.get_pagination(**query_params)
-        rows = await cls.find(model_name, {}, cls.excluded, skip, limit)
-        return rows
+        key = ("rows", model_name, skip, limit, query)
+        fn = functools.partial(
+            cls.find,
+            model_name,
+            filters,
+            projection,
+            skip,
+            limit,
+            sort=sort,
+            secondary=True,
+        )
+        return await cls.flights.do(key, fn)
+
+    @classmethod
+    async def count_rows(cls, model_name: str, query: Union[Query, None] = None) -> int:
+        """Count rows, estimated without filters else counted and cached.
+
+        Args:
+            model_name (str): Model name.
+            query (Union[Query, None], optional): filters.
+
+        Returns:
+            int: Rows found.
+        """
+        if query is None or not query.filters:
+            response = await cls.estimated_count(model_name, secondary=True)
+            return response
+
+        key = (model_name, query.filters)
+        response = cls.counts.get(key)
+        if response is None:
+            filters, _, _ = cls.mongo_query(query)
+            response = await cls.count(model_name, filters, secondary=True)
+            cls.counts.set(key, response)
+        return response
+
+    @classmethod
+    async def find_by_cursor(
+        cls, model_name: str, query_params: dict, query: Union[Query, None] = None
+    ) -> Tuple[list, Union[str, None]]:
+        """Find rows after a cursor, sorted by the cursor field and `_id`.
+
+        Args:
+            model_name (str): Model name.
+            query_params (dict): query params, an empty `cursor` is the first page.
+            query (Union[Query, None], optional): filters and fields, the sort
+                requested is ignored.
+
+        Returns:
+            Tuple[list, Union[str, None]]: Rows and the cursor of the next page,
+                `None` on the last page.
+        """
+        _, limit = cls.get_pagination(**query_params)
+        field = cls.cursor_field
+        filters, _, projection = cls.mongo_query(query)
+        excluded = cls.excluded
+        if query and query.fields:
+            # The cursor is built from `_id` and the field sorted.
+            projection = {**projection, "_id": 1, field: 1}
+            if field not in query.fields:
+                excluded = {**excluded, field: 0}
+        else:
+            projection = None
+
+        token = query_params.get("cursor")
+        search = cls.cursor_query(cls.decode_cursor(token), field) if token else {}
+        if filters:
+            search = {"$and": [filters, search]} if search else filters
+        sort = [("_id", 1)] if field == "_id" else [(field, 1), ("_id", 1)]
+        rows = await cls.find(
+            model_name, search, projection, 0, limit, sort=sort, secondary=True
+        )
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = cls.encode_cursor(rows[-1], field)
+        return [cls.exclude(row, excluded) for row in rows], next_cursor
+
+    @classmethod
+    def stream_rows(
+        cls, model_name: str, query_params: dict, query: Union[Query, None] = None
+    ) -> AsyncIterator[dict]:
+        """Iterate rows, all of them unless `limit` or `page` are sent.
+
+        Args:
+            model_name (str): Model name.
+            query_params (dict): query params.
+            query (Union[Query, None], optional): filters, sort and fields.
+
+        Returns:
+            AsyncIterator[dict]: Rows found.
+        """
+        skip, limit = 0, 0
+        if query_params.get("limit") or query_params.get("page"):
+            skip, limit = cls.get_pagination(**query_params)
+        filters, sort, projection = cls.mongo_query(query)
+        return cls.stream(
+            model_name,
+            filters,
+            projection,
+            skip,
+            limit,
+            cls.stream_batch_size,
+            sort=sort,
+            secondary=True,
+        )
+
+    @classmethod
+    async def affected_ids(cls, model_name: str, query: Query, limit: int) -> List[Any]:
+        """Get the `_id` of the rows a bulk change would affect, not cached.
+
+        Args:
+            model_name (str): Model name.
+            query (Query): filters.
+            limit (int): Max rows found.
+
+        Returns:
+            List[Any]: `_id` of the rows found, at most `limit`.
+        """
+        filters, _, _ = cls.mongo_query(query)
+        rows = await cls.find(model_name, filters, {"_id": 1}, 0, limit)
+        return [row["_id"] for row in rows]
+
+    @classmethod
+    def bounded(cls, query: Query, ids: List[Any]) -> dict:
+        """Filters of a bulk change bound to the rows found before it.
+
+        Args:
+            query (Query): filters.
+            ids (List[Any]): `_id` of the rows found.
+
+        Returns:
+            dict: Query, rows inserted or changed meanwhile are not matched.
+        """
+        filters, _, _ = cls.mongo_query(query)
+        return {"$and": [filters, {"_id": {"$in": ids}}]}
+
+    @classmethod
+    async def update_rows(
+        cls, model_name: str, query: Query, data: dict, ids: List[Any]
+    ) -> Tuple[int, int]:
+        """Update the rows found matching the filters in one operation.
+
+        Args:
+            model_name (str): Model name.
+            query (Query): filters.
+            data (dict): Data to update.
+            ids (List[Any]): `_id` of the rows found by `affected_ids`.
+
+        Returns:
+            Tuple[int, int]: Rows matched and updated.
+        """
+        response = await cls.update_many(model_name, cls.bounded(query, ids), data)
+        return response
+
+    @classmethod
+    async def delete_rows(cls, model_name: str, query: Query, ids: List[Any]) -> int:
+        """Delete the rows found matching the filters in one operation.
+
+        Args:
+            model_name (str): Model name.
+            query (Query): filters.
+            ids (List[Any]): `_id` of the rows found by `affected_ids`.
+
+        Returns:
+            int: Rows deleted.
+        """
+        response = await cls.delete_many(model_name, cls.bounded(query, ids))
+        return response
 
     @classmethod
     async def create_row(cls, model_name: str, data: dict) -> Union[dict, None]:
@@ -285,6 +1016,27 @@ class MongoRepository(BaseRepository):
         response = await cls.create_one(model_name, data, cls.excluded)
         return response
 
+    @classmethod
+    async def create_rows(
+        cls, model_name: str, rows: List[dict]
+    ) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Create many rows.
+
+        Args:
+            model_name (str): Model name.
+            rows (List[dict]): Data required.
+
+        Returns:
+            Tuple[List[str], List[Tuple[int, str]]]: Identifiers created and
+                index and error of the rows not created.
+        """
+        failed = await cls.create_many(model_name, rows, cls.bulk_chunk_size)
+        indexes = {index for index, _ in failed}
+        created = [
+            row[cls.main_field] for i, row in enumerate(rows) if i not in indexes
+        ]
+        return created, failed
+
     @classmethod
     async def update_row(cls, model_name: str, resource_id: str, data: dict) -> int:
         """Update a row.
@@ -0,0 +1,18 @@
+from api.cache import TTLCache
+from api.configs import app_configs
+from api.repositories.mongo import BaseRepository
+from api.repositories.mongo import MongoRepository
+
+
+class SQLiteBaseRepository(BaseRepository):
+    """Base repository of the SQLite engine"""
+
+    reads = None
+
+
+class SQLiteRepository(MongoRepository):
+    """SQLite repository, the SQLite engine translates Mongo queries"""
+
+    counts = TTLCache(
+        ttl=app_configs.MONGO_COUNT_TTL, size=app_configs.MONGO_COUNT_CACHE_SIZE
+    )
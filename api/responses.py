@@ -0,0 +1,92 @@
+import json
+from typing import Any
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse as BaseJSONResponse
+
+from api.configs import app_configs
+from api.metrics import metrics
+from api.utils import json_serial
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default(obj: Any) -> Any:
+    """Serialize the objects not supported by the JSON encoders.
+
+    Args:
+        obj (Any): Object.
+
+    Raises:
+        TypeError: If the object is not serializable.
+
+    Returns:
+        Any: Object serializable.
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return json_serial(obj)
+
+
+def dumps_json(content: Any) -> bytes:
+    """Encode content with the standard library.
+
+    Args:
+        content (Any): Content.
+
+    Returns:
+        bytes: JSON encoded.
+    """
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=default,
+    ).encode("utf-8")
+
+
+def dumps_orjson(content: Any) -> bytes:
+    """Encode content with orjson, datetimes are encoded natively.
+
+    Args:
+        content (Any): Content.
+
+    Returns:
+        bytes: JSON encoded.
+    """
+    return orjson.dumps(content, default=default)
+
+
+ENCODERS = {"JSON": dumps_json}
+if orjson is not None:
+    ENCODERS["ORJSON"] = dumps_orjson
+
+
+def get_encoder(name: str):
+    """Get the encoder from name, `AUTO` picks the fastest installed.
+
+    Args:
+        name (str): `AUTO`, `ORJSON` or `JSON`.
+
+    Returns:
+        Callable[[Any], bytes]: Encoder.
+    """
+    name = name.upper()
+    if name == "AUTO":
+        return ENCODERS.get("ORJSON", dumps_json)
+    return ENCODERS.get(name, dumps_json)
+
+
+dumps = get_encoder(app_configs.JSON_ENCODER)
+
+
+class JSONResponse(BaseJSONResponse):
+    """JSON response encoded with the encoder configured"""
+
+    @metrics.timed(metrics.phases, "encoding")
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
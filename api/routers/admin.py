@@ -1,5 +1,6 @@
 from fastapi import Request
 from fastapi import APIRouter
+from fastapi.responses import Response
 from api.configs import route_config
 from api.controllers.admin import AdminController
 
@@ -9,15 +10,45 @@ router = APIRouter()
 
 # API Health
 @router.get(route_config.RouterAdmin.PING)
+@router.get(route_config.RouterAdmin.PING + "/", include_in_schema=False)
 def ping(request: Request) -> dict:
     """Ping api."""
     return {"pong": "OK"}
 
 
-# Admin models
+# Metrics, the admin middleware features run before.
+@router.get(route_config.RouterAdmin.METRICS, include_in_schema=False)
+@router.get(route_config.RouterAdmin.METRICS + "/", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """Metrics endpoint, rendered in the event loop that records them."""
+    return AdminController.metrics(request.state.input_context)
+
+
+# Jobs of the admin operations.
+@router.get(route_config.RouterAdmin.JOBS)
+@router.get(route_config.RouterAdmin.JOBS + "/", include_in_schema=False)
+async def jobs(request: Request):
+    """Jobs endpoint."""
+    response = await AdminController.jobs(request.state.input_context)
+    return response
+
+
+@router.get(route_config.RouterAdmin.JOBS + "/{job_id}")
+async def job(request: Request, job_id: str):
+    """Job endpoint."""
+    response = await AdminController.jobs(request.state.input_context, job_id)
+    return response
+
+
+# Admin models, with trailing slash or the dynamic path would match it.
 @router.get(route_config.RouterAdmin.ADMIN)
 @router.post(route_config.RouterAdmin.ADMIN)
+@router.put(route_config.RouterAdmin.ADMIN)
 @router.delete(route_config.RouterAdmin.ADMIN)
+@router.get(route_config.RouterAdmin.ADMIN + "/", include_in_schema=False)
+@router.post(route_config.RouterAdmin.ADMIN + "/", include_in_schema=False)
+@router.put(route_config.RouterAdmin.ADMIN + "/", include_in_schema=False)
+@router.delete(route_config.RouterAdmin.ADMIN + "/", include_in_schema=False)
 async def models(request: Request):
     """Models endpoints."""
     response = await AdminController.handle(request.state.input_context)
@@ -4,10 +4,13 @@ from typing import Union
 from dacite import from_dict
 
 from .base import Serializer
+from .core import CoreSerializer
+from .utils import schema_hash
 from .utils import status_code_allowed
 from .utils import upper
 from api.configs import route_config
 from api.datastructures import Model
+from api.metrics import metrics
 
 
 class AdminSerializer(Serializer):
@@ -48,6 +51,19 @@ class AdminSerializer(Serializer):
                 "coerce": (str, upper()),
             },  # TODO: validate json valid.
         },
+        "cache": {
+            "type": "dict",
+            "required": False,
+            "schema": {"ttl": {"type": "integer", "required": True, "min": 1}},
+        },
+        "ingest": {
+            "type": "dict",
+            "required": False,
+            "schema": {
+                "batch": {"type": "integer", "required": True, "min": 1},
+                "wait": {"type": "number", "required": False, "min": 0},
+            },
+        },
     }
     DELETE_MODEL = {
         "name": {
@@ -55,8 +71,13 @@ class AdminSerializer(Serializer):
             "required": True,
         },
     }
+    UPDATE_MODEL = {
+        "name": {"type": "string", "required": True},
+        "schema": MODEL_SCHEMA["schema"],
+    }
 
     @classmethod
+    @metrics.timed(metrics.phases, "validation")
     def model(cls, body: dict) -> Tuple[Union[dict, None], Union[None, Model]]:
         """Serialize model.
 
@@ -70,11 +91,15 @@ class AdminSerializer(Serializer):
         if errors:
             return errors, None
 
-        errors, data = cls._serialize(cls.MODEL_SCHEMA, data=body, purge=True)
+        errors, data = cls._serialize(
+            cls.MODEL_SCHEMA, data=body, purge=True, key="admin_model"
+        )
         if errors:
             return errors, None
 
         model = from_dict(data_class=Model, data=data)
+        # Compile once.
+        CoreSerializer.validator(model.schema, model.name, model.schema_hash)
         return None, model
 
     @classmethod
@@ -87,4 +112,29 @@ class AdminSerializer(Serializer):
         Returns:
             Tuple[dict, Union[dict, list]]: Returns errors and data serialized.
         """
-        return cls._serialize(cls.DELETE_MODEL, body, purge=True)
+        return cls._serialize(cls.DELETE_MODEL, body, purge=True, key="delete_model")
+
+    @classmethod
+    def update_model(cls, body: dict) -> Tuple[dict, Union[dict, list]]:
+        """Serialize update model, only the schema is changed.
+
+        Args:
+            body (dict): request body.
+
+        Returns:
+            Tuple[dict, Union[dict, list]]: Returns errors and data serialized.
+        """
+        errors = cls._validate_schema(body.get("schema"))
+        if errors:
+            return errors, None
+
+        errors, data = cls._serialize(
+            cls.UPDATE_MODEL, body, purge=True, key="update_model"
+        )
+        if errors:
+            return errors, None
+
+        # Compile once, with the version of the model loaded after the update.
+        name, schema = data["name"], data["schema"]
+        CoreSerializer.validator(schema, name, schema_hash(schema))
+        return None, data
@@ -1,13 +1,34 @@
+from collections import OrderedDict
+from typing import Any
 from typing import Tuple
 from typing import Union
 
 from cerberus import Validator
 from cerberus.schema import SchemaError
 
+from .compiler import CompiledValidator
+from .compiler import UnsupportedRule
+from api.configs import app_configs
+
+
+class ModelValidator(Validator):
+    """Cerberus validator with the rules of model schemas"""
+
+    def _validate_index(self, constraint, field, value):
+        """Index the field in the model collection, it does not validate.
+
+        The rule's arguments are validated against this schema:
+        {'type': 'boolean'}
+        """
+
 
 class Serializer:
     """Base Serializer based in Cerberus"""
 
+    _validators = OrderedDict()  # Compiled validators shared by serializers.
+    validators_size = app_configs.VALIDATOR_CACHE_SIZE
+    engine = app_configs.SERIALIZER_ENGINE.upper()
+
     @classmethod
     def _validate_schema(cls, schema: dict) -> Union[None, dict]:
         """Validate if cerberus schema is valid.
@@ -19,14 +40,83 @@ class Serializer:
             Union[None, dict]: None if is valid else validation errors.
         """
         try:
-            Validator(schema)
+            ModelValidator(schema)
             return None
         except SchemaError as e:
             return e.args[0]
 
+    @classmethod
+    def _validator(cls, schema: dict, purge: bool = False, key: Any = None):
+        """Get a validator, compiled once per key.
+
+        Args:
+            schema (dict): Cerberus schema.
+            purge (bool, optional): Purge unknown field. Defaults to False.
+            key (Any, optional): Cache key, `None` is not cached.
+
+        Raises:
+            SchemaError: If the schema is invalid.
+
+        Returns:
+            Union[Validator, CompiledValidator]: Validator.
+        """
+        if key is None:
+            return cls._compile(schema, purge)
+
+        cache = Serializer._validators
+        cache_key = (key, purge)
+        validator = cache.get(cache_key)
+        if validator is not None:
+            cache.move_to_end(cache_key)
+            return validator
+
+        validator = cls._compile(schema, purge)
+        if cls.validators_size:
+            cache[cache_key] = validator
+            while len(cache) > cls.validators_size:
+                cache.popitem(last=False)
+        return validator
+
+    @classmethod
+    def _compile(cls, schema: dict, purge: bool = False):
+        """Build a validator with the engine configured.
+
+        Args:
+            schema (dict): Cerberus schema.
+            purge (bool, optional): Purge unknown field. Defaults to False.
+
+        Raises:
+            SchemaError: If the schema is invalid.
+
+        Returns:
+            Union[Validator, CompiledValidator]: Validator.
+        """
+        validator = ModelValidator(schema, purge_unknown=purge)
+        if cls.engine != "COMPILED":
+            return validator
+        try:
+            return CompiledValidator(schema, purge_unknown=purge)
+        except UnsupportedRule:
+            return validator
+
+    @classmethod
+    def _run(cls, validator: Any, data: Union[dict, list]) -> Tuple[dict, Any]:
+        """Normalize and validate data.
+
+        Args:
+            validator (Any): Cerberus or compiled validator.
+            data (Union[dict, list]): Data to serialize.
+
+        Returns:
+            Tuple[dict, Union[dict, list]]: Returns errors and data serialized.
+        """
+        validator.normalized(data)
+        validator.validate(validator.document)
+        return validator.errors, validator.document
+
     @classmethod
     def _serialize(
-        cls, schema: dict, data: Union[dict, list], purge: bool = False
+        cls, schema: dict, data: Union[dict, list], purge: bool = False, key: Any = None
     ) -> Tuple[dict, Union[dict, list]]:
         """Serialize data.
 
@@ -34,11 +124,10 @@ class Serializer:
             schema (dict): Cerberus schema.
             data (Union[dict, list]): Data to serialize.
             purge (bool, optional): Purge unknown field. Defaults to False.
+            key (Any, optional): Validator cache key. Defaults to None.
 
         Returns:
             Tuple[dict, Union[dict, list]]: Returns errors and data serialized.
         """
-        v = Validator(schema, purge_unknown=purge)
-        v.normalized(data)
-        v.validate(v.document)
-        return v.errors, v.document
+        v = cls._validator(schema, purge=purge, key=key)
+        return cls._run(v, data)
@@ -0,0 +1,419 @@
+import re
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from collections.abc import Sized
+from copy import copy
+from functools import cmp_to_key
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from cerberus import errors
+from cerberus import Validator
+from cerberus.errors import BasicErrorHandler
+from cerberus.utils import compare_paths_lt
+from cerberus.validator import DocumentError
+
+
+class UnsupportedRule(Exception):
+    """Rule not supported by the compiler"""
+
+
+# Rules ignored by validation, like Cerberus does, `index` is for engines.
+IGNORED_RULES = ("index", "meta", "required")
+# Rules dropped when a value is empty.
+EMPTY_DROPPED = ("allowed", "minlength", "maxlength", "regex")
+# Rules validated in schema order after the priority ones.
+ORDERED_RULES = ("allowed", "max", "maxlength", "min", "minlength", "regex", "schema")
+SUPPORTED_RULES = IGNORED_RULES + ORDERED_RULES + (
+    "coerce",
+    "empty",
+    "nullable",
+    "type",
+)
+
+
+def message(definition: errors.ErrorDefinition, *info, **kwargs) -> str:
+    """Format an error message like `BasicErrorHandler`.
+
+    Args:
+        definition (errors.ErrorDefinition): Cerberus error definition.
+
+    Returns:
+        str: Error message.
+    """
+    kwargs.setdefault("constraint", None)
+    kwargs.setdefault("field", None)
+    kwargs.setdefault("value", None)
+    return BasicErrorHandler.messages[definition.code].format(*info, **kwargs)
+
+
+def is_sequence(value: Any) -> bool:
+    """Return if a value is a sequence but not a string"""
+    return isinstance(value, Sequence) and not isinstance(value, str)
+
+
+def _compare(one: tuple, other: tuple) -> int:
+    for x, y in ((one[0], other[0]), (one[1], other[1])):
+        if x != y:
+            return -1 if compare_paths_lt(x, y) else 1
+    return 0
+
+
+def _insert(tree: dict, path: tuple, msg: str) -> None:
+    node = tree.setdefault(path[0], [{}])
+    if len(path) == 1:
+        node.insert(len(node) - 1, msg)
+    else:
+        _insert(node[-1], path[1:], msg)
+
+
+def _purge_empty(node: list) -> None:
+    if not node[-1]:
+        node.pop()
+        return
+    for child in node[-1].values():
+        _purge_empty(child)
+
+
+class ErrorList:
+    """Errors of a document.
+
+    Cerberus keeps its errors sorted by document and schema path, the tree
+    returned by `to_dict` follows the same order.
+    """
+
+    def __init__(self):
+        self.items = []
+
+    def add(self, document_path: tuple, schema_path: tuple, msg: str) -> None:
+        self.items.append((document_path, schema_path, msg))
+
+    def group(self, document_path: tuple, schema_path: tuple, child: "ErrorList"):
+        if child:
+            self.items.append((document_path, schema_path, child))
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def to_dict(self) -> dict:
+        tree = {}
+        self._insert_all(tree)
+        for field in tree:
+            _purge_empty(tree[field])
+        return tree
+
+    def _insert_all(self, tree: dict) -> None:
+        for path, _, node in sorted(self.items, key=cmp_to_key(_compare)):
+            if isinstance(node, ErrorList):
+                node._insert_all(tree)
+            else:
+                _insert(tree, path, node)
+
+
+class FieldRules:
+    """Rules of a field compiled to closures"""
+
+    def __init__(self, rules: Any, purge: bool, schema_path: tuple):
+        """
+        Args:
+            rules (Any): Cerberus rules of the field.
+            purge (bool): Purge unknown fields of nested documents.
+            schema_path (tuple): Schema path of the field rules.
+
+        Raises:
+            UnsupportedRule: If a rule can not be compiled.
+        """
+        if not isinstance(rules, Mapping):
+            raise UnsupportedRule(rules)
+        unsupported = set(rules) - set(SUPPORTED_RULES)
+        if unsupported:
+            raise UnsupportedRule(unsupported)
+
+        self.schema_path = schema_path
+        self.required = rules.get("required", False) is True
+        self.nullable = rules.get("nullable", False)
+        self.empty = rules.get("empty")
+        self.coercers = self._coercers(rules.get("coerce"))
+        self.types, self.type_error = self._types(rules.get("type"))
+        self.child = None
+        self.items = None
+        if rules.get("schema") is not None:
+            self._children(rules.get("type"), rules["schema"], purge)
+        self.checks = [
+            (rule, getattr(self, f"_check_{rule}")(rules[rule]))
+            for rule in rules
+            if rule in ORDERED_RULES
+        ]
+
+    def _coercers(self, coerce: Any) -> List[Callable]:
+        if coerce is None:
+            return []
+        if callable(coerce):
+            return [coerce]
+        if isinstance(coerce, (list, tuple)) and all(callable(c) for c in coerce):
+            return list(coerce)
+        raise UnsupportedRule(coerce)  # Named coercers.
+
+    def _types(self, data_type: Any) -> Tuple[list, str]:
+        if not data_type:
+            return [], ""
+        names = (data_type,) if isinstance(data_type, str) else data_type
+        types = []
+        for name in names:
+            definition = Validator.types_mapping.get(name)
+            if definition is None:
+                raise UnsupportedRule(name)
+            types.append((definition.included_types, definition.excluded_types))
+        return types, message(errors.BAD_TYPE, constraint=data_type)
+
+    def _children(self, data_type: Any, schema: Any, purge: bool) -> None:
+        schema_path = self.schema_path + ("schema",)
+        if data_type == "dict":
+            self.child = CompiledSchema(schema, purge, schema_path)
+        elif data_type == "list":
+            # Cerberus drops the item index from the schema path.
+            self.items = FieldRules(schema, purge, schema_path)
+        else:
+            raise UnsupportedRule(data_type)
+
+    def error(self, errs: ErrorList, path: tuple, rule: str, msg: str) -> None:
+        errs.add(path, self.schema_path + (rule,), msg)
+
+    def normalize(self, value: Any, path: tuple, errs: ErrorList) -> Any:
+        """Coerce a value and normalize its nested documents.
+
+        Args:
+            value (Any): Field value.
+            path (tuple): Document path of the field.
+            errs (ErrorList): Errors found.
+
+        Returns:
+            Any: Value normalized.
+        """
+        if self.coercers:
+            value = self.coerce(value, path, errs)
+
+        if self.child is not None and isinstance(value, Mapping):
+            value = type(value)(self.child.normalize(value, path, errs))
+        elif self.items is not None and is_sequence(value):
+            value = type(value)(
+                self.items.normalize(v, path + (i,), errs) for i, v in enumerate(value)
+            )
+        return value
+
+    def coerce(self, value: Any, path: tuple, errs: ErrorList) -> Any:
+        for coercer in self.coercers:
+            try:
+                value = coercer(value)
+            except Exception as e:
+                if not (self.nullable and value is None):
+                    msg = message(errors.COERCION_FAILED, str(e), field=path[-1])
+                    self.error(errs, path, "coerce", msg)
+                    break
+        return value
+
+    def validate(self, value: Any, path: tuple, errs: ErrorList) -> None:
+        """Validate a value.
+
+        Args:
+            value (Any): Field value.
+            path (tuple): Document path of the field.
+            errs (ErrorList): Errors found.
+        """
+        if value is None:
+            if not self.nullable:
+                self.error(errs, path, "nullable", message(errors.NOT_NULLABLE))
+            return
+
+        if self.types and not any(
+            isinstance(value, included) and not isinstance(value, excluded)
+            for included, excluded in self.types
+        ):
+            self.error(errs, path, "type", self.type_error)
+            return
+
+        dropped = ()
+        if self.empty is not None and isinstance(value, Sized) and len(value) == 0:
+            dropped = EMPTY_DROPPED
+            if not self.empty:
+                self.error(errs, path, "empty", message(errors.EMPTY_NOT_ALLOWED))
+
+        for rule, check in self.checks:
+            if rule not in dropped:
+                check(value, path, errs)
+
+    def _check_allowed(self, allowed: Any) -> Callable:
+        def check(value, path, errs):
+            if isinstance(value, Iterable) and not isinstance(value, str):
+                unallowed = tuple(x for x in value if x not in allowed)
+                if unallowed:
+                    msg = message(errors.UNALLOWED_VALUES, unallowed)
+                    self.error(errs, path, "allowed", msg)
+            elif value not in allowed:
+                msg = message(errors.UNALLOWED_VALUE, value=value)
+                self.error(errs, path, "allowed", msg)
+
+        return check
+
+    def _check_max(self, limit: Any) -> Callable:
+        msg = message(errors.MAX_VALUE, constraint=limit)
+
+        def check(value, path, errs):
+            try:
+                if value > limit:
+                    self.error(errs, path, "max", msg)
+            except TypeError:
+                pass
+
+        return check
+
+    def _check_min(self, limit: Any) -> Callable:
+        msg = message(errors.MIN_VALUE, constraint=limit)
+
+        def check(value, path, errs):
+            try:
+                if value < limit:
+                    self.error(errs, path, "min", msg)
+            except TypeError:
+                pass
+
+        return check
+
+    def _check_maxlength(self, limit: int) -> Callable:
+        msg = message(errors.MAX_LENGTH, constraint=limit)
+
+        def check(value, path, errs):
+            if isinstance(value, Iterable) and len(value) > limit:
+                self.error(errs, path, "maxlength", msg)
+
+        return check
+
+    def _check_minlength(self, limit: int) -> Callable:
+        msg = message(errors.MIN_LENGTH, constraint=limit)
+
+        def check(value, path, errs):
+            if isinstance(value, Iterable) and len(value) < limit:
+                self.error(errs, path, "minlength", msg)
+
+        return check
+
+    def _check_regex(self, pattern: str) -> Callable:
+        msg = message(errors.REGEX_MISMATCH, constraint=pattern)
+        regex = re.compile(pattern if pattern.endswith("$") else pattern + "$")
+
+        def check(value, path, errs):
+            if isinstance(value, str) and not regex.match(value):
+                self.error(errs, path, "regex", msg)
+
+        return check
+
+    def _check_schema(self, _: Any) -> Callable:
+        schema_path = self.schema_path + ("schema",)
+
+        def check(value, path, errs):
+            child = ErrorList()
+            if self.child is not None and isinstance(value, Mapping):
+                self.child.validate(value, path, child)
+            elif self.items is not None and is_sequence(value):
+                for i, v in enumerate(value):
+                    self.items.validate(v, path + (i,), child)
+            errs.group(path, schema_path, child)
+
+        return check
+
+
+class CompiledSchema:
+    """Cerberus mapping schema compiled to closures"""
+
+    def __init__(self, schema: Any, purge: bool, schema_path: tuple = ()):
+        """
+        Args:
+            schema (Any): Cerberus schema.
+            purge (bool): Purge unknown field.
+            schema_path (tuple, optional): Schema path of the mapping.
+
+        Raises:
+            UnsupportedRule: If the schema can not be compiled.
+        """
+        if not isinstance(schema, Mapping):
+            raise UnsupportedRule(schema)
+        self.purge = purge
+        self.schema_path = schema_path
+        self.fields = {
+            f: FieldRules(r, purge, schema_path + (f,)) for f, r in schema.items()
+        }
+        self.required = [f for f, r in self.fields.items() if r.required]
+
+    def normalize(self, document: Mapping, path: tuple, errs: ErrorList) -> dict:
+        document = copy(document)
+        if self.purge:
+            for field in [f for f in document if f not in self.fields]:
+                document.pop(field)
+        for field in document:
+            rules = self.fields.get(field)
+            if rules is not None:
+                value = document[field]
+                document[field] = rules.normalize(value, path + (field,), errs)
+        return document
+
+    def validate(self, document: Mapping, path: tuple, errs: ErrorList) -> None:
+        for field, value in document.items():
+            rules = self.fields.get(field)
+            if rules is not None:
+                rules.validate(value, path + (field,), errs)
+            else:
+                msg = message(errors.UNKNOWN_FIELD)
+                errs.add(path + (field,), self.schema_path, msg)
+        for field in self.required:
+            if field not in document:
+                msg = message(errors.REQUIRED_FIELD)
+                self.fields[field].error(errs, path + (field,), "required", msg)
+
+
+class CompiledValidator:
+    """Validator with the `Validator` interface used by serializers.
+
+    The schema is translated once into closures. It supports `type`,
+    `required`, `nullable`, `empty`, `minlength`, `maxlength`, `min`, `max`,
+    `regex`, `allowed`, callable `coerce` and nested `dict`/`list` schemas,
+    any other rule raises `UnsupportedRule`.
+    """
+
+    def __init__(self, schema: dict, purge_unknown: bool = False):
+        """
+        Args:
+            schema (dict): Cerberus schema, already validated.
+            purge_unknown (bool, optional): Purge unknown field. Defaults to False.
+
+        Raises:
+            UnsupportedRule: If the schema can not be compiled.
+        """
+        self.schema = CompiledSchema(schema, purge_unknown)
+        self.document = None
+        self._errors = ErrorList()
+
+    @property
+    def errors(self) -> dict:
+        return self._errors.to_dict()
+
+    def normalized(self, document: Any) -> Any:
+        """Return the document normalized or `None` if it has errors."""
+        self._normalize(document)
+        return None if self._errors else self.document
+
+    def validate(self, document: Any) -> bool:
+        """Normalize and validate a document."""
+        self._normalize(document)
+        self.schema.validate(self.document, (), self._errors)
+        return not self._errors
+
+    def _normalize(self, document: Any) -> None:
+        if document is None:
+            raise DocumentError(errors.DOCUMENT_MISSING)
+        if not isinstance(document, Mapping):
+            raise DocumentError(errors.DOCUMENT_FORMAT.format(document))
+        self._errors = ErrorList()
+        self.document = self.schema.normalize(document, (), self._errors)
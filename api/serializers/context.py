@@ -1,5 +1,9 @@
+import re
+from typing import Tuple
 from typing import Union
 from .base import Serializer
+from .compiler import CompiledValidator
+from .utils import boolean
 
 
 class ContextSerializer(Serializer):
@@ -8,7 +12,17 @@ class ContextSerializer(Serializer):
     QUERY_PARAMS = {
         "limit": {"type": "integer", "coerce": int},
         "page": {"type": "integer", "coerce": int},
+        "cursor": {"type": "string"},
+        "stream": {"type": "boolean", "coerce": (str, boolean())},
+        "sort": {"type": "string"},
+        "fields": {"type": "string"},
+        "count": {"type": "boolean", "coerce": (str, boolean())},
+        "confirm": {"type": "boolean", "coerce": (str, boolean())},
     }
+    # `filter[field]=value` or `filter[field][operator]=value`.
+    FILTER = re.compile(r"^filter\[([^\[\]]+)\](?:\[([^\[\]]*)\])?$")
+    # Compiled once whatever the engine configured, it runs on every request.
+    QUERY_PARAMS_VALIDATOR = CompiledValidator(QUERY_PARAMS, purge_unknown=True)
 
     @classmethod
     def query_params(cls, params) -> Union[dict, list]:
@@ -23,7 +37,28 @@ class ContextSerializer(Serializer):
         if not params:
             return {}
 
-        errors, data = cls._serialize(cls.QUERY_PARAMS, dict(params), purge=True)
+        filters = cls.filters(params)
+        errors, data = cls._run(cls.QUERY_PARAMS_VALIDATOR, dict(params))
         if errors:
-            return {}
+            data = {}
+        if filters:
+            data["filter"] = filters
         return data
+
+    @classmethod
+    def filters(cls, params) -> Tuple[Tuple[str, str, str], ...]:
+        """Extract the filters, they are validated with the model schema.
+
+        Args:
+            params (dict): Query params.
+
+        Returns:
+            Tuple[Tuple[str, str, str], ...]: Field, operator and raw value.
+        """
+        filters = []
+        for key, value in params.items():
+            match = cls.FILTER.match(key) if key.startswith("filter[") else None
+            if match:
+                field, operator = match.groups()
+                filters.append((field, operator or "eq", value))
+        return tuple(filters)
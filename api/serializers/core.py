@@ -1,34 +1,86 @@
 import uuid
+from typing import Any
+from typing import List
 from typing import Tuple
 from typing import Union
 
+from cerberus.schema import SchemaError
+
 from .base import Serializer
+from .utils import boolean
 from api.configs import app_configs
 from api.datastructures import Model
+from api.datastructures import Query
+from api.metrics import metrics
 
 
 class CoreSerializer(Serializer):
     """Core Serializer"""
 
+    # Types that can be filtered and sorted, with the coercer of their values.
+    QUERY_TYPES = {
+        "string": str,
+        "integer": int,
+        "float": float,
+        "number": float,
+        "boolean": boolean(),
+    }
+    QUERY_OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in")
+    BOOLEAN_OPERATORS = ("eq", "ne")
+
+    @classmethod
+    def validator(
+        cls,
+        schema: dict,
+        name: Union[str, None] = None,
+        version: Union[str, None] = None,
+    ):
+        """Get the validator of a model schema.
+
+        Args:
+            schema (dict): cerberus schema.
+            name (Union[str, None], optional): model name, `None` is not cached.
+            version (Union[str, None], optional): `Model.schema_hash` of the
+                schema, `None` is not cached.
+
+        Raises:
+            SchemaError: If the schema is invalid.
+
+        Returns:
+            Validator: Cerberus validator.
+        """
+        key = (name, version) if name and version else None
+        return cls._validator(schema, purge=True, key=key)
+
     @classmethod
+    @metrics.timed(metrics.phases, "validation")
     def model(
-        cls, body: dict, schema: dict, is_update: bool = False
+        cls,
+        body: dict,
+        schema: dict,
+        is_update: bool = False,
+        name: Union[str, None] = None,
+        version: Union[str, None] = None,
     ) -> Tuple[Union[dict, None], Union[None, Model]]:
         """Serialize model.
 
         Args:
             body (dict): request body.
             schema (dict): cerberus schema.
+            is_update (bool, optional): skip the identifier. Defaults to False.
+            name (Union[str, None], optional): model name to cache the validator.
+            version (Union[str, None], optional): schema hash to cache the validator.
 
         Returns:
             Tuple[Union[dict, None], Union[None, Model]]:
                 Returns errors and data serialized.
         """
-        errors = cls._validate_schema(schema)
-        if errors:
-            return errors, None
+        try:
+            validator = cls.validator(schema, name, version)
+        except SchemaError as e:
+            return e.args[0], None
 
-        errors, data = cls._serialize(schema, body, purge=True)
+        errors, data = cls._run(validator, body)
         if errors:
             return errors, None
 
@@ -37,3 +89,208 @@ class CoreSerializer(Serializer):
             return None, data
 
         return None, data
+
+    @classmethod
+    def bulk(
+        cls,
+        items: list,
+        schema: dict,
+        name: Union[str, None] = None,
+        version: Union[str, None] = None,
+    ) -> Tuple[List[dict], List[dict], List[int]]:
+        """Serialize a list of rows.
+
+        Args:
+            items (list): request body.
+            schema (dict): cerberus schema.
+            name (Union[str, None], optional): model name to cache the validator.
+            version (Union[str, None], optional): schema hash to cache the validator.
+
+        Returns:
+            Tuple[List[dict], List[dict], List[int]]: Returns errors by index,
+                rows serialized and the index of every row.
+        """
+        errors, rows, indexes = [], [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "errors": "must be of dict type"})
+                continue
+
+            error, data = cls.model(item, schema, name=name, version=version)
+            if error:
+                errors.append({"index": index, "errors": error})
+                continue
+            rows.append(data)
+            indexes.append(index)
+        return errors, rows, indexes
+
+    @classmethod
+    @metrics.timed(metrics.phases, "validation")
+    def query(
+        cls, query_params: dict, schema: dict
+    ) -> Tuple[Union[dict, None], Union[Query, None]]:
+        """Serialize filters, sort and fields against the model schema.
+
+        Args:
+            query_params (dict): query params serialized.
+            schema (dict): cerberus schema.
+
+        Returns:
+            Tuple[Union[dict, None], Union[Query, None]]: Returns errors and
+                query, `None` if nothing was requested.
+        """
+        errors = {}
+        filters = cls.query_filters(query_params.get("filter", ()), schema, errors)
+        sort = cls.query_sort(query_params.get("sort"), schema, errors)
+        fields = cls.query_fields(query_params.get("fields"), schema, errors)
+        if errors:
+            return errors, None
+        if not (filters or sort or fields):
+            return None, None
+        return None, Query(filters, sort, fields)
+
+    @classmethod
+    def query_filters(
+        cls, filters: Tuple[Tuple[str, str, str], ...], schema: dict, errors: dict
+    ) -> Tuple[Tuple[str, str, Any], ...]:
+        """Validate and coerce filters.
+
+        Args:
+            filters (Tuple[Tuple[str, str, str], ...]): field, operator and raw value.
+            schema (dict): cerberus schema.
+            errors (dict): errors found, by param.
+
+        Returns:
+            Tuple[Tuple[str, str, Any], ...]: field, operator and value.
+        """
+        serialized = []
+        for field, operator, raw in filters:
+            key = f"filter[{field}]"
+            type_ = cls.query_type(schema, field)
+            if type_ is None:
+                errors[key] = ["unknown field"]
+                continue
+            operators = cls.QUERY_OPERATORS
+            if type_ == "boolean":
+                operators = cls.BOOLEAN_OPERATORS
+            if operator not in operators:
+                errors[key] = [f"unallowed operator {operator}"]
+                continue
+            try:
+                value = cls.query_value(type_, operator, raw)
+            except ValueError:
+                errors[key] = [f"must be of {type_} type"]
+                continue
+            serialized.append((field, operator, value))
+        return tuple(serialized)
+
+    @classmethod
+    def query_sort(
+        cls, value: Union[str, None], schema: dict, errors: dict
+    ) -> Tuple[Tuple[str, int], ...]:
+        """Validate sort, `-field` is descending.
+
+        Args:
+            value (Union[str, None]): comma separated fields.
+            schema (dict): cerberus schema.
+            errors (dict): errors found, by param.
+
+        Returns:
+            Tuple[Tuple[str, int], ...]: field and direction.
+        """
+        sort = []
+        for field in cls.query_list(value):
+            direction = -1 if field.startswith("-") else 1
+            field = field.lstrip("-")
+            if cls.query_type(schema, field) is None:
+                errors.setdefault("sort", []).append(f"unknown field {field}")
+                continue
+            sort.append((field, direction))
+        return tuple(sort)
+
+    @classmethod
+    def query_fields(
+        cls, value: Union[str, None], schema: dict, errors: dict
+    ) -> Tuple[str, ...]:
+        """Validate the fields to return.
+
+        Args:
+            value (Union[str, None]): comma separated fields.
+            schema (dict): cerberus schema.
+            errors (dict): errors found, by param.
+
+        Returns:
+            Tuple[str, ...]: fields.
+        """
+        fields = []
+        for field in cls.query_list(value):
+            if field != app_configs.IDENTIFIER_ID and not cls.rules(schema, field):
+                errors.setdefault("fields", []).append(f"unknown field {field}")
+                continue
+            fields.append(field)
+        return tuple(fields)
+
+    @staticmethod
+    def query_list(value: Union[str, None]) -> List[str]:
+        """Split a comma separated param."""
+        if not value:
+            return []
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    @staticmethod
+    def rules(schema: dict, field: str) -> Union[dict, None]:
+        """Get the rules of a field, nested fields are dotted.
+
+        Args:
+            schema (dict): cerberus schema.
+            field (str): field name.
+
+        Returns:
+            Union[dict, None]: Rules, `None` if the field is not in the schema.
+        """
+        rules = None
+        for name in field.split("."):
+            if not isinstance(schema, dict):
+                return None
+            rules = schema.get(name)
+            if not isinstance(rules, dict):
+                return None
+            schema = rules.get("schema") if rules.get("type") == "dict" else None
+        return rules
+
+    @classmethod
+    def query_type(cls, schema: dict, field: str) -> Union[str, None]:
+        """Get the type of a field that can be queried.
+
+        Args:
+            schema (dict): cerberus schema.
+            field (str): field name.
+
+        Returns:
+            Union[str, None]: Type, `None` if the field can not be queried.
+        """
+        if field == app_configs.IDENTIFIER_ID:
+            return "string"
+        rules = cls.rules(schema, field) or {}
+        type_ = rules.get("type")
+        return type_ if type_ in cls.QUERY_TYPES else None
+
+    @classmethod
+    def query_value(cls, type_: str, operator: str, raw: str) -> Any:
+        """Coerce a filter value to the field type.
+
+        Args:
+            type_ (str): field type.
+            operator (str): filter operator.
+            raw (str): value sent.
+
+        Raises:
+            ValueError: If the value can not be coerced.
+
+        Returns:
+            Any: Value coerced, a list for `in`.
+        """
+        coerce = cls.QUERY_TYPES[type_]
+        if operator == "in":
+            return tuple(coerce(item) for item in cls.query_list(raw))
+        return coerce(raw)
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from typing import List
 
 
@@ -14,3 +16,24 @@ def lower():
 def upper():
     """Return lambda with upper string"""
     return lambda s: s.upper()
+
+
+BOOLEANS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+def boolean():
+    """Return function with boolean from string, raise ValueError if not a boolean"""
+
+    def coerce(s: str) -> bool:
+        value = BOOLEANS.get(s.strip().lower())
+        if value is None:
+            raise ValueError(f"{s!r} is not a boolean")
+        return value
+
+    return coerce
+
+
+def schema_hash(schema: dict) -> str:
+    """Return a stable hash of a schema"""
+    raw = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
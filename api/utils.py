@@ -13,6 +13,24 @@ def json_serial(obj):
     raise TypeError("Type %s not serializable" % type(obj))
 
 
+def jsonable(obj):
+    """Convert an object to JSON types without encoding it.
+
+    Args:
+        obj (Any): Object with dicts, lists and datetimes.
+
+    Returns:
+        Any: Object with JSON types only.
+    """
+    if isinstance(obj, dict):
+        return {k: jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [jsonable(v) for v in obj]
+    if isinstance(obj, (datetime, date)):
+        return json_serial(obj)
+    return obj
+
+
 def get_or_create_model(name) -> str:
     """Get or create model name with uuid.
 
@@ -0,0 +1,13 @@
+import os
+
+# Local storage stand-in, the benchmarks do not need a database running.
+ENVIRON = {
+    "ENGINE_NAME": "MEMORY",
+    "MEMORY_SNAPSHOT_PATH": "",
+}
+
+
+def setup_environ() -> None:
+    """Set the default settings, call it before importing `api`."""
+    for key, value in ENVIRON.items():
+        os.environ.setdefault(key, value)
@@ -0,0 +1,76 @@
+import json
+from typing import Any
+from typing import Tuple
+from urllib.parse import urlsplit
+
+
+class ASGIClient:
+    """Call an ASGI app in-process, without sockets or HTTP parsing"""
+
+    def __init__(self, app: Any):
+        """
+        Args:
+            app (Any): ASGI application.
+        """
+        self.app = app
+
+    async def startup(self) -> None:
+        """Run the startup events."""
+        await self.app.router.startup()
+
+    async def shutdown(self) -> None:
+        """Run the shutdown events."""
+        await self.app.router.shutdown()
+
+    async def request(
+        self, method: str, url: str, body: Any = None, headers: dict = None
+    ) -> Tuple[int, bytes]:
+        """Send a request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Path with query string.
+            body (Any, optional): JSON body.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            Tuple[int, bytes]: Status code and body, streamed bodies are joined.
+        """
+        content = b"" if body is None else json.dumps(body).encode()
+        raw_headers = [(b"host", b"bench"), (b"content-length", b"%d" % len(content))]
+        if body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), value.encode()))
+
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": parts.path,
+            "raw_path": parts.path.encode(),
+            "query_string": parts.query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 5000),
+            "server": ("bench", 80),
+        }
+        messages = [{"type": "http.request", "body": content, "more_body": False}]
+        response = {"status": 0, "body": []}
+
+        async def receive() -> dict:
+            if messages:
+                return messages.pop()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], b"".join(response["body"])
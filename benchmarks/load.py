@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from benchmarks import setup_environ
+from benchmarks.asgi import ASGIClient
+
+USERS = "/bench/users"
+ITEMS = "/bench/items"
+STATIC = "/bench/static"
+SCHEMA = {
+    "name": {"type": "string", "required": True},
+    "age": {"type": "integer", "index": True},
+}
+# Operations of the `crud` scenario and their weights.
+CRUD = (("post", 30), ("get", 30), ("list", 20), ("put", 15), ("delete", 5))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile.
+
+    Args:
+        values (List[float]): Values sorted.
+        q (float): Percentile, from 0 to 100.
+
+    Returns:
+        float: Value, `0` without values.
+    """
+    if not values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """Summarize a scenario.
+
+    Args:
+        latencies (List[float]): Seconds by request.
+        errors (int): Requests with an unexpected status.
+        elapsed (float): Seconds of the scenario.
+
+    Returns:
+        dict: Requests, errors, req/s and latencies in milliseconds.
+    """
+    values = sorted(latencies)
+    total = len(values)
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / total * 1000, 3) if total else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p90_ms": round(percentile(values, 90) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if total else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Find the scenarios slower than a baseline.
+
+    Args:
+        results (dict): Scenarios measured.
+        baseline (dict): Scenarios of a previous run.
+        threshold (float): Ratio tolerated, `0.1` is 10%.
+
+    Returns:
+        List[str]: Regressions found.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms"
+            )
+    return regressions
+
+
+class LoadTest:
+    """Scenarios of requests sent to the app in-process"""
+
+    def __init__(
+        self, client: ASGIClient, requests: int, concurrency: int, seed: int, rows: int
+    ):
+        """
+        Args:
+            client (ASGIClient): App client.
+            requests (int): Requests by scenario.
+            concurrency (int): Requests in flight.
+            seed (int): Seed of the random choices.
+            rows (int): Rows stored to read in the `list` scenario.
+        """
+        self.client = client
+        self.requests = requests
+        self.concurrency = concurrency
+        self.seed = seed
+        self.rows = rows
+        self.ids = []  # Users stored.
+        self.scenarios = {
+            "admin": self.admin,
+            "crud": self.crud,
+            "list": self.list,
+            "static": self.static,
+        }
+
+    async def setup(self) -> None:
+        """Create the models and store the rows read."""
+        models = [
+            {"name": "bench-users", "path": USERS, "schema": SCHEMA},
+            {"name": "bench-items", "path": ITEMS, "schema": SCHEMA},
+            {
+                "name": "bench-static",
+                "path": STATIC,
+                "schema": SCHEMA,
+                "static": {"ALL": {"ok": True}},
+            },
+        ]
+        for model in models:
+            status, body = await self.client.request("POST", "/admin/models", model)
+            if status != 201:
+                raise RuntimeError(f"model `{model['name']}` not created: {body}")
+
+        for start in range(0, self.rows, 1000):
+            end = min(start + 1000, self.rows)
+            rows = [{"name": f"item {i}", "age": i % 100} for i in range(start, end)]
+            await self.client.request("POST", ITEMS, rows)
+
+        for i in range(100):
+            _, body = await self.client.request(
+                "POST", USERS, {"name": f"user {i}", "age": i}
+            )
+            self.created(body)
+
+    async def run(self, name: str) -> dict:
+        """Send the requests of a scenario.
+
+        Args:
+            name (str): Scenario name.
+
+        Returns:
+            dict: Scenario summary.
+        """
+        build = self.scenarios[name]
+        rng = random.Random(f"{self.seed}-{name}")
+        latencies, errors, sequence = [], [], iter(range(self.requests))
+
+        async def worker():
+            for i in sequence:
+                method, url, body, expected, done = build(rng, i)
+                start = time.perf_counter()
+                status, content = await self.client.request(method, url, body)
+                latencies.append(time.perf_counter() - start)
+                if status not in expected:
+                    errors.append(status)
+                elif done:
+                    done(content)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return summarize(latencies, len(errors), time.perf_counter() - start)
+
+    # Scenarios, they return method, url, body, status expected and callback.
+    def admin(self, rng: random.Random, i: int) -> Tuple:
+        model = {"name": f"bench-model-{i}", "path": f"/bench/models/{i}"}
+        return "POST", "/admin/models", {**model, "schema": SCHEMA}, (201,), None
+
+    def crud(self, rng: random.Random, i: int) -> Tuple:
+        operations, weights = zip(*CRUD)
+        operation = rng.choices(operations, weights)[0]
+        user = {"name": f"user {i}", "age": rng.randrange(100)}
+        if operation == "post" or len(self.ids) < 10:
+            return "POST", USERS, user, (201,), self.created
+        if operation == "get":
+            return "GET", f"{USERS}/{rng.choice(self.ids)}", None, (200,), None
+        if operation == "list":
+            return "GET", f"{USERS}?limit=20&page={rng.randint(1, 5)}", None, (200,), None
+        if operation == "put":
+            return "PUT", f"{USERS}/{rng.choice(self.ids)}", user, (204,), None
+        public_id = self.ids.pop(rng.randrange(len(self.ids)))
+        return "DELETE", f"{USERS}/{public_id}", None, (204,), None
+
+    def list(self, rng: random.Random, i: int) -> Tuple:
+        pages = max(self.rows // 500, 1)
+        url = f"{ITEMS}?limit=500&page={rng.randint(1, pages)}"
+        return "GET", url, None, (200,), None
+
+    def static(self, rng: random.Random, i: int) -> Tuple:
+        return "GET", STATIC, None, (200,), None
+
+    def created(self, content: bytes) -> None:
+        self.ids.append(json.loads(content)["public_id"])
+
+
+def print_table(results: dict, out: Callable = print) -> None:
+    """Print the scenarios as a table.
+
+    Args:
+        results (dict): Scenarios summaries.
+        out (Callable, optional): Writer.
+    """
+    columns = ("requests", "errors", "rps", "p50_ms", "p90_ms", "p99_ms", "max_ms")
+    out(f"{'scenario':<10}" + "".join(f"{c:>11}" for c in columns))
+    for name, summary in results.items():
+        out(f"{name:<10}" + "".join(f"{summary[c]:>11}" for c in columns))
+
+
+async def main(args: argparse.Namespace) -> dict:
+    """Run the scenarios on a new app.
+
+    Args:
+        args (argparse.Namespace): Command arguments.
+
+    Returns:
+        dict: Metadata and scenarios summaries.
+    """
+    setup_environ()
+    from api.configs import app_configs
+    from api.main import app
+    from api.responses import dumps
+
+    client = ASGIClient(app)
+    await client.startup()
+    try:
+        load = LoadTest(
+            client, args.requests, args.concurrency, args.seed, args.rows
+        )
+        await load.setup()
+        results = {name: await load.run(name) for name in args.scenarios}
+    finally:
+        await client.shutdown()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": app_configs.ENGINE_NAME,
+            "encoder": dumps.__name__,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "rows": args.rows,
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the app in-process.")
+    parser.add_argument("--requests", type=int, default=2000, help="by scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=5000, help="rows listed")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=["admin", "crud", "list", "static"]
+    )
+    parser.add_argument("--output", help="JSON file with the results")
+    parser.add_argument("--baseline", help="JSON file of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+    print_table(report["scenarios"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+        regressions = compare(report["scenarios"], baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,95 @@
+import argparse
+import json
+import statistics
+import timeit
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from benchmarks import setup_environ
+
+SCHEMA = {
+    "name": {"type": "string", "required": True},
+    "age": {"type": "integer", "min": 0},
+    "tags": {"type": "list", "schema": {"type": "string"}},
+}
+BODY = {"name": "one", "age": 30, "tags": ["a", "b"]}
+
+
+def cases() -> Dict[str, Callable[[], object]]:
+    """Functions measured by name.
+
+    Returns:
+        Dict[str, Callable[[], object]]: Calls without arguments.
+    """
+    setup_environ()
+    from api.datastructures import Model
+    from api.serializers.core import CoreSerializer
+    from api.utils import split_uuid_path
+
+    with_uuid = "/bench/users/0f8fad5b-d9cb-469f-a165-70867728950e"
+    model = Model(path="/bench/users", name="bench-users", schema=SCHEMA)
+    return {
+        "split_uuid_path[uuid]": lambda: split_uuid_path(with_uuid),
+        "split_uuid_path[path]": lambda: split_uuid_path("/bench/users/"),
+        "CoreSerializer.model": lambda: CoreSerializer.model(
+            dict(BODY), SCHEMA, name=model.name, version=model.schema_hash
+        ),
+        "CoreSerializer.model[update]": lambda: CoreSerializer.model(
+            {"age": 31},
+            SCHEMA,
+            is_update=True,
+            name=model.name,
+            version=model.schema_hash,
+        ),
+        "BaseModel.to_json": model.to_json,
+    }
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int) -> dict:
+    """Time a function.
+
+    Args:
+        fn (Callable[[], object]): Function measured.
+        number (int): Calls by round.
+        repeat (int): Rounds.
+
+    Returns:
+        dict: Best and median nanoseconds by call.
+    """
+    rounds = [t / number * 1e9 for t in timeit.repeat(fn, number=number, repeat=repeat)]
+    return {
+        "best_ns": round(min(rounds), 1),
+        "median_ns": round(statistics.median(rounds), 1),
+        "ops": round(1e9 / min(rounds)),
+    }
+
+
+def main(argv: List[str] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of hot paths.")
+    parser.add_argument("--number", type=int, default=10000, help="calls by round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds")
+    parser.add_argument("--output", help="JSON file with the results")
+    args = parser.parse_args(argv)
+
+    results = {
+        name: measure(fn, args.number, args.repeat) for name, fn in cases().items()
+    }
+    print(f"{'case':<32}{'best_ns':>12}{'median_ns':>12}{'ops':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<32}{result['best_ns']:>12}{result['median_ns']:>12}"
+            f"{result['ops']:>12}"
+        )
+    from api.serializers.base import Serializer
+
+    meta = {"number": args.number, "repeat": args.repeat, "serializer": Serializer.engine}
+    report = {"meta": meta, "cases": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks.asgi import ASGIClient
+from benchmarks.load import compare
+from benchmarks.load import percentile
+from benchmarks.load import summarize
+
+
+class TestStats:
+    def test_percentile(self):
+        # Mocks
+        values = [float(i) for i in range(1, 101)]
+        # process & asserts
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self):
+        # process
+        response = summarize([0.002, 0.001], 1, 0.5)
+        # asserts
+        assert response["requests"] == 2
+        assert response["errors"] == 1
+        assert response["rps"] == 4.0
+        assert response["p50_ms"] == 1.0
+        assert response["max_ms"] == 2.0
+
+    def test_compare(self):
+        # Mocks
+        baseline = {"crud": {"rps": 1000, "p99_ms": 1.0}}
+        results = {
+            "crud": {"rps": 850, "p99_ms": 1.05},
+            "list": {"rps": 10, "p99_ms": 9.0},
+        }
+        # process
+        response = compare(results, baseline, 0.1)
+        # asserts
+        assert response == ["crud: rps 1000 -> 850"]
+
+
+class TestASGIClient:
+    @pytest.mark.asyncio
+    async def test_request(self):
+        # Mocks
+        received = {}
+
+        async def app(scope, receive, send):
+            received["scope"] = scope
+            received["body"] = (await receive())["body"]
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        # process
+        response = await ASGIClient(app).request("POST", "/users?limit=1", {"a": 1})
+        # asserts
+        assert response == (201, b"ok")
+        assert received["scope"]["path"] == "/users"
+        assert received["scope"]["query_string"] == b"limit=1"
+        assert received["body"] == b'{"a": 1}'
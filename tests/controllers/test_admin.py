@@ -0,0 +1,163 @@
+import functools
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.configs import app_configs
+from api.controllers import admin
+from api.controllers.admin import AdminController
+from api.datastructures import Job
+from api.datastructures import Model
+from api.datastructures import RequestContext
+from api.metrics import Metrics
+from tests.conftest import AsyncMock
+
+
+def get_context(headers=None) -> RequestContext:
+    return RequestContext(
+        method="GET", headers=headers or {}, original_path="/metrics"
+    )
+
+
+class TestAdminControllerMetrics:
+    def test_metrics_disabled(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(admin, "metrics", Metrics(False))
+        # process
+        response = AdminController.metrics(get_context())
+        # asserts
+        assert response.status_code == 404
+
+    def test_metrics_without_token(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(admin, "metrics", Metrics(True))
+        monkeypatch.setattr(app_configs, "METRICS_TOKEN", "secret")
+        # process
+        response = AdminController.metrics(get_context({"authorization": "Bearer x"}))
+        # asserts
+        assert response.status_code == 401
+
+    def test_metrics_without_token_configured(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(admin, "metrics", Metrics(True))
+        monkeypatch.setattr(app_configs, "METRICS_TOKEN", "")
+        # process
+        response = AdminController.metrics(get_context({"authorization": "Bearer "}))
+        # asserts
+        assert response.status_code == 401
+
+    def test_metrics_rendered(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(admin, "metrics", Metrics(True))
+        monkeypatch.setattr(app_configs, "METRICS_TOKEN", "secret")
+        headers = {"authorization": "Bearer secret"}
+        # process
+        response = AdminController.metrics(get_context(headers))
+        # asserts
+        assert response.status_code == 200
+        assert response.media_type.startswith("text/plain")
+        assert b"# TYPE apiruns_requests_total counter" in response.body
+
+
+class TestAdminControllerJobs:
+    @pytest.mark.asyncio
+    async def test_update_model_queues_migration(self, monkeypatch):
+        # Mocks
+        model = Model(path="/users", name="users", schema={"age": {"type": "integer"}})
+        update_model = AsyncMock(return_value=model)
+        create_job = AsyncMock(side_effect=lambda _, job: job)
+        monkeypatch.setattr(AdminController.repository, "update_model", update_model)
+        monkeypatch.setattr(AdminController.repository, "create_job", create_job)
+        body = {"name": "users", "schema": model.schema}
+        context = RequestContext(
+            method="PUT",
+            headers={},
+            raw_body=json.dumps(body).encode(),
+            original_path="/admin/models",
+        )
+        # process
+        response = await AdminController.update_model(context)
+        # asserts
+        content = json.loads(response.body)
+        assert response.status_code == 202
+        assert (content["kind"], content["model"]) == (Job.MIGRATE, "users")
+        assert content["status"] == Job.QUEUED
+
+    @pytest.mark.asyncio
+    async def test_update_model_not_found(self, monkeypatch):
+        # Mocks
+        update_model = AsyncMock(return_value=None)
+        monkeypatch.setattr(AdminController.repository, "update_model", update_model)
+        body = {"name": "users", "schema": {"age": {"type": "integer"}}}
+        context = RequestContext(
+            method="PUT",
+            headers={},
+            raw_body=json.dumps(body).encode(),
+            original_path="/admin/models",
+        )
+        # process
+        response = await AdminController.update_model(context)
+        # asserts
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_delete_model_queues_drop(self, monkeypatch):
+        # Mocks
+        calls = []
+        repository = AdminController.repository
+
+        async def record(name, result, *args):
+            job = next((arg for arg in args if isinstance(arg, Job)), None)
+            calls.append((name, job.status if job else None))
+            return job if result is None else result
+
+        for name, result in (
+            ("model_by_name", Model(path="/users", name="users")),
+            ("create_job", None),
+            ("delete_model", 1),
+            ("save_job", None),
+        ):
+            fn = functools.partial(record, name, result)
+            monkeypatch.setattr(repository, name, fn)
+        context = RequestContext(
+            method="DELETE", headers={}, body={"name": "users"}, original_path="/"
+        )
+        # process
+        response = await AdminController.delete_model(context)
+        # asserts
+        assert response.status_code == 204
+        assert calls == [
+            ("model_by_name", None),
+            ("create_job", Job.RUNNING),
+            ("delete_model", None),
+            ("save_job", Job.QUEUED),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delete_model_not_found(self, monkeypatch):
+        # Mocks
+        create_job = MagicMock(side_effect=AsyncMock())
+        monkeypatch.setattr(
+            AdminController.repository, "model_by_name", AsyncMock(return_value=None)
+        )
+        monkeypatch.setattr(AdminController.repository, "create_job", create_job)
+        context = RequestContext(
+            method="DELETE", headers={}, body={"name": "users"}, original_path="/"
+        )
+        # process
+        response = await AdminController.delete_model(context)
+        # asserts
+        assert response.status_code == 204
+        create_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_job_not_found(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(
+            AdminController.repository, "job_by_id", AsyncMock(return_value=None)
+        )
+        # process
+        response = await AdminController.jobs(get_context(), "j1")
+        # asserts
+        assert response.status_code == 404
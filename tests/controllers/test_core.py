@@ -0,0 +1,487 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.cache import ModelRegistry
+from api.cache import response_cache
+from api.configs import app_configs
+from api.controllers import core
+from api.controllers.core import CoreController
+from api.datastructures import Model
+from api.datastructures import RequestContext
+from api.ingest import ingestor
+from tests.conftest import AsyncMock
+
+
+def get_context(method="POST", body=None, path="/users") -> RequestContext:
+    model = Model(
+        path="/users",
+        name="users",
+        schema={"name": {"type": "string", "required": True}},
+    )
+    return RequestContext(
+        method=method, headers={}, body=body, original_path=path, model=model
+    )
+
+
+class TestCoreControllerModelByPath:
+    @pytest.mark.asyncio
+    async def test_model_cached(self, monkeypatch):
+        # Mocks
+        registry = ModelRegistry(ttl=60, size=10)
+        model = get_context().model
+        monkeypatch.setattr(core, "model_registry", registry)
+        monkeypatch.setattr(
+            CoreController.repository, "model_by_path", AsyncMock(return_value=model)
+        )
+        # process
+        response = await CoreController.model_by_path("/users")
+        # asserts
+        assert response is model
+        assert registry.get("/users") is model
+
+    @pytest.mark.asyncio
+    async def test_model_not_cached_when_removed_during_lookup(self, monkeypatch):
+        # Mocks
+        registry = ModelRegistry(ttl=60, size=10)
+        model = get_context().model
+
+        async def model_by_path(path):
+            registry.remove(model.name)  # Watcher invalidation meanwhile.
+            return model
+
+        monkeypatch.setattr(core, "model_registry", registry)
+        monkeypatch.setattr(CoreController.repository, "model_by_path", model_by_path)
+        # process
+        response = await CoreController.model_by_path("/users")
+        # asserts
+        assert response is model
+        assert registry.get("/users") is None
+
+
+class TestCoreControllerBulkPost:
+    @pytest.mark.asyncio
+    async def test_bulk_post_all_created(self, monkeypatch):
+        # Mocks
+        create_rows = AsyncMock(return_value=(["u1", "u2"], []))
+        monkeypatch.setattr(CoreController.repository, "create_rows", create_rows)
+        context = get_context(body=[{"name": "one"}, {"name": "two"}])
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        assert response.status_code == 201
+        assert json.loads(response.body) == {"created": ["u1", "u2"], "errors": []}
+
+    @pytest.mark.asyncio
+    async def test_bulk_post_with_errors(self, monkeypatch):
+        # Mocks
+        create_rows = AsyncMock(return_value=(["u1"], [(1, "duplicate key")]))
+        monkeypatch.setattr(CoreController.repository, "create_rows", create_rows)
+        body = [{"name": "one"}, {}, "two", {"name": "three"}]
+        context = get_context(body=body)
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        assert response.status_code == 207
+        assert json.loads(response.body) == {
+            "created": ["u1"],
+            "errors": [
+                {"index": 1, "errors": {"name": ["required field"]}},
+                {"index": 2, "errors": "must be of dict type"},
+                {"index": 3, "errors": "duplicate key"},
+            ],
+        }
+
+    @pytest.mark.asyncio
+    async def test_bulk_post_nothing_created(self, monkeypatch):
+        # Mocks
+        create_rows = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "create_rows", create_rows)
+        context = get_context(body=[{}])
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        assert response.status_code == 400
+        create_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_post_empty_list(self):
+        # process
+        response = await CoreController.post(get_context(body=[]))
+        # asserts
+        assert response.status_code == 400
+
+
+class TestCoreControllerIngest:
+    @pytest.mark.asyncio
+    async def test_post_queued(self, monkeypatch):
+        # Mocks
+        put = MagicMock(return_value=True)
+        monkeypatch.setattr(ingestor, "put", put)
+        context = get_context(body={"name": "one"})
+        context.model.ingest = {"batch": 100}
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        body = json.loads(response.body)
+        assert response.status_code == 202
+        assert list(body) == [app_configs.IDENTIFIER_ID]
+        name, options, _, row = put.call_args[0]
+        assert (name, options) == ("users", {"batch": 100})
+        assert row[app_configs.IDENTIFIER_ID] == body[app_configs.IDENTIFIER_ID]
+
+    @pytest.mark.asyncio
+    async def test_insert_batch_invalidates(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+        response_cache.set("users", "key", b"[]", ttl=30)
+        create_rows = AsyncMock(return_value=(["u1"], []))
+        monkeypatch.setattr(CoreController.repository, "create_rows", create_rows)
+        # process
+        response = await CoreController.insert_batch("users", [{"name": "one"}])
+        # asserts
+        assert response == (["u1"], [])
+        assert len(response_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_post_queue_full(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(ingestor, "put", MagicMock(return_value=False))
+        context = get_context(body={"name": "one"})
+        context.model.ingest = {"batch": 100}
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_post_invalid_not_queued(self, monkeypatch):
+        # Mocks
+        put = MagicMock()
+        monkeypatch.setattr(ingestor, "put", put)
+        context = get_context(body={})
+        context.model.ingest = {"batch": 100}
+        # process
+        response = await CoreController.post(context)
+        # asserts
+        assert response.status_code == 400
+        put.assert_not_called()
+
+
+class TestCoreControllerCursor:
+    @pytest.mark.asyncio
+    async def test_get_by_cursor_next_page(self, monkeypatch):
+        # Mocks
+        find_by_cursor = AsyncMock(return_value=([{"name": "one"}], "token"))
+        monkeypatch.setattr(CoreController.repository, "find_by_cursor", find_by_cursor)
+        context = get_context(method="GET")
+        context.query_params = {"cursor": ""}
+        # process
+        response = await CoreController.get(context)
+        # asserts
+        assert response.status_code == 200
+        assert response.headers["X-Next-Cursor"] == "token"
+        assert json.loads(response.body) == [{"name": "one"}]
+
+    @pytest.mark.asyncio
+    async def test_get_by_cursor_last_page(self, monkeypatch):
+        # Mocks
+        find_by_cursor = AsyncMock(return_value=([], None))
+        monkeypatch.setattr(CoreController.repository, "find_by_cursor", find_by_cursor)
+        context = get_context(method="GET")
+        context.query_params = {"cursor": "token"}
+        # process
+        response = await CoreController.get(context)
+        # asserts
+        assert "X-Next-Cursor" not in response.headers
+        assert json.loads(response.body) == []
+
+
+class TestCoreControllerStream:
+    @pytest.mark.parametrize(
+        "headers, query_params, expected",
+        [
+            ({}, {}, False),
+            ({}, {"stream": True}, True),
+            ({"accept": "application/x-ndjson"}, {}, True),
+            ({"accept": "application/json"}, {"stream": False}, False),
+        ],
+    )
+    def test_is_stream(self, headers, query_params, expected):
+        # Mocks
+        context = get_context(method="GET")
+        context.headers = headers
+        context.query_params = query_params
+        # process
+        response = CoreController.is_stream(context)
+        # asserts
+        assert response is expected
+
+    @pytest.mark.asyncio
+    async def test_get_stream(self, monkeypatch):
+        # Mocks
+        async def rows():
+            for row in [{"name": "one"}, {"name": "two"}]:
+                yield row
+
+        stream_rows = MagicMock(return_value=rows())
+        monkeypatch.setattr(CoreController.repository, "stream_rows", stream_rows)
+        context = get_context(method="GET")
+        context.query_params = {"stream": True}
+        # process
+        response = await CoreController.get(context)
+        body = [chunk async for chunk in response.body_iterator]
+        # asserts
+        assert response.media_type == "application/x-ndjson"
+        assert body == [b'{"name":"one"}\n', b'{"name":"two"}\n']
+
+
+class TestCoreControllerResponseCache:
+    def _get_context(self, headers=None) -> RequestContext:
+        context = get_context(method="GET")
+        context.model.cache = {"ttl": 30}
+        context.headers = headers or {}
+        return context
+
+    @pytest.mark.asyncio
+    async def test_get_cached_once(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+        find = AsyncMock(return_value=[{"name": "one"}])
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        # process
+        first = await CoreController.get(self._get_context())
+        second = await CoreController.get(self._get_context())
+        # asserts
+        assert find.call_count == 1
+        assert second.body == first.body == b'[{"name":"one"}]'
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert second.headers["Cache-Control"] == "max-age=30"
+
+    @pytest.mark.asyncio
+    async def test_get_not_cached_when_invalidated_meanwhile(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+
+        async def find(*args):
+            response_cache.invalidate("users")  # Rows written meanwhile.
+            return [{"name": "one"}]
+
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        # process
+        response = await CoreController.get(self._get_context())
+        # asserts
+        assert response.body == b'[{"name":"one"}]'
+        assert len(response_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_cached_not_modified(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+        find = AsyncMock(return_value=[])
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        first = await CoreController.get(self._get_context())
+        headers = {"if-none-match": first.headers["ETag"]}
+        # process
+        response = await CoreController.get(self._get_context(headers))
+        # asserts
+        assert response.status_code == 304
+        assert response.body == b""
+
+    @pytest.mark.asyncio
+    async def test_get_not_found_not_cached(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+        find = AsyncMock(return_value=None)
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        # process
+        response = await CoreController.get(self._get_context())
+        # asserts
+        assert response.status_code == 404
+        assert len(response_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates(self, monkeypatch):
+        # Mocks
+        response_cache.clear()
+        response_cache.set("users", "key", b"[]", ttl=30)
+        context = get_context(body={"name": "one"})
+        context.model.cache = {"ttl": 30}
+        monkeypatch.setattr(
+            CoreController, "model_by_path", AsyncMock(return_value=context.model)
+        )
+        monkeypatch.setattr(
+            CoreController.repository, "create_row", AsyncMock(return_value={})
+        )
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 201
+        assert len(response_cache) == 0
+
+
+class TestCoreControllerQuery:
+    @pytest.mark.asyncio
+    async def test_get_with_invalid_query(self, monkeypatch):
+        # Mocks
+        find = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        context = get_context(method="GET")
+        context.query_params = {"sort": "other"}
+        # process
+        response = await CoreController.get(context)
+        # asserts
+        assert response.status_code == 400
+        assert json.loads(response.body) == {"sort": ["unknown field other"]}
+        find.assert_not_called()
+
+
+class TestCoreControllerCount:
+    @pytest.mark.asyncio
+    async def test_get_with_total_count(self, monkeypatch):
+        # Mocks
+        find = AsyncMock(return_value=[{"name": "one"}])
+        count_rows = AsyncMock(return_value=25)
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        monkeypatch.setattr(CoreController.repository, "count_rows", count_rows)
+        context = get_context(method="GET")
+        context.query_params = {"count": True, "limit": 1}
+        # process
+        response = await CoreController.get(context)
+        # asserts
+        assert response.headers["X-Total-Count"] == "25"
+
+    @pytest.mark.asyncio
+    async def test_get_without_total_count(self, monkeypatch):
+        # Mocks
+        find = AsyncMock(return_value=[])
+        count_rows = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "find_one_or_many", find)
+        monkeypatch.setattr(CoreController.repository, "count_rows", count_rows)
+        context = get_context(method="GET")
+        # process
+        response = await CoreController.get(context)
+        # asserts
+        assert "X-Total-Count" not in response.headers
+        count_rows.assert_not_called()
+
+
+FILTERED = {"filter": (("name", "eq", "one"),), "confirm": True}
+
+
+class TestCoreControllerBulkChanges:
+    def _get_context(self, method, monkeypatch, query_params, body=None):
+        context = get_context(method=method, body=body)
+        context.query_params = query_params
+        monkeypatch.setattr(
+            CoreController, "model_by_path", AsyncMock(return_value=context.model)
+        )
+        return context
+
+    @pytest.mark.asyncio
+    async def test_patch_many(self, monkeypatch):
+        # Mocks
+        filters = (("name", "eq", "one"),)
+        context = self._get_context(
+            "PATCH", monkeypatch, {"filter": filters, "confirm": True}, {"name": "two"}
+        )
+        update_rows = MagicMock(side_effect=AsyncMock(return_value=(3, 2)))
+        monkeypatch.setattr(
+            CoreController.repository,
+            "affected_ids",
+            AsyncMock(return_value=["r1", "r2", "r3"]),
+        )
+        monkeypatch.setattr(CoreController.repository, "update_rows", update_rows)
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 200
+        assert json.loads(response.body) == {"matched": 3, "modified": 2}
+        name, query, data, ids = update_rows.call_args[0]
+        assert (name, query.filters, data) == ("users", filters, {"name": "two"})
+        assert ids == ["r1", "r2", "r3"]
+
+    @pytest.mark.asyncio
+    async def test_delete_many(self, monkeypatch):
+        # Mocks
+        context = self._get_context("DELETE", monkeypatch, FILTERED)
+        monkeypatch.setattr(
+            CoreController.repository, "affected_ids", AsyncMock(return_value=[1, 2])
+        )
+        monkeypatch.setattr(
+            CoreController.repository, "delete_rows", AsyncMock(return_value=2)
+        )
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 200
+        assert json.loads(response.body) == {"matched": 2, "deleted": 2}
+
+    @pytest.mark.asyncio
+    async def test_delete_many_nothing_matched(self, monkeypatch):
+        # Mocks
+        context = self._get_context("DELETE", monkeypatch, FILTERED)
+        delete_rows = AsyncMock()
+        monkeypatch.setattr(
+            CoreController.repository, "affected_ids", AsyncMock(return_value=[])
+        )
+        monkeypatch.setattr(CoreController.repository, "delete_rows", delete_rows)
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert json.loads(response.body) == {"matched": 0, "deleted": 0}
+        delete_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_many_without_filters(self, monkeypatch):
+        # Mocks
+        context = self._get_context("DELETE", monkeypatch, {"confirm": True})
+        delete_rows = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "delete_rows", delete_rows)
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 400
+        assert "filter" in json.loads(response.body)["error"]
+        delete_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_many_without_confirm(self, monkeypatch):
+        # Mocks
+        context = self._get_context(
+            "DELETE", monkeypatch, {"filter": FILTERED["filter"]}
+        )
+        delete_rows = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "delete_rows", delete_rows)
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 400
+        delete_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_many_over_limit(self, monkeypatch):
+        # Mocks
+        context = self._get_context("DELETE", monkeypatch, FILTERED)
+        monkeypatch.setattr(app_configs, "BULK_MAX_AFFECTED", 2)
+        affected_ids = MagicMock(side_effect=AsyncMock(return_value=[1, 2, 3]))
+        delete_rows = AsyncMock()
+        monkeypatch.setattr(CoreController.repository, "affected_ids", affected_ids)
+        monkeypatch.setattr(CoreController.repository, "delete_rows", delete_rows)
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 400
+        assert affected_ids.call_args[0][-1] == 3
+        delete_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_put_collection_not_allowed(self, monkeypatch):
+        # Mocks
+        context = self._get_context("PUT", monkeypatch, {"confirm": True})
+        # process
+        response = await CoreController.handle(context)
+        # asserts
+        assert response.status_code == 405
@@ -0,0 +1,222 @@
+import threading
+
+import pytest
+from pymongo.errors import BulkWriteError
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import OperationFailure
+
+from api.engines import build_engine
+from api.engines.memory import match
+from api.engines.memory import MemoryCollection
+from api.engines.memory import MemoryEngine
+from api.engines.memory import MemorySnapshot
+from api.engines.memory import json_util
+from api.engines.memory import project
+
+
+class TestMatch:
+    def test_match_equality_and_missing_fields(self):
+        # Mocks
+        document = {"name": "one", "tags": ["a", "b"], "info": {"age": 1}}
+        # process & asserts
+        assert match(document, {"name": "one", "info.age": 1})
+        assert match(document, {"tags": "a"})
+        assert match(document, {"other": None})
+        assert not match(document, {"name": "two"})
+
+    def test_match_operators(self):
+        # Mocks
+        document = {"age": 10, "active": True}
+        # process & asserts
+        assert match(document, {"age": {"$gt": 5, "$lte": 10}})
+        assert match(document, {"age": {"$in": [1, 10]}, "active": {"$ne": 1}})
+        assert not match(document, {"age": {"$gt": "5"}})
+        assert match(document, {"$or": [{"age": 1}, {"active": True}]})
+
+    def test_match_unknown_operator(self):
+        # process & asserts
+        with pytest.raises(OperationFailure):
+            match({"age": 1}, {"age": {"$regex": "1"}})
+
+    def test_project(self):
+        # Mocks
+        document = {"_id": 1, "name": "one", "info": {"age": 1, "city": "x"}}
+        # process & asserts
+        assert project(document, {"name": 1, "_id": 0}) == {"name": "one"}
+        assert project(document, {"info.city": 0, "_id": 0}) == {
+            "name": "one",
+            "info": {"age": 1},
+        }
+
+
+class TestMemoryCollection:
+    @pytest.mark.asyncio
+    async def test_insert_find_sort_skip_limit(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        for age in (3, 1, 2):
+            await collection.insert_one({"age": age})
+        # process
+        cursor = collection.find({}, {"_id": 0}).sort([("age", -1)])
+        response = await cursor.skip(1).limit(1).to_list(1)
+        # asserts
+        assert response == [{"age": 2}]
+
+    @pytest.mark.asyncio
+    async def test_insert_one_sets_id_and_copies(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        data = {"info": {"age": 1}}
+        # process
+        result = await collection.insert_one(data)
+        data["info"]["age"] = 2
+        # asserts
+        assert data["_id"] == result.inserted_id
+        assert await collection.find_one({}, {"_id": 0}) == {"info": {"age": 1}}
+
+    @pytest.mark.asyncio
+    async def test_unique_index(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        await collection.create_index("public_id", unique=True)
+        await collection.insert_one({"public_id": "u1"})
+        # process & asserts
+        with pytest.raises(DuplicateKeyError):
+            await collection.insert_one({"public_id": "u1"})
+        assert await collection.count_documents({"public_id": "u1"}) == 1
+
+    @pytest.mark.asyncio
+    async def test_unique_index_on_duplicated_values(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        await collection.insert_many([{"name": "one"}, {"name": "one"}])
+        # process & asserts
+        with pytest.raises(DuplicateKeyError):
+            await collection.create_index("name", unique=True)
+
+    @pytest.mark.asyncio
+    async def test_insert_many_unordered_errors(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        await collection.create_index("public_id", unique=True)
+        rows = [{"public_id": "u1"}, {"public_id": "u1"}, {"public_id": "u2"}]
+        # process
+        with pytest.raises(BulkWriteError) as e:
+            await collection.insert_many(rows, ordered=False)
+        # asserts
+        assert [err["index"] for err in e.value.details["writeErrors"]] == [1]
+        assert await collection.estimated_document_count() == 2
+
+    @pytest.mark.asyncio
+    async def test_update_reindex(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        await collection.create_index("public_id", unique=True)
+        await collection.insert_one({"public_id": "u1", "name": "one"})
+        # process
+        result = await collection.update_one(
+            {"public_id": "u1"}, {"$set": {"public_id": "u2"}}
+        )
+        # asserts
+        assert result.modified_count == 1
+        assert await collection.find_one({"public_id": "u1"}) is None
+        assert await collection.find_one({"public_id": "u2"}, {"_id": 0}) == {
+            "public_id": "u2",
+            "name": "one",
+        }
+
+    @pytest.mark.asyncio
+    async def test_update_upsert_inc(self):
+        # Mocks
+        collection = MemoryCollection("versions")
+        # process
+        await collection.update_one({"_id": "m"}, {"$inc": {"v": 1}}, upsert=True)
+        await collection.update_one({"_id": "m"}, {"$inc": {"v": 1}}, upsert=True)
+        # asserts
+        assert await collection.find_one({"_id": "m"}) == {"_id": "m", "v": 2}
+
+    @pytest.mark.asyncio
+    async def test_delete_many(self):
+        # Mocks
+        collection = MemoryCollection("users")
+        await collection.create_index("age", unique=False)
+        await collection.insert_many([{"age": 1}, {"age": 1}, {"age": 2}])
+        # process
+        result = await collection.delete_many({"age": 1})
+        # asserts
+        assert result.deleted_count == 2
+        assert await collection.count_documents({"age": 1}) == 0
+        assert await collection.count_documents({}) == 1
+
+
+class TestMemorySnapshot:
+    @pytest.mark.asyncio
+    async def test_save_and_restore(self, tmp_path):
+        # Mocks
+        path = str(tmp_path / "snapshot.json")
+        engine = MemoryEngine()
+        await engine["users"].create_index("public_id", unique=True)
+        await engine["users"].insert_one({"public_id": "u1"})
+        # process
+        await MemorySnapshot(engine, path, 0).save()
+        restored = MemoryEngine()
+        MemorySnapshot(restored, path, 0).start()
+        # asserts
+        assert await restored["users"].find_one({}, {"_id": 0}) == {"public_id": "u1"}
+        with pytest.raises(DuplicateKeyError):
+            await restored["users"].insert_one({"public_id": "u1"})
+
+    @pytest.mark.asyncio
+    async def test_save_encodes_out_of_the_loop(self, tmp_path, monkeypatch):
+        # Mocks
+        engine = MemoryEngine()
+        await engine["users"].insert_one({"public_id": "u1"})
+        threads = []
+        dumps = json_util.dumps
+
+        def encode(data):
+            threads.append(threading.get_ident())
+            return dumps(data)
+
+        monkeypatch.setattr(json_util, "dumps", encode)
+        # process
+        await MemorySnapshot(engine, str(tmp_path / "snapshot.json"), 0).save()
+        # asserts
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_ignores_later_updates(self):
+        # Mocks
+        engine = MemoryEngine()
+        await engine["users"].insert_one({"public_id": "u1", "info": {"age": 1}})
+        data = engine.snapshot()
+        # process
+        await engine["users"].update_one({}, {"$set": {"info.age": 2}})
+        await engine["users"].insert_one({"public_id": "u2"})
+        # asserts
+        documents = data["users"]["documents"]
+        assert len(documents) == 1
+        assert documents[0]["info"] == {"age": 1}
+
+    def test_start_without_path(self):
+        # Mocks
+        snapshot = MemorySnapshot(MemoryEngine(), "", 1)
+        # process
+        snapshot.start()
+        # asserts
+        assert snapshot._task is None
+
+
+class TestBuildEngine:
+    def test_build_engine_by_name(self):
+        # process
+        db, watcher = build_engine("memory")
+        # asserts
+        assert isinstance(db, MemoryEngine)
+        assert isinstance(watcher, MemorySnapshot)
+        assert watcher.client is db
+
+    def test_build_engine_not_found(self):
+        with pytest.raises(KeyError):
+            build_engine("other")
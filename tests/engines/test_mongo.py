@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pymongo import monitoring
+
+from api.configs import app_configs
+from api.engines import mongo
+from api.engines.mongo import MongoWatcher
+from api.engines.mongo import PoolListener
+from api.metrics import Metrics
+from tests.conftest import AsyncMock
+
+
+class TestMongoWatcher:
+    def _get_watcher(self) -> MongoWatcher:
+        watcher = MongoWatcher(MagicMock(), "auto", 1)
+        watcher.registry = MagicMock()
+        return watcher
+
+    def test_on_change_evict_model(self):
+        # Mocks
+        watcher = self._get_watcher()
+        change = {"operationType": "insert", "fullDocument": {"name": "users"}}
+        # process
+        watcher.on_change(change)
+        # asserts
+        watcher.registry.remove.assert_called_once_with("users")
+        watcher.registry.clear.assert_not_called()
+
+    def test_on_change_delete_clear_registry(self):
+        # Mocks
+        watcher = self._get_watcher()
+        change = {"operationType": "delete", "documentKey": {"_id": "1"}}
+        # process
+        watcher.on_change(change)
+        # asserts
+        watcher.registry.clear.assert_called_once_with()
+
+    def test_start_disabled(self):
+        # Mocks
+        watcher = MongoWatcher(MagicMock(), "off", 1)
+        # process
+        watcher.start(MagicMock())
+        # asserts
+        assert watcher._task is None
+
+    @pytest.mark.asyncio
+    async def test_check_version_changed(self):
+        # Mocks
+        watcher = self._get_watcher()
+        watcher.version = AsyncMock(return_value=3)
+        # process
+        version = await watcher.check(2)
+        # asserts
+        assert version == 3
+        watcher.registry.clear.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_check_first_version(self):
+        # Mocks
+        watcher = self._get_watcher()
+        watcher.version = AsyncMock(return_value=3)
+        # process
+        version = await watcher.check(None)
+        # asserts
+        assert version == 3
+        watcher.registry.clear.assert_not_called()
+
+
+class TestClientOptions:
+    def test_options_from_configs(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(app_configs, "MONGO_MAX_POOL_SIZE", 50)
+        monkeypatch.setattr(app_configs, "MONGO_WAIT_QUEUE_TIMEOUT", 0.5)
+        monkeypatch.setattr(app_configs, "MONGO_COMPRESSORS", "zstd,zlib")
+        monkeypatch.setattr(mongo, "metrics", Metrics(True))
+        # process
+        options = mongo.client_options()
+        # asserts
+        listener = options.pop("event_listeners")[0]
+        assert isinstance(listener, PoolListener)
+        assert options == {
+            "maxPoolSize": 50,
+            "minPoolSize": 0,
+            "waitQueueTimeoutMS": 500,
+            "compressors": "zstd,zlib",
+        }
+
+    @pytest.mark.parametrize(
+        "mode, staleness, expected",
+        [("primary", 90, None), ("SECONDARY", 0, -1), ("nearest", 120, 120)],
+    )
+    def test_read_preference(self, mode, staleness, expected):
+        # process
+        preference = mongo.read_preference(mode, staleness)
+        # asserts
+        if expected is None:
+            assert preference is None
+        else:
+            assert preference.max_staleness == expected
+
+    @pytest.mark.parametrize("staleness", [1, 89, -1])
+    def test_read_preference_staleness_too_low(self, staleness):
+        with pytest.raises(ValueError):
+            mongo.read_preference("secondary", staleness)
+
+
+class TestPoolListener:
+    def test_pool_usage(self):
+        # Mocks
+        metrics = Metrics(True)
+        listener = PoolListener(metrics)
+        address = ("db", 27017)
+        # process
+        listener.pool_created(monitoring.PoolCreatedEvent(address, {"maxPoolSize": 10}))
+        listener.connection_created(monitoring.ConnectionCreatedEvent(address, 1))
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, 1)
+        )
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+        listener.connection_check_out_failed(
+            monitoring.ConnectionCheckOutFailedEvent(address, "timeout")
+        )
+        # asserts
+        assert metrics.pool_size.get("db:27017") == 10
+        assert metrics.pool_connections.get("db:27017") == 1
+        assert metrics.pool_checked_out.get("db:27017") == 1
+        assert metrics.pool_wait.get("db:27017") == 2
+        assert metrics.pool_failures.get("db:27017", "timeout") == 1
+        listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+        assert metrics.pool_checked_out.get("db:27017") == 0
@@ -0,0 +1,131 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import OperationFailure
+
+from api.engines.sqlite import close
+from api.engines.sqlite import order_by
+from api.engines.sqlite import SQLiteEngine
+from api.engines.sqlite import where
+
+
+class TestWhere:
+    def test_where_equality(self):
+        # Mocks
+        params = []
+        # process
+        response = where({"name": "one", "_id": ObjectId("0" * 24)}, params)
+        # asserts
+        assert response == (
+            "(json_extract(doc, '$.\"name\"') = ? AND "
+            "json_type(doc, '$.\"name\"') = 'text') AND (id = ?)"
+        )
+        assert params == ["one", "0" * 24]
+
+    def test_where_or_and_operators(self):
+        # Mocks
+        params = []
+        query = {"$or": [{"age": {"$gte": 1}}, {"active": True}]}
+        # process
+        response = where(query, params)
+        # asserts
+        assert "OR" in response and "json_type(doc, '$.\"active\"') = 'true'" in response
+        assert params == [1]
+
+    def test_where_invalid(self):
+        # process & asserts
+        with pytest.raises(OperationFailure):
+            where({"age": {"$regex": "1"}}, [])
+        with pytest.raises(OperationFailure):
+            where({"na'me": 1}, [])
+
+    def test_order_by(self):
+        # process & asserts
+        assert order_by([]) == ""
+        assert order_by([("info.age", -1), ("_id", 1)]) == (
+            " ORDER BY json_extract(doc, '$.\"info\".\"age\"') DESC, id ASC"
+        )
+
+
+class TestSQLiteCollection:
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = SQLiteEngine(str(tmp_path / "test.db"), 2, 1)
+        yield engine
+        engine.pool.close()
+
+    @pytest.mark.asyncio
+    async def test_insert_find(self, engine):
+        # Mocks
+        collection = engine["users"]
+        await collection.insert_many([{"age": 3}, {"age": "3"}, {"age": 1}])
+        # process
+        cursor = collection.find({"age": {"$gte": 1}}, {"_id": 0}).sort("age", -1)
+        response = await cursor.limit(5).to_list(5)
+        # asserts
+        assert response == [{"age": 3}, {"age": 1}]
+        assert await collection.count_documents({"age": "3"}) == 1
+        assert await collection.estimated_document_count() == 3
+
+    @pytest.mark.asyncio
+    async def test_iterate_in_batches(self, engine):
+        # Mocks
+        collection = engine["users"]
+        await collection.insert_many([{"age": i} for i in range(5)])
+        # process
+        cursor = collection.find({}, {"_id": 0}).skip(1).limit(3).batch_size(2)
+        response = [row["age"] async for row in cursor]
+        # asserts
+        assert response == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_unique_index(self, engine):
+        # Mocks
+        collection = engine["users"]
+        await collection.create_index("public_id", unique=True)
+        await collection.insert_one({"public_id": "u1"})
+        # process & asserts
+        with pytest.raises(DuplicateKeyError):
+            await collection.insert_one({"public_id": "u1"})
+        rows = [{"public_id": "u1"}, {"public_id": "u2"}]
+        with pytest.raises(BulkWriteError) as e:
+            await collection.insert_many(rows, ordered=False)
+        assert [err["index"] for err in e.value.details["writeErrors"]] == [0]
+        assert await collection.count_documents({}) == 2
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete(self, engine):
+        # Mocks
+        collection = engine["users"]
+        await collection.insert_many([{"n": "a", "v": 1}, {"n": "b", "v": 1}])
+        # process
+        updated = await collection.update_many({"v": 1}, {"$inc": {"v": 1}})
+        upserted = await collection.update_one(
+            {"_id": "m"}, {"$inc": {"v": 1}}, upsert=True
+        )
+        deleted = await collection.delete_one({"v": 2})
+        # asserts
+        assert updated.modified_count == 2
+        assert upserted.upserted_id == "m"
+        assert deleted.deleted_count == 1
+        assert await collection.find_one({"_id": "m"}) == {"_id": "m", "v": 1}
+
+    @pytest.mark.asyncio
+    async def test_drop_collection(self, engine):
+        # Mocks
+        await engine["users"].insert_one({"n": "a"})
+        # process
+        await engine.drop_collection("users")
+        # asserts
+        assert await engine["users"].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_close_releases_connections(self, tmp_path):
+        # Mocks
+        engine = SQLiteEngine(str(tmp_path / "test.db"), 2, 1)
+        await engine["users"].insert_one({"n": "a"})
+        # process
+        close(engine)
+        # asserts
+        assert engine.pool._connections == []
@@ -0,0 +1,136 @@
+import pytest
+
+from api.cache import TTLCache
+from api.datastructures import Job
+from api.datastructures import Query
+from api.engines import memory
+from api.engines import sqlite
+from api.repositories.memory import MemoryRepository
+from api.repositories.sqlite import SQLiteRepository
+
+
+class TestLocalRepository:
+    """Suite of the repositories of the memory and SQLite engines"""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def repository(self, request, monkeypatch, tmp_path):
+        if request.param == "memory":
+            repository, engine = MemoryRepository, memory.MemoryEngine()
+            close = memory.close
+        else:
+            repository = SQLiteRepository
+            engine = sqlite.SQLiteEngine(str(tmp_path / "test.db"), 2, 1)
+            close = sqlite.close
+        monkeypatch.setattr(repository, "client", engine)
+        monkeypatch.setattr(repository, "counts", TTLCache(ttl=10, size=10))
+        yield repository
+        close(engine)
+
+    async def _create_users(self, repository, ages):
+        await repository.create_model({"name": "users", "path": "/users"})
+        for i, age in enumerate(ages):
+            await repository.create_row("users", {"public_id": f"u{i}", "age": age})
+
+    @pytest.mark.asyncio
+    async def test_models(self, repository):
+        # process
+        await repository.create_admin_indexes()
+        model = await repository.create_model({"name": "users", "path": "/u"})
+        duplicated = await repository.create_model({"name": "users", "path": "/x"})
+        found = await repository.model_by_path("/u")
+        # asserts
+        assert model.name == "users"
+        assert duplicated is None
+        assert found.name == "users"
+        assert await repository.delete_model("users") == 1
+        assert await repository.all_models(10) == []
+
+    @pytest.mark.asyncio
+    async def test_rows(self, repository):
+        # Mocks
+        await self._create_users(repository, [3, 1, 2])
+        query = Query(filters=(("age", "gte", 2),), sort=(("age", 1),), fields=())
+        # process
+        rows = await repository.find_one_or_many("users", None, {}, query)
+        row = await repository.find_one_or_many("users", "u1", {})
+        updated = await repository.update_row("users", "u1", {"age": 5})
+        deleted = await repository.delete_row("users", "u0")
+        # asserts
+        assert rows == [{"public_id": "u2", "age": 2}, {"public_id": "u0", "age": 3}]
+        assert row == {"public_id": "u1", "age": 1}
+        assert (updated, deleted) == (1, 1)
+        assert await repository.count_rows("users", query) == 2
+        assert await repository.count_rows("users") == 2
+
+    @pytest.mark.asyncio
+    async def test_find_by_cursor(self, repository):
+        # Mocks
+        await self._create_users(repository, [1, 2, 3])
+        # process
+        first, token = await repository.find_by_cursor("users", {"limit": 2})
+        params = {"limit": 2, "cursor": token}
+        second, last = await repository.find_by_cursor("users", params)
+        # asserts
+        assert [row["age"] for row in first + second] == [1, 2, 3]
+        assert last is None
+
+    @pytest.mark.asyncio
+    async def test_find_by_cursor_null_values(self, repository, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(repository, "cursor_field", "age")
+        await self._create_users(repository, [None, 2, None, 1])
+        await repository.create_row("users", {"public_id": "u4"})
+        # process
+        rows, token = [], ""
+        while token is not None:
+            params = {"limit": 2, "cursor": token}
+            page, token = await repository.find_by_cursor("users", params)
+            rows += page
+        # asserts
+        assert [row.get("age") for row in rows] == [None, None, None, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_bulk_changes(self, repository):
+        # Mocks
+        await self._create_users(repository, [1, 1, 2])
+        query = Query(filters=(("age", "eq", 1),))
+        # process
+        ids = await repository.affected_ids("users", query, 10)
+        # Inserted after the rows were found.
+        await repository.create_row("users", {"public_id": "u3", "age": 1})
+        updated = await repository.update_rows("users", query, {"age": 3}, ids)
+        remaining = await repository.affected_ids("users", query, 10)
+        deleted = await repository.delete_rows("users", query, remaining)
+        # asserts
+        assert (len(ids), updated, len(remaining), deleted) == (2, (2, 2), 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_jobs(self, repository):
+        # Mocks
+        await repository.create_admin_indexes()
+        await self._create_users(repository, [1, 2, 3])
+        job = await repository.create_job(Job(kind=Job.DROP, model="users"))
+        # process
+        claimed = await repository.claim_job(60)
+        again = await repository.claim_job(60)
+        rows = await repository.rows_after("users", "u0", 10)
+        dropped = await repository.drop_rows("users", 2)
+        # asserts
+        assert (claimed.public_id, claimed.status) == (job.public_id, Job.RUNNING)
+        assert again is None
+        assert [row["public_id"] for row in rows] == ["u1", "u2"]
+        assert dropped == 2
+        assert await repository.pending_jobs("users") == 1
+        assert await repository.count_rows("users") == 1
+
+    @pytest.mark.asyncio
+    async def test_job_lease_expired_claimed_again(self, repository):
+        # Mocks
+        job = await repository.create_job(Job(kind=Job.DROP, model="users"))
+        await repository.claim_job(-1)  # The process died, its lease expired.
+        # process
+        claimed = await repository.claim_job(60)
+        again = await repository.claim_job(60)
+        # asserts
+        assert (claimed.public_id, claimed.status) == (job.public_id, Job.RUNNING)
+        assert again is None
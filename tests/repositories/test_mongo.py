@@ -0,0 +1,458 @@
+import base64
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+from bson import json_util
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import OperationFailure
+
+from api.datastructures import Job
+from api.datastructures import Model
+from api.cache import ModelRegistry
+from api.cache import SingleFlight
+from api.datastructures import Query
+from api.engines.mongo import read_preference
+from api.exceptions import BaseException
+from api.repositories import mongo
+from api.repositories.mongo import BaseRepository
+from api.repositories.mongo import MongoRepository
+from tests.conftest import AsyncMock
+
+
+class AsyncIterator:
+    def __init__(self, items):
+        self.items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestBaseRepository:
+    def _get_client(self, monkeypatch) -> MagicMock:
+        client = MagicMock()
+        monkeypatch.setattr(BaseRepository, "client", client)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_create_one_without_read_after_write(self, monkeypatch):
+        # Mocks
+        client = self._get_client(monkeypatch)
+        client["users"].insert_one = AsyncMock()
+        client["users"].find_one = AsyncMock()
+        data = {"_id": "oid", "name": "one", "public_id": "u1"}
+        # process
+        response = await BaseRepository.create_one("users", data, {"_id": 0})
+        # asserts
+        assert response == {"name": "one", "public_id": "u1"}
+        client["users"].find_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_one_with_read_after_write(self, monkeypatch):
+        # Mocks
+        client = self._get_client(monkeypatch)
+        monkeypatch.setattr(BaseRepository, "read_after_write", True)
+        client["users"].insert_one = AsyncMock()
+        client["users"].find_one = AsyncMock(return_value={"name": "server"})
+        # process
+        response = await BaseRepository.create_one("users", {}, {"_id": 0})
+        # asserts
+        assert response == {"name": "server"}
+
+    def test_exclude_fields(self):
+        data = {"_id": "oid", "name": "one", "age": 1}
+        assert BaseRepository.exclude(data, {"_id": 0, "age": False}) == {
+            "name": "one"
+        }
+
+
+class TestMongoRepositoryCursor:
+    def test_cursor_round_trip(self):
+        # Mocks
+        oid = ObjectId()
+        row = {"_id": oid, "age": 30}
+        # process
+        token = MongoRepository.encode_cursor(row, "age")
+        position = MongoRepository.decode_cursor(token)
+        # asserts
+        assert "=" not in token
+        assert position == {"id": oid, "value": 30}
+
+    @pytest.mark.parametrize("token", ["%%%", "bm90LWpzb24", "WzFd"])
+    def test_decode_invalid_cursor(self, token):
+        with pytest.raises(BaseException) as e:
+            MongoRepository.decode_cursor(token)
+        assert e.value.status_code == 400
+
+    @pytest.mark.parametrize(
+        "position",
+        [
+            {"id": 1, "value": {"$ne": None}},
+            {"id": {"$gt": ""}, "value": 30},
+            {"id": 1, "value": [1, 2]},
+        ],
+    )
+    def test_decode_cursor_not_scalar(self, position):
+        # Mocks
+        raw = json_util.dumps(position).encode()
+        token = base64.urlsafe_b64encode(raw).decode()
+        # process
+        with pytest.raises(BaseException) as e:
+            MongoRepository.decode_cursor(token)
+        # asserts
+        assert e.value.status_code == 400
+        assert e.value.content == {"error": "Invalid cursor."}
+
+    def test_cursor_query_by_id(self):
+        assert MongoRepository.cursor_query({"id": 1}, "_id") == {"_id": {"$gt": 1}}
+
+    def test_cursor_query_by_field(self):
+        query = MongoRepository.cursor_query({"id": 1, "value": 30}, "age")
+        assert query == {
+            "$or": [{"age": {"$gt": 30}}, {"age": 30, "_id": {"$gt": 1}}]
+        }
+
+    def test_cursor_query_by_field_null(self):
+        query = MongoRepository.cursor_query({"id": 1, "value": None}, "age")
+        assert query == {
+            "$or": [{"age": {"$ne": None}}, {"age": None, "_id": {"$gt": 1}}]
+        }
+
+
+class TestMongoRepositoryFindByCursor:
+    @pytest.mark.asyncio
+    async def test_find_by_cursor_full_page(self, monkeypatch):
+        # Mocks
+        rows = [{"_id": ObjectId(), "name": "one"}, {"_id": ObjectId(), "name": "two"}]
+        monkeypatch.setattr(MongoRepository, "find", AsyncMock(return_value=rows))
+        # process
+        response, next_cursor = await MongoRepository.find_by_cursor(
+            "users", {"cursor": "", "limit": 2}
+        )
+        # asserts
+        assert response == [{"name": "one"}, {"name": "two"}]
+        assert MongoRepository.decode_cursor(next_cursor) == {"id": rows[1]["_id"]}
+
+    @pytest.mark.asyncio
+    async def test_find_by_cursor_last_page(self, monkeypatch):
+        # Mocks
+        rows = [{"_id": ObjectId(), "name": "one"}]
+        monkeypatch.setattr(MongoRepository, "find", AsyncMock(return_value=rows))
+        token = MongoRepository.encode_cursor({"_id": ObjectId()}, "_id")
+        # process
+        response, next_cursor = await MongoRepository.find_by_cursor(
+            "users", {"cursor": token, "limit": 2}
+        )
+        # asserts
+        assert response == [{"name": "one"}]
+        assert next_cursor is None
+
+
+class TestMongoRepositoryIndexes:
+    @pytest.mark.asyncio
+    async def test_create_model_indexes(self, monkeypatch):
+        # Mocks
+        create_index = MagicMock(side_effect=AsyncMock())
+        monkeypatch.setattr(MongoRepository, "create_index", create_index)
+        monkeypatch.setattr(MongoRepository, "cursor_field", "age")
+        schema = {"email": {"type": "string", "index": True}}
+        model = Model(path="/users", name="users", schema=schema)
+        # process
+        await MongoRepository.create_model_indexes(model)
+        # asserts
+        assert [c.args for c in create_index.call_args_list] == [
+            ("users", "public_id"),
+            ("users", [("age", 1), ("_id", 1)]),
+            ("users", "email"),
+        ]
+        assert create_index.call_args_list[0].kwargs == {"unique": True}
+
+    @pytest.mark.asyncio
+    async def test_create_model_duplicated(self, monkeypatch):
+        # Mocks
+        create_one = AsyncMock(side_effect=DuplicateKeyError("duplicate key"))
+        monkeypatch.setattr(MongoRepository, "create_one", create_one)
+        # process
+        response = await MongoRepository.create_model({"path": "/users"})
+        # asserts
+        assert response is None
+
+    @pytest.mark.asyncio
+    async def test_reconcile_indexes_with_errors(self, monkeypatch):
+        # Mocks
+        client = MagicMock()
+        client[MongoRepository.main_model].find.return_value = AsyncIterator(
+            [{"path": "/users", "name": "users"}]
+        )
+        monkeypatch.setattr(MongoRepository, "client", client)
+        monkeypatch.setattr(MongoRepository, "create_admin_indexes", AsyncMock())
+        create_model_indexes = AsyncMock(side_effect=OperationFailure("duplicate"))
+        monkeypatch.setattr(
+            MongoRepository, "create_model_indexes", create_model_indexes
+        )
+        # process
+        failed = await MongoRepository.reconcile_indexes()
+        # asserts
+        assert failed == [("users", "duplicate")]
+
+
+class TestMongoRepositoryStream:
+    @pytest.mark.parametrize(
+        "query_params, skip, limit",
+        [({}, 0, 0), ({"limit": 5}, 0, 5), ({"limit": 5, "page": 2}, 10, 5)],
+    )
+    def test_stream_rows_pagination(self, monkeypatch, query_params, skip, limit):
+        # Mocks
+        stream = MagicMock()
+        monkeypatch.setattr(MongoRepository, "stream", stream)
+        # process
+        MongoRepository.stream_rows("users", query_params)
+        # asserts
+        stream.assert_called_once_with(
+            "users",
+            {},
+            {"_id": 0},
+            skip,
+            limit,
+            MongoRepository.stream_batch_size,
+            sort=None,
+            secondary=True,
+        )
+
+
+class TestMongoRepositoryQuery:
+    def test_mongo_query_without_query(self):
+        assert MongoRepository.mongo_query(None) == ({}, None, {"_id": 0})
+
+    def test_mongo_query(self):
+        # Mocks
+        query = Query(
+            filters=(("age", "gte", 18), ("age", "lt", 30), ("name", "in", ("a",))),
+            sort=(("age", -1),),
+            fields=("name",),
+        )
+        # process
+        filters, sort, projection = MongoRepository.mongo_query(query)
+        # asserts
+        assert filters == {"age": {"$gte": 18, "$lt": 30}, "name": {"$in": ["a"]}}
+        assert sort == [("age", -1), ("_id", 1)]
+        assert projection == {"name": 1, "_id": 0}
+
+    @pytest.mark.asyncio
+    async def test_find_by_cursor_with_query(self, monkeypatch):
+        # Mocks
+        oid = ObjectId()
+        find = MagicMock(side_effect=AsyncMock(return_value=[{"_id": oid, "a": 1}]))
+        monkeypatch.setattr(MongoRepository, "find", find)
+        monkeypatch.setattr(MongoRepository, "cursor_field", "age")
+        query = Query(filters=(("a", "eq", 1),), fields=("a",))
+        token = MongoRepository.encode_cursor({"_id": oid, "age": 3}, "age")
+        # process
+        rows, next_cursor = await MongoRepository.find_by_cursor(
+            "users", {"cursor": token, "limit": 1}, query
+        )
+        # asserts
+        _, search, projection, *_ = find.call_args.args
+        assert search["$and"][0] == {"a": {"$eq": 1}}
+        assert projection == {"a": 1, "_id": 1, "age": 1}
+        assert rows == [{"a": 1}]
+        assert next_cursor
+
+
+class TestMongoRepositoryCount:
+    @pytest.mark.asyncio
+    async def test_count_rows_estimated_without_filters(self, monkeypatch):
+        # Mocks
+        monkeypatch.setattr(
+            MongoRepository, "estimated_count", AsyncMock(return_value=10)
+        )
+        count = AsyncMock()
+        monkeypatch.setattr(MongoRepository, "count", count)
+        # process
+        total = await MongoRepository.count_rows("users", Query(fields=("a",)))
+        # asserts
+        assert total == 10
+        count.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_count_rows_filtered_cached(self, monkeypatch):
+        # Mocks
+        MongoRepository.counts.clear()
+        count = AsyncMock(return_value=3)
+        monkeypatch.setattr(MongoRepository, "count", count)
+        query = Query(filters=(("age", "gte", 18),))
+        # process
+        first = await MongoRepository.count_rows("users", query)
+        second = await MongoRepository.count_rows("users", query)
+        # asserts
+        assert first == second == 3
+        assert count.call_count == 1
+
+
+class TestMongoRepositoryBulkChanges:
+    @pytest.mark.asyncio
+    async def test_affected_ids_with_limit(self, monkeypatch):
+        # Mocks
+        find = MagicMock(side_effect=AsyncMock(return_value=[{"_id": 1}, {"_id": 2}]))
+        monkeypatch.setattr(MongoRepository, "find", find)
+        # process
+        ids = await MongoRepository.affected_ids(
+            "users", Query(filters=(("age", "gte", 18),)), 5
+        )
+        # asserts
+        assert ids == [1, 2]
+        find.assert_called_once_with("users", {"age": {"$gte": 18}}, {"_id": 1}, 0, 5)
+
+    @pytest.mark.asyncio
+    async def test_update_rows_bound_to_ids(self, monkeypatch):
+        # Mocks
+        client = MagicMock()
+        update_many = MagicMock(
+            side_effect=AsyncMock(
+                return_value=MagicMock(matched_count=3, modified_count=1)
+            )
+        )
+        client["users"].update_many = update_many
+        monkeypatch.setattr(MongoRepository, "client", client)
+        query = Query(filters=(("age", "in", (1, 2)),))
+        # process
+        response = await MongoRepository.update_rows(
+            "users", query, {"name": "x"}, [1, 2, 3]
+        )
+        # asserts
+        assert response == (3, 1)
+        update_many.assert_called_once_with(
+            {"$and": [{"age": {"$in": [1, 2]}}, {"_id": {"$in": [1, 2, 3]}}]},
+            {"$set": {"name": "x"}},
+        )
+
+
+class TestMongoRepositoryJobs:
+    @pytest.mark.asyncio
+    async def test_claim_job_taken_by_other(self, monkeypatch):
+        # Mocks
+        jobs = [
+            {"public_id": "j1", "kind": Job.DROP, "model": "users"},
+            {"public_id": "j2", "kind": Job.DROP, "model": "items"},
+        ]
+        monkeypatch.setattr(MongoRepository, "find", AsyncMock(return_value=jobs))
+        update_one = MagicMock(side_effect=AsyncMock(side_effect=[0, 1]))
+        monkeypatch.setattr(MongoRepository, "update_one", update_one)
+        # process
+        job = await MongoRepository.claim_job(60)
+        # asserts
+        assert (job.public_id, job.status) == ("j2", Job.RUNNING)
+        claim = {"public_id": "j2", "status": Job.QUEUED, "lease_until": None}
+        assert update_one.call_args[0][1] == claim
+        assert update_one.call_args[0][2]["lease_until"] == job.lease_until
+
+    @pytest.mark.asyncio
+    async def test_delete_model_keeps_rows(self, monkeypatch):
+        # Mocks
+        client = MagicMock()
+        monkeypatch.setattr(MongoRepository, "client", client)
+        monkeypatch.setattr(MongoRepository, "delete_one", AsyncMock(return_value=1))
+        monkeypatch.setattr(MongoRepository, "bump_models_version", AsyncMock())
+        # process
+        response = await MongoRepository.delete_model("users")
+        # asserts
+        assert response == 1
+        client.drop_collection.assert_not_called()
+
+
+class TestMongoRepositoryReads:
+    def test_collection_primary(self, monkeypatch):
+        # Mocks
+        client = MagicMock()
+        monkeypatch.setattr(MongoRepository, "client", client)
+        monkeypatch.setattr(MongoRepository, "reads", None)
+        # process
+        collection = MongoRepository.get_collection("users", secondary=True)
+        # asserts
+        assert collection is client["users"]
+        client["users"].with_options.assert_not_called()
+
+    def test_collection_secondary(self, monkeypatch):
+        # Mocks
+        client = MagicMock()
+        reads = read_preference("secondaryPreferred", 90)
+        monkeypatch.setattr(MongoRepository, "client", client)
+        monkeypatch.setattr(MongoRepository, "reads", reads)
+        # process
+        secondary = MongoRepository.get_collection("users", secondary=True)
+        primary = MongoRepository.get_collection("users")
+        # asserts
+        assert secondary is client["users"].with_options.return_value
+        assert primary is client["users"]
+        client["users"].with_options.assert_called_once_with(read_preference=reads)
+
+    @pytest.mark.asyncio
+    async def test_list_reads_secondary(self, monkeypatch):
+        # Mocks
+        find = MagicMock(side_effect=AsyncMock(return_value=[]))
+        monkeypatch.setattr(MongoRepository, "find", find)
+        monkeypatch.setattr(MongoRepository, "find_one", AsyncMock(return_value=None))
+        # process
+        await MongoRepository.find_one_or_many("users", None, {})
+        await MongoRepository.find_one_or_many("users", "u1", {})
+        # asserts
+        assert find.call_count == 1
+        assert find.call_args.kwargs["secondary"] is True
+
+
+class TestMongoRepositoryCoalescing:
+    @pytest.mark.asyncio
+    async def test_identical_reads_share_one_call(self, monkeypatch):
+        # Mocks
+        async def find(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return [{"name": "one"}]
+
+        find = MagicMock(side_effect=find)
+        monkeypatch.setattr(MongoRepository, "find", find)
+        monkeypatch.setattr(MongoRepository, "flights", SingleFlight())
+        query = Query(filters=(("age", "in", (1, 2)),))
+        # process
+        responses = await asyncio.gather(
+            MongoRepository.find_one_or_many("users", None, {"page": 1}, query),
+            MongoRepository.find_one_or_many("users", None, {"page": 1}, query),
+            MongoRepository.find_one_or_many("users", None, {"page": 2}, query),
+        )
+        # asserts
+        assert responses == [[{"name": "one"}]] * 3
+        assert find.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_model_lookup_not_shared_across_invalidation(self, monkeypatch):
+        # Mocks
+        async def find_one(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return {"path": "/users", "name": "users"}
+
+        find_one = MagicMock(side_effect=find_one)
+        registry = ModelRegistry(ttl=60, size=10)
+        monkeypatch.setattr(MongoRepository, "find_one", find_one)
+        monkeypatch.setattr(MongoRepository, "flights", SingleFlight())
+        monkeypatch.setattr(mongo, "model_registry", registry)
+
+        async def after_invalidation():
+            await asyncio.sleep(0)
+            registry.remove("users")
+            return await MongoRepository.model_by_path("/users")
+
+        # process
+        responses = await asyncio.gather(
+            MongoRepository.model_by_path("/users"),
+            MongoRepository.model_by_path("/users"),
+            after_invalidation(),
+        )
+        # asserts
+        assert [model.name for model in responses] == ["users"] * 3
+        assert find_one.call_count == 2
@@ -56,3 +56,71 @@ class TestAdminSerializer:
         # asserts
         assert error == {}
         assert data == {"name": "121212"}
+
+    def test_model_schema_with_index(self):
+        # Mocks
+        body = {
+            "path": "/users",
+            "schema": {"email": {"type": "string", "index": True}},
+        }
+        # process
+        error, model = AdminSerializer.model(body)
+        # asserts
+        assert error == None
+        assert model.indexed_fields() == ["email"]
+
+    def test_model_schema_with_invalid_index(self):
+        # Mocks
+        body = {
+            "path": "/users",
+            "schema": {"email": {"type": "string", "index": "yes"}},
+        }
+        # process
+        error, model = AdminSerializer.model(body)
+        # asserts
+        assert error == {"email": [{"index": ["must be of boolean type"]}]}
+        assert model == None
+
+    def test_model_with_cache(self):
+        # Mocks
+        body = {
+            "path": "/users",
+            "schema": {"name": {"type": "string"}},
+            "cache": {"ttl": 0},
+        }
+        # process
+        error, model = AdminSerializer.model(body)
+        # asserts
+        assert error == {"cache": [{"ttl": ["min value is 1"]}]}
+        assert model == None
+
+    def test_model_with_ingest(self):
+        # Mocks
+        body = {
+            "path": "/users",
+            "schema": {"name": {"type": "string"}},
+            "ingest": {"wait": 0.1},
+        }
+        # process
+        error, model = AdminSerializer.model(body)
+        # asserts
+        assert error == {"ingest": [{"batch": ["required field"]}]}
+        assert model == None
+
+    def test_update_model_with_error(self):
+        # Mocks
+        body = {"schema": {"name": {"type": "string"}}}
+        # process
+        error, data = AdminSerializer.update_model(body)
+        # asserts
+        assert error == {"name": ["required field"]}
+        assert data == None
+
+    def test_update_model_success_serialization(self):
+        # Mocks
+        body = {"name": "users", "path": "/x", "schema": {"name": {"type": "string"}}}
+        # process
+        error, data = AdminSerializer.update_model(body)
+        # asserts
+        assert error == None
+        assert data == {"name": "users", "schema": {"name": {"type": "string"}}}
@@ -66,3 +66,23 @@ class TestSerializer:
         )
         assert data == {"name": "USERS", "path": "/users"}
         assert errors == {}
+
+    def test_validator_without_key_not_cached(self):
+        v_one = Serializer._validator(self.schema_two)
+        v_two = Serializer._validator(self.schema_two)
+        assert v_one is not v_two
+
+    def test_validator_cached_by_key(self):
+        v_one = Serializer._validator(self.schema_two, purge=True, key="mock")
+        v_two = Serializer._validator(self.schema_two, purge=True, key="mock")
+        v_three = Serializer._validator(self.schema_two, key="mock")
+        assert v_one is v_two
+        assert v_one is not v_three
+
+    def test_serialize_data_with_cached_validator(self):
+        Serializer._serialize(self.schema_two, {}, key="mock_serialize")
+        errors, data = Serializer._serialize(
+            self.schema_two, self._get_data(), key="mock_serialize"
+        )
+        assert data == {"name": "users", "path": "/users"}
+        assert errors == {}
@@ -0,0 +1,175 @@
+from unittest.mock import patch
+
+import pytest
+from cerberus import Validator
+
+from api.serializers.base import ModelValidator
+from api.serializers.base import Serializer
+from api.serializers.compiler import CompiledValidator
+from api.serializers.compiler import UnsupportedRule
+
+
+def upper():
+    """Return lambda with upper string"""
+    return lambda s: s.upper()
+
+
+USER = {
+    "name": {
+        "type": "string",
+        "required": True,
+        "empty": False,
+        "minlength": 2,
+        "maxlength": 10,
+    },
+    "age": {"type": "integer", "min": 0, "max": 150, "index": True},
+    "level": {"type": "float"},
+    "score": {"type": "number", "nullable": True},
+    "admin": {"type": "boolean"},
+    "role": {"type": "string", "allowed": ["admin", "user"]},
+    "code": {"type": "string", "regex": "^[a-z]+-[0-9]+"},
+    "tags": {"type": "list", "allowed": ["a", "b"], "maxlength": 3},
+    "alias": {"type": ["string", "integer"]},
+    "bio": {"type": "string", "empty": True, "minlength": 5},
+    "notes": {"minlength": 2},
+}
+NESTED = {
+    "address": {
+        "type": "dict",
+        "required": True,
+        "minlength": 1,
+        "schema": {
+            "city": {"type": "string", "required": True, "empty": False},
+            "zip": {"type": "integer", "coerce": int},
+        },
+    },
+    "items": {
+        "type": "list",
+        "empty": False,
+        "schema": {
+            "type": "dict",
+            "schema": {
+                "sku": {"type": "string", "required": True},
+                "qty": {"type": "integer", "min": 1},
+            },
+        },
+    },
+    "numbers": {"type": "list", "schema": {"type": "integer", "coerce": int}},
+}
+COERCE = {
+    "limit": {"type": "integer", "coerce": int},
+    "name": {"type": "string", "maxlength": 5, "coerce": (str, upper())},
+    "nullable": {"type": "integer", "nullable": True, "coerce": int},
+}
+MULTIPLE = {
+    "code": {
+        "type": "string",
+        "regex": "^x",
+        "minlength": 3,
+        "allowed": ["x"],
+        "maxlength": 1,
+    },
+    "tags": {"type": ["list", "string"], "minlength": 3, "allowed": ["a", "b"]},
+    "value": {"min": 3, "max": 1, "empty": False},
+}
+
+CASES = [
+    (USER, {"name": "users", "age": 30, "level": 1.5, "admin": False}),
+    (USER, {"name": "users", "level": 1, "score": None, "alias": 3}),
+    (USER, {}),
+    (USER, {"name": ""}),
+    (USER, {"name": "u"}),
+    (USER, {"name": "a very long name"}),
+    (USER, {"name": None}),
+    (USER, {"name": 10, "age": "ten", "admin": 1, "level": "x"}),
+    (USER, {"name": "users", "age": True, "score": True}),
+    (USER, {"name": "users", "age": -1}),
+    (USER, {"name": "users", "age": 151}),
+    (USER, {"name": "users", "role": "root"}),
+    (USER, {"name": "users", "role": "admin"}),
+    (USER, {"name": "users", "code": "abc-12"}),
+    (USER, {"name": "users", "code": "abc-12x"}),
+    (USER, {"name": "users", "tags": ["a", "c", "d"]}),
+    (USER, {"name": "users", "tags": ["a", "b", "a", "b"]}),
+    (USER, {"name": "users", "tags": "ab"}),
+    (USER, {"name": "users", "alias": 1.5}),
+    (USER, {"name": "users", "bio": ""}),
+    (USER, {"name": "users", "bio": "bio"}),
+    (USER, {"name": "users", "notes": "x"}),
+    (USER, {"name": "users", "notes": 1}),
+    (USER, {"name": "users", "other": "true"}),
+    (NESTED, {"address": {"city": "Bogota", "zip": "110111"}}),
+    (NESTED, {"address": {"city": "Bogota", "zip": "zip"}}),
+    (NESTED, {"address": {"city": "", "other": 1}}),
+    (NESTED, {"address": {}}),
+    (NESTED, {"address": "Bogota"}),
+    (NESTED, {"address": None}),
+    (NESTED, {"address": {"city": "x"}, "items": []}),
+    (NESTED, {"address": {"city": "x"}, "items": [{"sku": "a", "qty": 2}]}),
+    (NESTED, {"address": {"city": "x"}, "items": [{"qty": 0, "x": 1}, "sku"]}),
+    (NESTED, {"address": {"city": "x"}, "numbers": ["1", 2, "three"]}),
+    (NESTED, {"address": {"city": "x"}, "numbers": "123"}),
+    (COERCE, {"limit": "10", "name": "users"}),
+    (COERCE, {"limit": "ten", "name": 12345678}),
+    (COERCE, {"limit": None, "nullable": None}),
+    (COERCE, {"limit": 1.9, "nullable": "1"}),
+    (MULTIPLE, {"code": "yy", "tags": ["c", "d"], "value": 2}),
+    (MULTIPLE, {"code": "", "tags": [], "value": "", "other": 1}),
+    (MULTIPLE, {"code": "xyz", "tags": "c", "value": 0}),
+]
+
+
+def run_both(schema: dict, document: dict, purge: bool):
+    cerberus = Serializer._run(ModelValidator(schema, purge_unknown=purge), document)
+    compiled = Serializer._run(CompiledValidator(schema, purge), document)
+    return cerberus, compiled
+
+
+class TestCompiledValidatorConformance:
+    @pytest.mark.parametrize("purge", [True, False])
+    @pytest.mark.parametrize("schema, document", CASES)
+    def test_same_result_as_cerberus(self, schema, document, purge):
+        # process
+        (errors, data), (c_errors, c_data) = run_both(schema, document, purge)
+        # asserts
+        assert c_errors == errors
+        if not errors:
+            assert c_data == data
+
+    def test_document_not_mutated(self):
+        # Mocks
+        document = {"address": {"city": "x", "zip": "1", "other": 1}}
+        # process
+        Serializer._run(CompiledValidator(NESTED, True), document)
+        # asserts
+        assert document == {"address": {"city": "x", "zip": "1", "other": 1}}
+
+    @pytest.mark.parametrize(
+        "schema",
+        [
+            {"name": {"type": "string", "default": "x"}},
+            {"name": {"type": "dict", "keysrules": {"type": "string"}}},
+            {"name": {"type": "string", "coerce": "to_upper"}},
+            {"name": {"schema": {"type": "string"}}},
+            {"name": "rules"},
+        ],
+    )
+    def test_unsupported_rules(self, schema):
+        with pytest.raises(UnsupportedRule):
+            CompiledValidator(schema)
+
+
+class TestSerializerEngine:
+    @patch.object(Serializer, "engine", "COMPILED")
+    def test_compiled_engine(self):
+        validator = Serializer._validator(USER)
+        assert isinstance(validator, CompiledValidator)
+
+    @patch.object(Serializer, "engine", "COMPILED")
+    def test_compiled_engine_fallback_to_cerberus(self):
+        validator = Serializer._validator({"name": {"default": "users"}})
+        assert isinstance(validator, Validator)
+
+    def test_cerberus_engine(self):
+        validator = Serializer._validator(USER)
+        assert isinstance(validator, Validator)
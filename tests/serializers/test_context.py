@@ -27,3 +27,40 @@ class TestContextSerializer:
         data = ContextSerializer.query_params(q)
         # asserts
         assert data == {"limit": 2, "page": 1}
+
+    def test_query_params_cursor(self):
+        # Mocks
+        q = QueryParams("cursor=&limit=2")
+        # process
+        data = ContextSerializer.query_params(q)
+        # asserts
+        assert data == {"cursor": "", "limit": 2}
+
+    def test_query_params_stream(self):
+        # Mocks
+        q = QueryParams("stream=True")
+        # process
+        data = ContextSerializer.query_params(q)
+        # asserts
+        assert data == {"stream": True}
+
+    def test_query_params_stream_not_boolean(self):
+        # Mocks
+        q = QueryParams("stream=maybe")
+        # process
+        data = ContextSerializer.query_params(q)
+        # asserts
+        assert data == {}
+
+    def test_query_params_filters(self):
+        # Mocks
+        q = QueryParams(
+            "filter[age][gte]=18&filter[name]=one&filter[a][b][c]=x&sort=-age"
+        )
+        # process
+        data = ContextSerializer.query_params(q)
+        # asserts
+        assert data == {
+            "sort": "-age",
+            "filter": (("age", "gte", "18"), ("name", "eq", "one")),
+        }
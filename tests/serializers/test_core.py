@@ -1,5 +1,9 @@
 from unittest.mock import patch
 
+import pytest
+
+from api.datastructures import Model
+from api.datastructures import Query
 from api.serializers.core import CoreSerializer
 
 
@@ -45,3 +49,128 @@ class TestCoreSerializer:
         assert errors == None
         assert data == {"public_id": "M123", "user": "anybody"}
         mock_uuid.assert_called_once_with()
+
+    def test_core_validator_cached_by_name_and_version(self):
+        # Mocks
+        one = Model(path="/users", name="users", schema={"user": {"type": "string"}})
+        two = Model(path="/users", name="users", schema={"user": {"type": "string"}})
+        other = Model(path="/users", name="users", schema={"user": {"type": "integer"}})
+        # process
+        v_one = CoreSerializer.validator(one.schema, one.name, one.schema_hash)
+        v_two = CoreSerializer.validator(two.schema, two.name, two.schema_hash)
+        v_three = CoreSerializer.validator(other.schema, other.name, other.schema_hash)
+        # asserts
+        assert one.schema_hash == two.schema_hash != other.schema_hash
+        assert v_one is v_two
+        assert v_one is not v_three
+
+    @patch("api.serializers.utils.json.dumps")
+    def test_core_validation_does_not_hash(self, mock_dumps):
+        # Mocks
+        schema = {"user": {"type": "string"}}
+        # process
+        errors, data = CoreSerializer.model(
+            {"user": "one"}, schema, name="users", version="v1"
+        )
+        # asserts
+        assert errors is None
+        mock_dumps.assert_not_called()
+
+    def test_core_error_with_cached_validator(self):
+        # Mocks
+        schema = {"age": {"type": "integer", "required": True}}
+        CoreSerializer.model({"age": 1}, schema, name="ages", version="v1")
+        # process
+        errors, data = CoreSerializer.model(
+            {"age": "one"}, schema, name="ages", version="v1"
+        )
+        # asserts
+        assert errors == {"age": ["must be of integer type"]}
+        assert data == None
+
+    def test_core_bulk_serialization(self):
+        # Mocks
+        schema = {"user": {"type": "string", "required": True}}
+        items = [{"user": "one"}, {"user": 2}, None, {"user": "three"}]
+        # process
+        errors, rows, indexes = CoreSerializer.bulk(items, schema)
+        # asserts
+        assert errors == [
+            {"index": 1, "errors": {"user": ["must be of string type"]}},
+            {"index": 2, "errors": "must be of dict type"},
+        ]
+        assert [row["user"] for row in rows] == ["one", "three"]
+        assert indexes == [0, 3]
+
+
+SCHEMA = {
+    "name": {"type": "string"},
+    "age": {"type": "integer"},
+    "admin": {"type": "boolean"},
+    "tags": {"type": "list"},
+    "address": {"type": "dict", "schema": {"zip": {"type": "float"}}},
+}
+
+
+class TestCoreSerializerQuery:
+    def test_query_nothing_requested(self):
+        assert CoreSerializer.query({"limit": 2}, SCHEMA) == (None, None)
+
+    def test_query_success(self):
+        # Mocks
+        query_params = {
+            "filter": (
+                ("age", "gte", "18"),
+                ("admin", "eq", "true"),
+                ("address.zip", "in", "1.5, 2"),
+                ("public_id", "eq", "u1"),
+            ),
+            "sort": "-age,name",
+            "fields": "name,address.zip,public_id",
+        }
+        # process
+        errors, query = CoreSerializer.query(query_params, SCHEMA)
+        # asserts
+        assert errors is None
+        assert query == Query(
+            filters=(
+                ("age", "gte", 18),
+                ("admin", "eq", True),
+                ("address.zip", "in", (1.5, 2.0)),
+                ("public_id", "eq", "u1"),
+            ),
+            sort=(("age", -1), ("name", 1)),
+            fields=("name", "address.zip", "public_id"),
+        )
+
+    @pytest.mark.parametrize(
+        "query_params, expected",
+        [
+            ({"filter": (("other", "eq", "1"),)}, {"filter[other]": ["unknown field"]}),
+            ({"filter": (("tags", "eq", "1"),)}, {"filter[tags]": ["unknown field"]}),
+            (
+                {"filter": (("age", "like", "1"),)},
+                {"filter[age]": ["unallowed operator like"]},
+            ),
+            (
+                {"filter": (("admin", "gt", "1"),)},
+                {"filter[admin]": ["unallowed operator gt"]},
+            ),
+            (
+                {"filter": (("age", "eq", "x"),)},
+                {"filter[age]": ["must be of integer type"]},
+            ),
+            (
+                {"filter": (("admin", "eq", "maybe"),)},
+                {"filter[admin]": ["must be of boolean type"]},
+            ),
+            ({"sort": "-other"}, {"sort": ["unknown field other"]}),
+            ({"fields": "name,other"}, {"fields": ["unknown field other"]}),
+        ],
+    )
+    def test_query_errors(self, query_params, expected):
+        # process
+        errors, query = CoreSerializer.query(query_params, SCHEMA)
+        # asserts
+        assert errors == expected
+        assert query is None
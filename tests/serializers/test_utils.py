@@ -1,4 +1,8 @@
+import pytest
+
+from api.serializers.utils import boolean
 from api.serializers.utils import lower
+from api.serializers.utils import schema_hash
 from api.serializers.utils import status_code_allowed
 from api.serializers.utils import upper
 
@@ -17,3 +21,24 @@ def test_lower_call_function():
 def test_upper_call_function():
     fn = upper()
     assert "MOCK" == fn("mock")
+
+
+def test_boolean_call_function():
+    fn = boolean()
+    assert fn("True") is True
+    assert fn("0") is False
+    assert fn(" NO ") is False
+
+
+@pytest.mark.parametrize("value", ["maybe", "", "2", "on"])
+def test_boolean_not_valid(value):
+    fn = boolean()
+    with pytest.raises(ValueError):
+        fn(value)
+
+
+def test_schema_hash_is_stable():
+    one = schema_hash({"a": {"type": "string"}, "b": {"type": "integer"}})
+    two = schema_hash({"b": {"type": "integer"}, "a": {"type": "string"}})
+    assert one == two
+    assert one != schema_hash({"a": {"type": "integer"}})
@@ -0,0 +1,362 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from api.cache import ModelRegistry
+from api.cache import PathTrie
+from api.cache import ResponseCache
+from api.cache import SingleFlight
+from api.cache import TTLCache
+from api.datastructures import Model
+
+
+def get_model(path="/users", name="users") -> Model:
+    return Model(path=path, name=name, schema={"name": {"type": "string"}})
+
+
+UID = "8f3a0c43-5a44-4d1c-9d59-7c0b7e0d9a11"
+
+
+class TestPathTrie:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/users", ("/users", None)),
+            ("/Users/", ("/users", None)),
+            (f"/users/{UID}", ("/users", UID)),
+            (f"/users/{UID}/", None),
+            ("/users/other", None),
+            ("/users/shop", ("/users/shop", None)),
+            ("/a/b/c/d/e/f/g/h", ("/a/b/c/d/e/f/g/h", None)),
+            (f"/a/b/c/d/e/f/g/h/{UID}", ("/a/b/c/d/e/f/g/h", UID)),
+            (f"/a/b/{UID}", None),
+            ("/other", None),
+        ],
+    )
+    def test_resolve(self, path, expected):
+        # Mocks
+        trie = PathTrie()
+        for model_path in ["/users", "/users/shop", "/a/b/c/d/e/f/g/h"]:
+            trie.add(model_path)
+        # process
+        route = trie.resolve(path)
+        # asserts
+        assert route == expected
+
+    def test_discard_prunes_nodes(self):
+        # Mocks
+        trie = PathTrie()
+        trie.add("/users")
+        trie.add("/users/shop/items")
+        # process
+        trie.discard("/users/shop/items")
+        trie.discard("/missing/path")
+        # asserts
+        assert trie.resolve("/users") == ("/users", None)
+        assert trie.resolve("/users/shop/items") is None
+        assert trie._root == {"users": {None: "/users"}}
+
+
+class TestModelRegistry:
+    def test_get_model_with_normalized_path(self):
+        # Mocks
+        registry = ModelRegistry(size=10)
+        model = get_model("/Users/")
+        # process
+        registry.set(model)
+        # asserts
+        assert registry.get("/users") is model
+        assert registry.get("/USERS/") is model
+        assert registry.get("/other") is None
+
+    def test_registry_disabled_without_size(self):
+        # Mocks
+        registry = ModelRegistry(size=0)
+        # process
+        registry.set(get_model())
+        # asserts
+        assert registry.get("/users") is None
+        assert len(registry) == 0
+
+    @patch("api.cache.time.monotonic")
+    def test_get_model_expired(self, mock_monotonic):
+        # Mocks
+        registry = ModelRegistry(ttl=10, size=10)
+        mock_monotonic.return_value = 100
+        registry.set(get_model())
+        # process
+        mock_monotonic.return_value = 111
+        # asserts
+        assert registry.get("/users") is None
+        assert len(registry) == 0
+
+    def test_set_evicts_least_recently_used(self):
+        # Mocks
+        registry = ModelRegistry(size=2)
+        registry.set(get_model("/one", "one"))
+        registry.set(get_model("/two", "two"))
+        # process
+        registry.get("/one")
+        registry.set(get_model("/three", "three"))
+        # asserts
+        assert registry.get("/two") is None
+        assert registry.get("/one") is not None
+        assert registry.get("/three") is not None
+
+    def test_remove_model_from_name(self):
+        # Mocks
+        registry = ModelRegistry(size=10)
+        registry.set(get_model())
+        version = registry.version
+        # process
+        registry.remove("users")
+        # asserts
+        assert registry.get("/users") is None
+        assert registry.version > version
+
+    def test_load_replace_models(self):
+        # Mocks
+        registry = ModelRegistry(size=10)
+        registry.set(get_model("/old", "old"))
+        # process
+        registry.load([get_model("/one", "one"), get_model("/two", "two")])
+        # asserts
+        assert registry.get("/old") is None
+        assert len(registry) == 2
+
+    def test_resolve_survives_eviction(self):
+        # Mocks
+        registry = ModelRegistry(size=1)
+        registry.set(get_model("/users", "users"))
+        registry.set(get_model("/shops", "shops"))
+        # process
+        registry.remove("shops")
+        # asserts
+        assert registry.get("/users") is None
+        assert registry.resolve(f"/users/{UID}") == ("/users", UID)
+        assert registry.resolve("/shops") is None
+
+    def test_static_models_not_evicted(self):
+        # Mocks
+        registry = ModelRegistry(ttl=60, size=1)
+        static = Model(path="/mock", name="mock", static={"GET": {"a": 1}})
+        with patch("api.cache.time.monotonic", return_value=100):
+            registry.set(static)
+            registry.set(get_model("/users", "users"))
+            registry.set(get_model("/shops", "shops"))
+        # process
+        with patch("api.cache.time.monotonic", return_value=120):
+            model = registry.get("/mock")
+        # asserts
+        assert model is static
+        assert "_static_table" in model.__dict__
+        assert len(registry) == 2
+        registry.remove("mock")
+        assert registry.get("/mock") is None
+
+    def test_static_models_expire(self):
+        # Mocks
+        registry = ModelRegistry(ttl=1, size=1)
+        static = Model(path="/mock", name="mock", static={"GET": {"a": 1}})
+        with patch("api.cache.time.monotonic", return_value=100):
+            registry.set(static)
+        # process
+        with patch("api.cache.time.monotonic", return_value=200):
+            model = registry.get("/mock")
+        # asserts
+        assert model is None
+        assert len(registry) == 0
+
+
+class TestResponseCache:
+    def test_set_and_get(self):
+        # Mocks
+        cache = ResponseCache(size=100)
+        # process
+        etag, body = cache.set("users", "/users", b"[]", ttl=30)
+        # asserts
+        assert cache.get("users", "/users") == (etag, b"[]")
+        assert cache.get("users", "/other") is None
+        assert etag == ResponseCache.etag(b"[]")
+        assert cache.used == 2
+
+    def test_not_stored_when_invalidated_meanwhile(self):
+        # Mocks
+        cache = ResponseCache(size=100)
+        generation = cache.generation("users")
+        # process
+        cache.invalidate("users")
+        cache.set("users", "/users", b"[]", ttl=30, generation=generation)
+        cache.clear()
+        cache.set("shops", "/shops", b"[]", ttl=30, generation=0)
+        # asserts
+        assert cache.get("users", "/users") is None
+        assert cache.get("shops", "/shops") is None
+        assert len(cache) == 0
+
+    def test_evict_by_bytes(self):
+        # Mocks
+        cache = ResponseCache(size=10)
+        cache.set("users", 1, b"12345", ttl=30)
+        cache.set("users", 2, b"12345", ttl=30)
+        cache.get("users", 1)
+        # process
+        cache.set("shops", 3, b"123", ttl=30)
+        # asserts
+        assert cache.get("users", 2) is None
+        assert cache.get("users", 1) is not None
+        assert cache.used == 8
+
+    def test_body_bigger_than_cache_not_stored(self):
+        # Mocks
+        cache = ResponseCache(size=4)
+        # process
+        etag, _ = cache.set("users", 1, b"12345", ttl=30)
+        # asserts
+        assert etag
+        assert len(cache) == 0
+
+    def test_expired_entry(self):
+        # Mocks
+        cache = ResponseCache(size=100)
+        with patch("api.cache.time.monotonic", return_value=100):
+            cache.set("users", 1, b"[]", ttl=30)
+        # process
+        with patch("api.cache.time.monotonic", return_value=131):
+            entry = cache.get("users", 1)
+        # asserts
+        assert entry is None
+        assert cache.used == 0
+
+    def test_invalidate_model(self):
+        # Mocks
+        cache = ResponseCache(size=100)
+        cache.set("users", 1, b"[1]", ttl=30)
+        cache.set("users", 2, b"[2]", ttl=30)
+        cache.set("shops", 1, b"[3]", ttl=30)
+        # process
+        cache.invalidate("users")
+        # asserts
+        assert len(cache) == 1
+        assert cache.get("shops", 1) is not None
+        assert cache.used == 3
+
+
+class TestTTLCache:
+    def test_value_expires(self):
+        # Mocks
+        cache = TTLCache(ttl=10, size=10)
+        with patch("api.cache.time.monotonic", return_value=100):
+            cache.set("key", 0)
+        # process
+        with patch("api.cache.time.monotonic", return_value=105):
+            alive = cache.get("key")
+        with patch("api.cache.time.monotonic", return_value=111):
+            expired = cache.get("key")
+        # asserts
+        assert alive == 0
+        assert expired is None
+        assert len(cache) == 0
+
+    def test_evict_oldest(self):
+        # Mocks
+        cache = TTLCache(ttl=10, size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        # process
+        cache.set("c", 3)
+        # asserts
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_disabled_without_ttl(self):
+        # Mocks
+        cache = TTLCache(ttl=0, size=10)
+        # process
+        cache.set("a", 1)
+        # asserts
+        assert cache.get("a") is None
+
+
+class TestSingleFlight:
+    @staticmethod
+    def call(results, calls):
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return results.pop(0)
+
+        return fn
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_shared(self):
+        # Mocks
+        flights = SingleFlight()
+        calls = []
+        fn = self.call([["u1"], ["u2"]], calls)
+        # process
+        responses = await asyncio.gather(*(flights.do("users", fn) for _ in range(3)))
+        # asserts
+        assert responses == [["u1"], ["u1"], ["u1"]]
+        assert len(calls) == 1
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_not_shared(self):
+        # Mocks
+        flights = SingleFlight()
+        calls = []
+        fn = self.call([1, 2], calls)
+        # process
+        responses = await asyncio.gather(flights.do("a", fn), flights.do("b", fn))
+        # asserts
+        assert responses == [1, 2]
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        # Mocks
+        flights = SingleFlight(enabled=False)
+        calls = []
+        fn = self.call([1, 2], calls)
+        # process
+        responses = await asyncio.gather(flights.do("a", fn), flights.do("a", fn))
+        # asserts
+        assert responses == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_exception_shared(self):
+        # Mocks
+        flights = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("down")
+
+        # process
+        responses = await asyncio.gather(
+            flights.do("a", fn), flights.do("a", fn), return_exceptions=True
+        )
+        # asserts
+        assert [str(r) for r in responses] == ["down", "down"]
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_first_caller_cancelled(self):
+        # Mocks
+        flights = SingleFlight()
+        calls = []
+        fn = self.call([1, 2], calls)
+        first = asyncio.ensure_future(flights.do("a", fn))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do("a", fn))
+        await asyncio.sleep(0)
+        # process
+        first.cancel()
+        response = await second
+        # asserts
+        assert first.cancelled()
+        assert response == 1
+        assert len(calls) == 2
@@ -0,0 +1,108 @@
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import patch
+
+from api.datastructures import Model
+from api.datastructures import RequestContext
+from api.responses import dumps
+
+
+class TestModel:
+    def test_indexed_fields(self):
+        # Mocks
+        schema = {
+            "email": {"type": "string", "index": True},
+            "age": {"type": "integer", "index": False},
+            "address": {
+                "type": "dict",
+                "schema": {
+                    "city": {"type": "string", "index": True},
+                    "zip": {"type": "string"},
+                },
+            },
+        }
+        model = Model(path="/users", schema=schema)
+        # process
+        fields = model.indexed_fields()
+        # asserts
+        assert fields == ["email", "address.city"]
+
+    def test_to_json_datetimes(self):
+        # Mocks
+        created_at = datetime(2022, 3, 23, tzinfo=timezone.utc)
+        model = Model(path="/users", name="users", created_at=created_at)
+        # process
+        data = model.to_json()
+        # asserts
+        assert data["created_at"] == "2022-03-23T00:00:00+00:00"
+        assert data["features"] == {"internal": {}, "externals": {}}
+
+    def test_static_response_encoded_once(self):
+        # Mocks
+        static = {"GET": {"mock": "get"}, "POST": {}, "ALL": ["all"]}
+        model = Model(path="/users", name="users", static=static)
+        # process
+        with patch("api.datastructures.dumps", wraps=dumps) as encoder:
+            get = model.static_response("GET")
+            post = model.static_response("POST")
+            model.static_response("GET")
+        # asserts
+        assert encoder.call_count == 5
+        assert (get.status_code, get.body) == (200, b'{"mock":"get"}')
+        assert (post.status_code, post.body) == (201, b'["all"]')
+        assert get.media_type == "application/json"
+        assert "_static_table" not in model.to_dict()
+
+
+class TestRequestContext:
+    def test_path_from_route(self):
+        # Mocks
+        context = RequestContext(
+            method="GET", headers={}, body={}, original_path="/Users/u1"
+        )
+        # process
+        context.route = ("/users", "u1")
+        # asserts
+        assert context.path == "/users"
+        assert context.resource_id == "u1"
+
+    def test_path_split_once(self):
+        # Mocks
+        context = RequestContext(
+            method="GET", headers={}, body={}, original_path="/users"
+        )
+        # process
+        with patch("api.datastructures.split_uuid_path") as split_uuid_path:
+            split_uuid_path.return_value = ("/users", None)
+            context.path
+            context.resource_id
+        # asserts
+        split_uuid_path.assert_called_once_with("/users")
+
+    def test_body_and_query_params_preset(self):
+        # process
+        context = RequestContext(
+            "POST", {}, [{"name": "one"}], "/users", None, {"limit": 2}
+        )
+        # asserts
+        assert context.original_path == "/users"
+        assert context.body == [{"name": "one"}]
+        assert context.query_params == {"limit": 2}
+
+    def test_body_and_query_params_parsed_once(self):
+        # Mocks
+        context = RequestContext(
+            method="POST",
+            headers={},
+            original_path="/users",
+            raw_body=b'{"name": "one"}',
+            raw_query_params={"limit": "2"},
+        )
+        # process
+        with patch("api.datastructures.json.loads") as loads:
+            loads.return_value = {"name": "one"}
+            context.body
+            context.body
+        # asserts
+        loads.assert_called_once_with(b'{"name": "one"}')
+        assert context.query_params == {"limit": 2}
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from api import dependencies
+from tests.conftest import AsyncMock
+
+
+def get_request(method="GET", path="/users", query_params=None) -> MagicMock:
+    request = MagicMock()
+    request.method = method
+    request.url.path = path
+    request.query_params = query_params or {}
+    request.body = AsyncMock(return_value=b'{"name": "one"}')
+    request.state = SimpleNamespace()
+    return request
+
+
+class TestGetContext:
+    @pytest.mark.asyncio
+    async def test_body_not_read_on_get(self):
+        # Mocks
+        request = get_request("GET")
+        # process
+        context = await dependencies.get_context(request)
+        # asserts
+        assert context.body == {}
+        request.body.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_body_read_on_post(self):
+        # Mocks
+        request = get_request("POST", query_params={"limit": "2"})
+        # process
+        context = await dependencies.get_context(request)
+        # asserts
+        assert context.body == {"name": "one"}
+        assert context.query_params == {"limit": 2}
+
+    @pytest.mark.asyncio
+    async def test_parsed_on_first_access(self, monkeypatch):
+        # Mocks
+        query_params = MagicMock(return_value={"limit": 2})
+        monkeypatch.setattr(
+            "api.datastructures.ContextSerializer.query_params", query_params
+        )
+        request = get_request("POST", query_params={"limit": "2"})
+        request.body = AsyncMock(return_value=b"not json")
+        # process
+        context = await dependencies.get_context(request)
+        # asserts
+        query_params.assert_not_called()
+        assert context.body == {}
+        assert context.query_params == {"limit": 2}
+        assert context.query_params == {"limit": 2}
+        query_params.assert_called_once_with({"limit": "2"})
+
+
+class TestGlobalMiddleware:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["/ping", "/ping/"])
+    async def test_ping_skips_context(self, monkeypatch, path):
+        # Mocks
+        get_context = AsyncMock()
+        monkeypatch.setattr(dependencies, "get_context", get_context)
+        request = get_request(path=path)
+        # process
+        await dependencies.global_middleware(request)
+        # asserts
+        get_context.assert_not_called()
+        assert not hasattr(request.state, "input_context")
@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.ingest import Ingestor
+from api.ingest import IngestQueue
+from tests.conftest import AsyncMock
+
+
+class TestIngestQueue:
+    @pytest.mark.asyncio
+    async def test_batch_full_flushed(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(return_value=([], [])))
+        queue = IngestQueue("users", insert, size=10, batch=2, wait=60)
+        # process
+        queue.put({"name": "one"})
+        queue.put({"name": "two"})
+        await asyncio.sleep(0.01)
+        # asserts
+        insert.assert_called_once_with("users", [{"name": "one"}, {"name": "two"}])
+        assert len(queue) == 0
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_window_flushed(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(return_value=([], [])))
+        queue = IngestQueue("users", insert, size=10, batch=100, wait=0.01)
+        # process
+        queue.put({"name": "one"})
+        await asyncio.sleep(0.05)
+        # asserts
+        insert.assert_called_once_with("users", [{"name": "one"}])
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(return_value=([], [])))
+        queue = IngestQueue("users", insert, size=1, batch=10, wait=60)
+        # process
+        accepted = [queue.put({"name": "one"}), queue.put({"name": "two"})]
+        # asserts
+        assert accepted == [True, False]
+        await queue.stop(drain=False)
+        insert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_queued_again(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(side_effect=Exception("down")))
+        queue = IngestQueue("users", insert, size=10, batch=10, wait=60)
+        queue._rows.extend([{"name": "one"}, {"name": "two"}])
+        # process
+        with pytest.raises(Exception):
+            await queue.flush()
+        # asserts
+        assert list(queue._rows) == [{"name": "one"}, {"name": "two"}]
+
+
+    @pytest.mark.asyncio
+    async def test_stop_while_inserting(self):
+        # Mocks
+        inserted, release = [], asyncio.Event()
+
+        async def insert(name, rows):
+            await release.wait()
+            inserted.extend(rows)
+            return [], []
+
+        queue = IngestQueue("users", insert, size=10, batch=2, wait=60)
+        queue.put({"name": "one"})
+        queue.put({"name": "two"})
+        await asyncio.sleep(0.01)
+        queue.put({"name": "three"})
+        # process
+        stop = asyncio.ensure_future(queue.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stop
+        # asserts
+        assert inserted == [{"name": "one"}, {"name": "two"}, {"name": "three"}]
+        assert len(queue) == 0
+
+
+class TestIngestor:
+    @pytest.mark.asyncio
+    async def test_stop_drains(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(return_value=([], [])))
+        ingestor = Ingestor(size=10, wait=60)
+        # process
+        ingestor.put("users", {"batch": 10}, insert, {"name": "one"})
+        ingestor.put("items", {"batch": 10}, insert, {"name": "two"})
+        await ingestor.stop()
+        # asserts
+        assert insert.call_count == 2
+        assert ingestor._queues == {}
+
+    @pytest.mark.asyncio
+    async def test_remove_drops_rows(self):
+        # Mocks
+        insert = MagicMock(side_effect=AsyncMock(return_value=([], [])))
+        ingestor = Ingestor(size=10, wait=60)
+        ingestor.put("users", {"batch": 10}, insert, {"name": "one"})
+        # process
+        await ingestor.remove("users")
+        await ingestor.stop()
+        # asserts
+        insert.assert_not_called()
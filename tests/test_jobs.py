@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from api.cache import response_cache
+from api.cache import TTLCache
+from api.datastructures import Job
+from api.engines.memory import MemoryEngine
+from api.jobs import JobRunner
+from api.repositories.memory import MemoryRepository
+
+
+class TestJobRunner:
+    @pytest.fixture(autouse=True)
+    def _client(self, monkeypatch):
+        monkeypatch.setattr(MemoryRepository, "client", MemoryEngine())
+        monkeypatch.setattr(MemoryRepository, "counts", TTLCache(ttl=10, size=10))
+
+    @pytest.fixture
+    def runner(self) -> JobRunner:
+        runner = JobRunner(chunk=2, throttle=0, interval=60, lease=60)
+        runner.repository = MemoryRepository
+        return runner
+
+    async def _create_users(self, rows):
+        schema = {"age": {"type": "integer"}}
+        await MemoryRepository.create_model(
+            {"name": "users", "path": "/users", "schema": schema}
+        )
+        for i, row in enumerate(rows):
+            await MemoryRepository.create_row("users", {"public_id": f"u{i}", **row})
+
+    @pytest.mark.asyncio
+    async def test_migrate(self, runner):
+        # Mocks
+        await self._create_users([{"age": 1}, {"age": 2}, {}])
+        schema = {
+            "age": {"type": "integer", "required": True},
+            "role": {"type": "string", "default": "user"},
+        }
+        await MemoryRepository.update_model("users", {"schema": schema})
+        job = await MemoryRepository.create_job(Job(kind=Job.MIGRATE, model="users"))
+        generation = response_cache.generation("users")
+        # process
+        await runner.execute(await MemoryRepository.claim_job(60))
+        # asserts
+        job = await MemoryRepository.job_by_id(job.public_id)
+        rows = await MemoryRepository.find_one_or_many("users", None, {})
+        assert response_cache.generation("users") != generation
+        assert job.status == Job.DONE
+        assert job.progress == {"total": 3, "done": 3, "invalid": 1}
+        assert job.errors == [{"public_id": "u2", "errors": {"age": ["required field"]}}]
+        assert [row.get("role") for row in rows] == ["user", "user", None]
+
+    @pytest.mark.asyncio
+    async def test_drop(self, runner):
+        # Mocks
+        await self._create_users([{"age": 1}, {"age": 2}, {"age": 3}])
+        await MemoryRepository.delete_model("users")
+        job = await MemoryRepository.create_job(Job(kind=Job.DROP, model="users"))
+        # process
+        await runner.execute(await MemoryRepository.claim_job(60))
+        # asserts
+        job = await MemoryRepository.job_by_id(job.public_id)
+        assert job.status == Job.DONE
+        assert job.progress == {"total": 3, "done": 3}
+        assert job.lease_until > job.updated_at  # Renewed by chunk.
+        assert await MemoryRepository.count_rows("users") == 0
+        assert await MemoryRepository.pending_jobs("users") == 0
+
+    @pytest.mark.asyncio
+    async def test_failed(self, runner):
+        # Mocks
+        job = await MemoryRepository.create_job(Job(kind=Job.MIGRATE, model="users"))
+        # process
+        await runner.execute(await MemoryRepository.claim_job(60))
+        # asserts
+        job = await MemoryRepository.job_by_id(job.public_id)
+        assert job.status == Job.FAILED
+        assert job.error == "model `users` not found."
+
+    @pytest.mark.asyncio
+    async def test_stopped_job_queued_again(self, runner):
+        # Mocks
+        await self._create_users([{"age": 1}, {"age": 2}, {"age": 3}])
+        await MemoryRepository.delete_model("users")
+        job = await MemoryRepository.create_job(Job(kind=Job.DROP, model="users"))
+        runner.throttle = 60
+        # process
+        runner.start(MemoryRepository)
+        await asyncio.sleep(0.01)
+        await runner.stop()
+        # asserts
+        job = await MemoryRepository.job_by_id(job.public_id)
+        assert job.status == Job.QUEUED
+        assert job.progress == {"total": 3, "done": 2}
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.metrics import Histogram
+from api.metrics import Metrics
+
+
+class TestHistogram:
+    def test_samples_cumulated(self):
+        # Mocks
+        histogram = Histogram("latency", "Latency.", ("model",), buckets=(0.1, 1))
+        # process
+        for seconds in (0.05, 0.5, 5):
+            histogram.observe(seconds, "users")
+        # asserts
+        assert histogram.samples() == [
+            ("latency_bucket", {"model": "users", "le": "0.1"}, 1),
+            ("latency_bucket", {"model": "users", "le": "1"}, 2),
+            ("latency_bucket", {"model": "users", "le": "+Inf"}, 3),
+            ("latency_sum", {"model": "users"}, 5.55),
+            ("latency_count", {"model": "users"}, 3),
+        ]
+
+
+class TestMetrics:
+    def test_disabled_returns_functions(self):
+        # Mocks
+        metrics = Metrics(False)
+
+        def fn():
+            pass
+
+        # process & asserts
+        assert metrics.timed(metrics.phases, "model")(fn) is fn
+        assert metrics.handler()(fn) is fn
+
+    @pytest.mark.asyncio
+    async def test_timed(self):
+        # Mocks
+        metrics = Metrics(True)
+
+        @metrics.timed(metrics.engine, "find")
+        async def find():
+            return 1
+
+        @metrics.timed(metrics.phases, "validation")
+        def validate():
+            return 2
+
+        # process
+        response = (await find(), validate())
+        # asserts
+        assert response == (1, 2)
+        assert metrics.engine.get("find") == 1
+        assert metrics.phases.get("validation") == 1
+
+    @pytest.mark.asyncio
+    async def test_handler(self):
+        # Mocks
+        metrics = Metrics(True)
+        context = MagicMock(method="GET", model=None)
+
+        @metrics.handler("admin")
+        async def handle(cls, context):
+            return MagicMock(status_code=200)
+
+        @metrics.handler()
+        async def fail(cls, context):
+            raise ValueError()
+
+        # process
+        await handle(None, context)
+        with pytest.raises(ValueError):
+            await fail(None, context)
+        # asserts
+        assert metrics.requests.get("admin", "GET", "200") == 1
+        assert metrics.requests.get("", "GET", "500") == 1
+        assert metrics.errors.get("", "GET") == 1
+        assert metrics.latency.get("admin", "GET") == 1
+
+    def test_render(self):
+        # Mocks
+        metrics = Metrics(True)
+        metrics.requests.inc('us"ers', "GET", "200")
+        # process
+        response = metrics.render()
+        # asserts
+        assert "# TYPE apiruns_requests_total counter\n" in response
+        assert 'apiruns_requests_total{model="us\\"ers",method="GET",status="200"} 1\n' in (
+            response
+        )
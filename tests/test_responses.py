@@ -0,0 +1,45 @@
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+from bson import ObjectId
+
+from api.responses import dumps_json
+from api.responses import ENCODERS
+from api.responses import get_encoder
+from api.responses import JSONResponse
+
+
+CONTENT = {
+    "_id": ObjectId("639a0d5f123456789abcdef0"),
+    "name": "ñandú",
+    "created_at": datetime(2022, 3, 23, 0, 9, 45, 708193, tzinfo=timezone.utc),
+    "tags": ["a", 1, 1.5, None, True],
+}
+EXPECTED = (
+    '{"_id":"639a0d5f123456789abcdef0","name":"ñandú",'
+    '"created_at":"2022-03-23T00:09:45.708193+00:00",'
+    '"tags":["a",1,1.5,null,true]}'
+).encode("utf-8")
+
+
+class TestEncoders:
+    @pytest.mark.parametrize("name", list(ENCODERS))
+    def test_encoders_same_output(self, name):
+        assert ENCODERS[name](CONTENT) == EXPECTED
+
+    def test_encoder_not_serializable(self):
+        with pytest.raises(TypeError):
+            dumps_json({"obj": object()})
+
+    def test_get_encoder_fallback(self):
+        assert get_encoder("json") is dumps_json
+        assert get_encoder("unknown") is dumps_json
+        assert get_encoder("AUTO") is ENCODERS.get("ORJSON", dumps_json)
+
+
+class TestJSONResponse:
+    def test_render(self):
+        response = JSONResponse(content={"public_id": "u1"}, status_code=201)
+        assert response.body == b'{"public_id":"u1"}'
+        assert response.headers["content-type"] == "application/json"